@@ -31,6 +31,11 @@ pub struct Cli {
     #[arg(long, default_value_t = false)]
     pub force_rerun: bool,
 
+    /// Do not apply the precompile patches before compiling the guests, because
+    /// the guest workspace was already patched for the zkVM (e.g. by run_sweep.py)
+    #[arg(long, default_value_t = false)]
+    pub skip_patches: bool,
+
     /// Guest program to benchmark
     #[command(subcommand)]
     pub guest_program: GuestProgramCommand,
@@ -49,7 +49,8 @@ fn main() -> Result<()> {
             let guest_relative = execution_client
                 .guest_rel_path()
                 .context("Failed to get guest relative path")?;
-            let apply_patches = matches!(execution_client, ExecutionClient::Reth);
+            let apply_patches =
+                matches!(execution_client, ExecutionClient::Reth) && !cli.skip_patches;
             let zkvms = get_zkvm_instances(
                 &cli.zkvms,
                 &workspace_dir,
@@ -77,7 +78,7 @@ fn main() -> Result<()> {
                 &workspace_dir,
                 Path::new("empty-program"),
                 resource,
-                true,
+                !cli.skip_patches,
             )?;
             let config = RunConfig {
                 output_folder: cli.output_folder,
@@ -111,7 +112,7 @@ fn main() -> Result<()> {
                 &workspace_dir,
                 Path::new("block-encoding-length"),
                 resource,
-                true,
+                !cli.skip_patches,
             )?;
             let config = RunConfig {
                 output_folder: cli.output_folder,
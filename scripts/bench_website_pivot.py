@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Benchmark the pivot stage and EL section rendering of generate-website.py.
+
+Builds synthetic result tables with an increasing number of fixtures for a
+single EL across several zkVMs, then times `build_pivot` and
+`generate_detailed_results`. The per-fixture cost should stay flat as the
+fixture count grows, i.e. rendering scales linearly.
+
+Usage:
+    python3 bench_website_pivot.py [--zkvms 6] [--sizes 1000 10000 100000]
+"""
+
+import argparse
+import importlib.util
+import time
+from pathlib import Path
+
+import numpy as np
+
+from results_table import ResultTable, build_pivot
+
+
+def load_website_module():
+    """Import generate-website.py, whose file name is not a valid module name."""
+    path = Path(__file__).with_name('generate-website.py')
+    spec = importlib.util.spec_from_file_location('generate_website', path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def synthetic_table(num_fixtures: int, num_zkvms: int, seed: int = 0) -> ResultTable:
+    """Every zkVM runs every fixture of one EL; about 5% of runs crash."""
+    rng = np.random.default_rng(seed)
+    rows = num_fixtures * num_zkvms
+    success = rng.random(rows) > 0.05
+    cycles = np.where(success, rng.integers(10**6, 10**10, rows), -1)
+    duration_ns = np.where(success, cycles * 20, -1)
+    # Split the cycles of successful runs over the usual guest regions
+    shares = np.array([0.01, 0.2, 0.7, 0.05, 0.04])
+    region_cycles = np.where(success[:, None], (cycles[:, None] * shares).astype(np.int64), -1)
+    # Shuffle so rows are not already grouped the way the pivot wants them
+    order = rng.permutation(rows)
+    return ResultTable(
+        test=np.repeat(np.arange(num_fixtures, dtype=np.int32), num_zkvms)[order],
+        zkvm=np.tile(np.arange(num_zkvms, dtype=np.int32), num_fixtures)[order],
+        el=np.zeros(rows, dtype=np.int32),
+        cycles=cycles[order],
+        duration_ns=duration_ns[order],
+        gas=np.full(rows, 10_000_000, dtype=np.int64),
+        proving_ms=np.full(rows, -1, dtype=np.int64),
+        proof_size=np.full(rows, -1, dtype=np.int64),
+        success=success[order],
+        region_cycles=region_cycles[order],
+        test_names=[f"test_worst_op_{i}[fork_Prague-benchmark-gas-value_10M-blockchain_test-case]"
+                    for i in range(num_fixtures)],
+        zkvm_names=[f"zkvm{i} (v1.0.0)" for i in range(num_zkvms)],
+        el_names=['reth'],
+        region_names=['read_input', 'verify_witness', 'block_execution', 'post_state_compute', 'validation'],
+    )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='Benchmark website pivot and rendering scaling')
+    parser.add_argument('--zkvms', type=int, default=6, help='Number of zkVMs (default: 6)')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1_000, 10_000, 100_000],
+                        help='Fixture counts to benchmark (default: 1000 10000 100000)')
+    args = parser.parse_args()
+
+    website = load_website_module()
+
+    print(f"{'Fixtures':>10} {'Rows':>10} {'Pivot (s)':>10} {'Render (s)':>11} {'us/fixture':>11}")
+    for size in args.sizes:
+        table = synthetic_table(size, args.zkvms)
+
+        start = time.perf_counter()
+        pivot = build_pivot(table)
+        pivot_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for _ in website.generate_detailed_results(table, pivot):
+            pass
+        render_time = time.perf_counter() - start
+
+        per_fixture = (pivot_time + render_time) / size * 1_000_000
+        print(f"{size:>10,} {len(table):>10,} {pivot_time:>10.3f} {render_time:>11.3f} {per_fixture:>11.1f}")
+
+    return 0
+
+
+if __name__ == '__main__':
+    exit(main())
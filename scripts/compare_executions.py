@@ -9,61 +9,41 @@ Usage:
 Example:
     python3 compare_executions.py baseline-zkevm-metrics optimized-zkevm-metrics
 
+Either folder may instead be a results store written by ingest_metrics.py,
+optionally selecting one run: results.sqlite#<run>.
+
 The script will look for all subfolders with *.json files in both folders and compare:
 - region_cycles data (verify_witness, post_state_compute, validation, etc.)
 - total_num_cycles (added as the most general metric)
 
 Output includes:
 - Detailed speedup table for all files
-- Statistical analysis with best/worst performers
+- Statistical analysis with best/worst performers, geometric-mean speedups and
+  bootstrap confidence intervals over files
+- With --baseline-repeat/--optimized-repeat, per-file significance tests of
+  execution_duration across the repeated runs
+- Wall-time (execution_duration) speedups next to cycle speedups, with cycles
+  per second for both runs; a warning when hardware.json shows the runs come
+  from different hosts
+- Gas-normalized throughput (cycles/Mgas, execution Mgas/s) per subfolder, with rankings
+- With --gate, threshold checks per region and for total_num_cycles, with an
+  exit status of 1 on a breach, on a candidate fixture that crashed or is
+  missing, and optional JSON/JUnit XML reports
 - Key findings summary with total_num_cycles highlighted
 """
 
-import json
+import argparse
 import os
-import sys
-from pathlib import Path
-from typing import Dict, List, Tuple
-import statistics
+from typing import Dict, List, Optional, Tuple
 
-def load_metrics(folder_path: str) -> Dict[str, Dict]:
-    """Load all metric files from a folder, searching all subfolders."""
-    metrics = {}
-    folder = Path(folder_path)
-    
-    if not folder.exists():
-        print(f"Warning: {folder} does not exist")
-        return metrics
-    
-    # Find all subfolders that contain JSON files
-    subfolders_with_json = []
-    for subfolder in folder.iterdir():
-        if subfolder.is_dir():
-            json_files = list(subfolder.glob("*.json"))
-            if json_files:
-                subfolders_with_json.append(subfolder)
-    
-    if not subfolders_with_json:
-        print(f"Warning: No subfolders with JSON files found in {folder}")
-        return metrics
-    
-    print(f"Found subfolders with metrics: {[sf.name for sf in subfolders_with_json]}")
-    
-    # Load files from all subfolders
-    for subfolder in subfolders_with_json:
-        for file_path in subfolder.glob("*.json"):
-            try:
-                with open(file_path, 'r') as f:
-                    data = json.load(f)
-                    # Create a unique key combining subfolder and filename
-                    filename = file_path.stem
-                    subfolder_name = subfolder.name
-                    unique_key = f"{subfolder_name}/{filename}"
-                    metrics[unique_key] = data
-            except (json.JSONDecodeError, FileNotFoundError) as e:
-                print(f"Error loading {file_path}: {e}")
-    
-    return metrics
+from gas_metrics import (
+    execution_seconds, group_name, print_rankings, print_throughput_table, throughput_by_group, total_cycles
+)
+from metrics_loader import hardware_differences, load_hardware_info, load_metrics
+from regression_gate import add_gate_arguments, candidate_failures, run_gate, validate_gate_arguments
+from speedup_stats import (
+    collect_samples, compare_samples, format_ci, print_significance_table, summarize_speedups
+)
 
 def extract_region_cycles(metrics_data: Dict) -> Dict[str, int]:
     """Extract region_cycles from metrics data and add total_num_cycles."""
@@ -213,14 +193,14 @@ def analyze_speedups(speedups: Dict[str, Dict[str, float]], regions: List[str]):
                     region_speedups.append(speedup)
                     file_speedups.append((filename, speedup))
         
-        if not region_speedups:
+        summary = summarize_speedups(region_speedups)
+        if summary is None:
             continue
         
         # Sort by speedup
         file_speedups.sort(key=lambda x: x[1], reverse=True)
         
-        avg_speedup = statistics.mean(region_speedups)
-        improvement_pct = (avg_speedup - 1.0) * 100
+        improvement_pct = (summary.geometric_mean - 1.0) * 100
         
         print(f"\n{region.upper().replace('_', ' ')}:")
         # Format percentage to avoid negative zeros
@@ -228,9 +208,10 @@ def analyze_speedups(speedups: Dict[str, Dict[str, float]], regions: List[str]):
             pct_str = "(+0.0%)"
         else:
             pct_str = f"({improvement_pct:+.1f}%)"
-        print(f"  Average speedup: {avg_speedup:.2f}x {pct_str}")
-        print(f"  Min speedup: {min(region_speedups):.2f}x")
-        print(f"  Max speedup: {max(region_speedups):.2f}x")
+        print(f"  Geometric mean speedup: {summary.geometric_mean:.2f}x {pct_str}, {format_ci(summary)}")
+        print(f"  Arithmetic mean speedup: {summary.arithmetic_mean:.2f}x")
+        print(f"  Min speedup: {summary.minimum:.2f}x")
+        print(f"  Max speedup: {summary.maximum:.2f}x")
         
         # Top 3 best
         print("  Top 3 best speedups:")
@@ -243,17 +224,139 @@ def analyze_speedups(speedups: Dict[str, Dict[str, float]], regions: List[str]):
             for i, (filename, speedup) in enumerate(file_speedups[-3:]):
                 print(f"    {i+1}. {filename}: {speedup:.2f}x")
 
+def calculate_wall_time_speedups(unoptimized_metrics: Dict[str, Dict], optimized_metrics: Dict[str, Dict],
+                                 files: List[str]) -> Dict[str, float]:
+    """Calculate execution_duration speedups for files with a duration in both runs."""
+    wall_speedups = {}
+    for filename in files:
+        baseline_time = execution_seconds(unoptimized_metrics[filename])
+        optimized_time = execution_seconds(optimized_metrics[filename])
+        if baseline_time and optimized_time:
+            wall_speedups[filename] = baseline_time / optimized_time
+    return wall_speedups
+
+def cycles_per_second(metrics_data: Dict) -> Optional[float]:
+    """Executed cycles per second of wall time."""
+    cycles = total_cycles(metrics_data)
+    seconds = execution_seconds(metrics_data)
+    return cycles / seconds if cycles and seconds else None
+
+def check_hardware(baseline_hardware: Optional[Dict], optimized_hardware: Optional[Dict]) -> bool:
+    """Warn when the runs come from different or unknown hosts. Returns True on a mismatch."""
+    if baseline_hardware is None or optimized_hardware is None:
+        missing = "baseline" if baseline_hardware is None else "optimized"
+        print(f"\nNote: no hardware.json found for the {missing} run; cannot verify both ran on the same host")
+        return False
+
+    differences = hardware_differences(baseline_hardware, optimized_hardware)
+    if differences:
+        print("\n⚠️  WARNING: baseline and optimized ran on different hardware, wall times are not comparable:")
+        for difference in differences:
+            print(f"    {difference}")
+    return bool(differences)
+
+def print_wall_time_comparison(unoptimized_metrics: Dict[str, Dict], optimized_metrics: Dict[str, Dict],
+                               wall_speedups: Dict[str, float], speedups: Dict[str, Dict[str, float]],
+                               hardware_mismatch: bool):
+    """Print per-file wall-time speedups next to cycle speedups, with cycles per second per run."""
+    print("\n" + "="*80)
+    print("WALL-TIME EXECUTION COMPARISON (execution_duration)")
+    print("="*80)
+    if not wall_speedups:
+        print("No files with execution_duration in both runs")
+        return
+
+    if hardware_mismatch:
+        # Cycles per second cannot calibrate the hosts: the change itself may alter it
+        print("⚠️  Runs come from different hardware; wall-time speedups include the difference between the hosts")
+
+    file_column_width = max(max(len(filename) for filename in wall_speedups) + 2, 30)
+    header = ("File".ljust(file_column_width) + "Cycles".ljust(10) + "Wall".ljust(10) +
+              "Baseline (s)".ljust(14) + "Optimized (s)".ljust(15) +
+              "Base Mcycles/s".ljust(16) + "Opt Mcycles/s".ljust(16))
+    print(header)
+    print("-" * len(header))
+
+    for filename in sorted(wall_speedups):
+        cycle_speedup = speedups.get(filename, {}).get("total_num_cycles")
+        baseline_rate = cycles_per_second(unoptimized_metrics[filename])
+        optimized_rate = cycles_per_second(optimized_metrics[filename])
+        row = (filename.ljust(file_column_width) +
+               (f"{cycle_speedup:.2f}x" if cycle_speedup is not None else "N/A").ljust(10) +
+               f"{wall_speedups[filename]:.2f}x".ljust(10) +
+               f"{execution_seconds(unoptimized_metrics[filename]):,.3f}".ljust(14) +
+               f"{execution_seconds(optimized_metrics[filename]):,.3f}".ljust(15) +
+               (f"{baseline_rate / 1e6:,.2f}" if baseline_rate else "N/A").ljust(16) +
+               (f"{optimized_rate / 1e6:,.2f}" if optimized_rate else "N/A").ljust(16))
+        print(row)
+
+    print("\nBy subfolder:")
+    by_group: Dict[str, List[str]] = {}
+    for filename in wall_speedups:
+        by_group.setdefault(group_name(filename), []).append(filename)
+    for group in sorted(by_group):
+        files = by_group[group]
+        summary = summarize_speedups([wall_speedups[filename] for filename in files])
+        rates = []
+        for metrics in (unoptimized_metrics, optimized_metrics):
+            cycles = sum(total_cycles(metrics[filename]) or 0 for filename in files)
+            seconds = sum(execution_seconds(metrics[filename]) for filename in files)
+            rates.append(cycles / seconds / 1e6)
+        print(f"  {group or '(root)'}: wall-time speedup {summary.geometric_mean:.2f}x {format_ci(summary)}, "
+              f"{rates[0]:,.2f} -> {rates[1]:,.2f} Mcycles/s")
+
+def print_gas_throughput(unoptimized_metrics: Dict[str, Dict], optimized_metrics: Dict[str, Dict],
+                         files: List[str]):
+    """Print gas-normalized execution throughput per subfolder and rank the subfolders."""
+    baseline = throughput_by_group(unoptimized_metrics, files)
+    optimized = throughput_by_group(optimized_metrics, files)
+
+    print("\n" + "="*80)
+    print("GAS-NORMALIZED THROUGHPUT")
+    print("="*80)
+    if not any(totals.files for totals in optimized.values()):
+        print("No block_used_gas metadata found")
+        return
+
+    print_throughput_table(baseline, optimized, [
+        ("Cycles/Mgas", "cycles_per_mgas", False),
+        ("Exec Mgas/s", "execution_mgas_per_sec", True),
+    ])
+    print_rankings("cycles/Mgas", baseline, optimized, "cycles_per_mgas", higher_is_better=False)
+    print_rankings("execution Mgas/s", baseline, optimized, "execution_mgas_per_sec", higher_is_better=True)
+
 def main():
     """Main function."""
-    if len(sys.argv) != 3:
-        print("Usage: python3 compare_executions.py <baseline_folder> <optimized_folder>")
-        print("\nExample:")
-        print("  python3 compare_executions.py zkevm-metrics local-optimized-zkevm-metrics")
-        print("  python3 compare_executions.py /path/to/baseline /path/to/optimized")
-        sys.exit(1)
-    
-    baseline_folder = sys.argv[1]
-    optimized_folder = sys.argv[2]
+    parser = argparse.ArgumentParser(
+        description="Compare region cycle metrics between a baseline and an optimized run",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""Example:
+  python3 compare_executions.py zkevm-metrics local-optimized-zkevm-metrics
+  python3 compare_executions.py /path/to/baseline /path/to/optimized
+  python3 compare_executions.py results.sqlite#baseline results.sqlite#optimized
+  python3 compare_executions.py base opt --gate --threshold verify_witness=1 --threshold block_execution=1 \\
+      --junit-report gate.xml"""
+    )
+    parser.add_argument("baseline_folder",
+                        help="Folder with the baseline metrics, or a results store (<file>.sqlite[#<run>])")
+    parser.add_argument("optimized_folder",
+                        help="Folder with the optimized metrics, or a results store (<file>.sqlite[#<run>])")
+    parser.add_argument("-j", "--jobs", type=int, default=None,
+                        help="Number of worker processes used to parse metrics (default: CPU count)")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Do not read or update the metrics cache stored in each folder")
+    parser.add_argument("--baseline-repeat", action="append", default=[], metavar="FOLDER",
+                        help="Folder with a repeated baseline run; may be given several times")
+    parser.add_argument("--optimized-repeat", action="append", default=[], metavar="FOLDER",
+                        help="Folder with a repeated optimized run; may be given several times")
+    parser.add_argument("--alpha", type=float, default=0.05,
+                        help="Significance level for repeated-run tests (default: 0.05)")
+    add_gate_arguments(parser, "a region such as verify_witness, total_num_cycles, or execution_duration")
+    args = parser.parse_args()
+    validate_gate_arguments(parser, args)
+
+    baseline_folder = args.baseline_folder
+    optimized_folder = args.optimized_folder
     
     # Convert to absolute paths if relative paths are provided
     if not os.path.isabs(baseline_folder):
@@ -262,20 +365,28 @@ def main():
         optimized_folder = os.path.abspath(optimized_folder)
     
     print(f"Loading baseline metrics from: {baseline_folder}")
-    unoptimized_metrics = load_metrics(baseline_folder)
+    unoptimized_metrics = load_metrics(baseline_folder, args.jobs, not args.no_cache)
     print(f"Loaded {len(unoptimized_metrics)} baseline files")
     
     print(f"\nLoading optimized metrics from: {optimized_folder}")
-    optimized_metrics = load_metrics(optimized_folder)
+    optimized_metrics = load_metrics(optimized_folder, args.jobs, not args.no_cache)
     print(f"Loaded {len(optimized_metrics)} optimized files")
     
+    hardware_mismatch = check_hardware(load_hardware_info(baseline_folder), load_hardware_info(optimized_folder))
+    
     print("\nCalculating speedups...")
     speedups, regions = calculate_speedups(unoptimized_metrics, optimized_metrics)
     print(f"Found {len(speedups)} common files with {len(regions)} regions")
     
+    failures = candidate_failures(unoptimized_metrics, optimized_metrics, "execution") if args.gate else {}
     if not speedups:
         print("No common files found or no valid data")
-        return
+        if args.gate:
+            # Nothing comparable never passes, but the crashed and missing files are still reported
+            context = {"baseline": baseline_folder, "optimized": optimized_folder, "files": 0}
+            run_gate(args, "compare_executions", {}, context, failures)
+            return 1
+        return 0
     
     print(f"\nRegions found: {', '.join(regions)}")
     print("\n" + "="*80)
@@ -285,6 +396,13 @@ def main():
     
     analyze_speedups(speedups, regions)
     
+    common_files = sorted(speedups)
+    wall_speedups = calculate_wall_time_speedups(unoptimized_metrics, optimized_metrics, common_files)
+    print_wall_time_comparison(unoptimized_metrics, optimized_metrics, wall_speedups, speedups,
+                               hardware_mismatch)
+    
+    print_gas_throughput(unoptimized_metrics, optimized_metrics, common_files)
+    
     # Summary of key findings
     print("\n" + "="*80)
     print("KEY FINDINGS")
@@ -293,27 +411,22 @@ def main():
     # Calculate overall metrics
     region_improvements = {}
     for region in regions:
-        region_speedups = []
-        for filename, file_data in speedups.items():
-            if region in file_data:
-                speedup = file_data[region]
-                # Filter out infinite speedups for overall analysis, but include zero speedups
-                if speedup != float('inf'):
-                    region_speedups.append(speedup)
-        if region_speedups:
-            avg_speedup = statistics.mean(region_speedups)
-            region_improvements[region] = avg_speedup
+        region_speedups = [file_data[region] for file_data in speedups.values() if region in file_data]
+        summary = summarize_speedups(region_speedups)
+        if summary is not None:
+            region_improvements[region] = summary
     
     # Sort regions by improvement, but keep total_num_cycles for special handling
-    total_cycles_speedup = region_improvements.pop("total_num_cycles", None)
-    sorted_regions = sorted(region_improvements.items(), key=lambda x: x[1], reverse=True)
+    total_cycles_summary = region_improvements.pop("total_num_cycles", None)
+    sorted_regions = sorted(region_improvements.items(), key=lambda x: x[1].geometric_mean, reverse=True)
     
-    print("\nRegions ranked by average speedup:")
-    for i, (region, speedup) in enumerate(sorted_regions):
+    print("\nRegions ranked by geometric mean speedup:")
+    for i, (region, summary) in enumerate(sorted_regions):
+        speedup = summary.geometric_mean
         improvement_pct = (speedup - 1.0) * 100
         
-        # Only show IMPROVEMENT/REGRESSION if change is > 0.5%
-        if abs(improvement_pct) > 0.5:
+        # Only show IMPROVEMENT/REGRESSION if change is > 0.5% and outside the confidence interval
+        if abs(improvement_pct) > 0.5 and summary.significant:
             status = "IMPROVEMENT" if speedup > 1.0 else "REGRESSION"
         else:
             status = "NO CHANGE"
@@ -324,16 +437,18 @@ def main():
         else:
             pct_str = f"({improvement_pct:+.1f}%)"
             
-        print(f"  {i+1}. {region.replace('_', ' ').title()}: {speedup:.2f}x {pct_str} - {status}")
+        print(f"  {i+1}. {region.replace('_', ' ').title()}: {speedup:.2f}x {pct_str} "
+              f"{format_ci(summary)} - {status}")
     
     print(f"\nTotal files analyzed: {len(speedups)}")
     
     # Highlight total_num_cycles at the bottom as most important
-    if total_cycles_speedup:
+    if total_cycles_summary:
+        total_cycles_speedup = total_cycles_summary.geometric_mean
         improvement_pct = (total_cycles_speedup - 1.0) * 100
         
-        # Only show IMPROVEMENT/REGRESSION if change is > 0.5%
-        if abs(improvement_pct) > 0.5:
+        # Only show IMPROVEMENT/REGRESSION if change is > 0.5% and outside the confidence interval
+        if abs(improvement_pct) > 0.5 and total_cycles_summary.significant:
             status = "IMPROVEMENT" if total_cycles_speedup > 1.0 else "REGRESSION"
         else:
             status = "NO CHANGE"
@@ -344,7 +459,31 @@ def main():
         else:
             pct_str = f"({improvement_pct:+.1f}%)"
             
-        print(f"\n🎯 OVERALL PERFORMANCE (Total Num Cycles): {total_cycles_speedup:.2f}x {pct_str} - {status}")
+        print(f"\n🎯 OVERALL PERFORMANCE (Total Num Cycles): {total_cycles_speedup:.2f}x {pct_str} "
+              f"{format_ci(total_cycles_summary)} - {status}")
+    
+    if args.baseline_repeat or args.optimized_repeat:
+        baseline_runs = [unoptimized_metrics] + [
+            load_metrics(os.path.abspath(folder), args.jobs, not args.no_cache) for folder in args.baseline_repeat
+        ]
+        optimized_runs = [optimized_metrics] + [
+            load_metrics(os.path.abspath(folder), args.jobs, not args.no_cache) for folder in args.optimized_repeat
+        ]
+        comparisons = compare_samples(
+            collect_samples(baseline_runs, execution_seconds),
+            collect_samples(optimized_runs, execution_seconds),
+        )
+        print_significance_table(comparisons, args.alpha, "execution_duration")
+    
+    if args.gate:
+        metric_speedups = {
+            region: {filename: file_data[region] for filename, file_data in speedups.items() if region in file_data}
+            for region in regions
+        }
+        metric_speedups["execution_duration"] = wall_speedups
+        context = {"baseline": baseline_folder, "optimized": optimized_folder, "files": len(speedups)}
+        return run_gate(args, "compare_executions", metric_speedups, context, failures)
+    return 0
 
 if __name__ == "__main__":
-    main()
+    exit(main())
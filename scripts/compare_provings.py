@@ -9,60 +9,44 @@ Usage:
 Example:
     python3 compare_provings.py foo-baseline foo-optimized
 
+Either folder may instead be a results store written by ingest_metrics.py,
+optionally selecting one run: results.sqlite#<run>.
+
 The script will look for all subfolders with *.json files in both folders and compare:
 - proving_time_ms (the primary metric for proving performance, displayed in seconds)
+- proof_size (bytes, which drive on-chain verification cost)
 
 Output includes:
 - Detailed speedup table for all files
-- Statistical analysis with best/worst performers
+- Statistical analysis with best/worst performers, geometric-mean speedup and
+  a bootstrap confidence interval over files
+- Total proving time per zkVM version and, when the cycle counts are known,
+  proving throughput in Mcycles/s. Proving runs do not record cycles, so pass
+  the execution runs of the same fixtures with --baseline-execution and
+  --optimized-execution
+- Proof size per zkVM version with the largest per-file changes
+- With --baseline-repeat/--optimized-repeat, per-file significance tests of
+  proving_time_ms across the repeated runs
+- Gas-normalized proving throughput (Mgas/s) per subfolder, with rankings
+- With --gate, a threshold check for proving_time and proof_size, with an
+  exit status of 1 on a breach, on a candidate proof that crashed or is
+  missing, and optional JSON/JUnit XML reports
 - Key findings summary with proving time improvements highlighted
 """
 
-import json
+import argparse
 import os
-import sys
-from pathlib import Path
-from typing import Dict, List, Tuple
-import statistics
+from typing import Dict, List, Optional, Tuple
 
-def load_metrics(folder_path: str) -> Dict[str, Dict]:
-    """Load all metric files from a folder, searching all subfolders."""
-    metrics = {}
-    folder = Path(folder_path)
-    
-    if not folder.exists():
-        print(f"Warning: {folder} does not exist")
-        return metrics
-    
-    # Find all subfolders that contain JSON files
-    subfolders_with_json = []
-    for subfolder in folder.iterdir():
-        if subfolder.is_dir():
-            json_files = list(subfolder.glob("*.json"))
-            if json_files:
-                subfolders_with_json.append(subfolder)
-    
-    if not subfolders_with_json:
-        print(f"Warning: No subfolders with JSON files found in {folder}")
-        return metrics
-    
-    print(f"Found subfolders with metrics: {[sf.name for sf in subfolders_with_json]}")
-    
-    # Load files from all subfolders
-    for subfolder in subfolders_with_json:
-        for file_path in subfolder.glob("*.json"):
-            try:
-                with open(file_path, 'r') as f:
-                    data = json.load(f)
-                    # Create a unique key combining subfolder and filename
-                    filename = file_path.stem
-                    subfolder_name = subfolder.name
-                    unique_key = f"{subfolder_name}/{filename}"
-                    metrics[unique_key] = data
-            except (json.JSONDecodeError, FileNotFoundError) as e:
-                print(f"Error loading {file_path}: {e}")
-    
-    return metrics
+from gas_metrics import (
+    format_change, format_throughput, group_name, print_rankings, print_throughput_table, proving_seconds,
+    throughput_by_group, total_cycles
+)
+from metrics_loader import load_metrics
+from regression_gate import add_gate_arguments, candidate_failures, run_gate, validate_gate_arguments
+from speedup_stats import (
+    collect_samples, compare_samples, format_ci, print_significance_table, summarize_speedups
+)
 
 def extract_proving_time(metrics_data: Dict) -> float:
     """Extract proving_time_ms from metrics data and convert to seconds."""
@@ -71,6 +55,13 @@ def extract_proving_time(metrics_data: Dict) -> float:
     except KeyError:
         return 0.0
 
+def extract_proof_size(metrics_data: Dict) -> Optional[int]:
+    """Extract proof_size in bytes from metrics data, or None if proving did not succeed."""
+    try:
+        return int(metrics_data["proving"]["success"]["proof_size"])
+    except (KeyError, TypeError):
+        return None
+
 def calculate_speedups(baseline_metrics: Dict[str, Dict], 
                       optimized_metrics: Dict[str, Dict]) -> Tuple[Dict[str, float], List[str]]:
     """Calculate speedups for all common files."""
@@ -92,26 +83,6 @@ def calculate_speedups(baseline_metrics: Dict[str, Dict],
     
     return speedups, sorted_files
 
-def print_speedup_table(speedups: Dict[str, float], files: List[str]):
-    """Print a formatted table of speedups."""
-    if not speedups:
-        print("No data to display")
-        return
-    
-    # Print header - use wider column for file names to accommodate subfolder/filename
-    header = "File".ljust(30) + "Proving Time Speedup".ljust(20) + "Baseline (ms)".ljust(15) + "Optimized (ms)".ljust(15) + "Time Saved (ms)".ljust(15)
-    print(header)
-    print("-" * len(header))
-    
-    # Get baseline and optimized metrics for displaying actual times
-    # We'll need to pass these in or recalculate, for now just show speedup
-    for filename in files:
-        if filename in speedups:
-            speedup = speedups[filename]
-            speedup_str = f"{speedup:.2f}x"
-            row = filename.ljust(30) + speedup_str.ljust(20)
-            print(row)
-
 def print_detailed_speedup_table(speedups: Dict[str, float], baseline_metrics: Dict[str, Dict], 
                                 optimized_metrics: Dict[str, Dict], files: List[str]):
     """Print a detailed formatted table of speedups with actual times."""
@@ -155,12 +126,11 @@ def analyze_speedups(speedups: Dict[str, float], baseline_metrics: Dict[str, Dic
     # Overall summary
     print("\nOVERALL SUMMARY:")
     
-    speedup_values = list(speedups.values())
+    summary = summarize_speedups(list(speedups.values()))
     file_speedups = [(filename, speedup) for filename, speedup in speedups.items()]
     file_speedups.sort(key=lambda x: x[1], reverse=True)
     
-    avg_speedup = statistics.mean(speedup_values)
-    improvement_pct = (avg_speedup - 1.0) * 100
+    improvement_pct = (summary.geometric_mean - 1.0) * 100
     
     # Calculate total time savings
     total_baseline_time = sum(extract_proving_time(baseline_metrics[f]) for f in speedups.keys())
@@ -173,9 +143,10 @@ def analyze_speedups(speedups: Dict[str, float], baseline_metrics: Dict[str, Dic
         pct_str = "(+0.0%)"
     else:
         pct_str = f"({improvement_pct:+.1f}%)"
-    print(f"  Average speedup: {avg_speedup:.2f}x {pct_str}")
-    print(f"  Min speedup: {min(speedup_values):.2f}x")
-    print(f"  Max speedup: {max(speedup_values):.2f}x")
+    print(f"  Geometric mean speedup: {summary.geometric_mean:.2f}x {pct_str}, {format_ci(summary)}")
+    print(f"  Arithmetic mean speedup: {summary.arithmetic_mean:.2f}x")
+    print(f"  Min speedup: {summary.minimum:.2f}x")
+    print(f"  Max speedup: {summary.maximum:.2f}x")
     print(f"  Total baseline time: {total_baseline_time:,.0f} seconds")
     print(f"  Total optimized time: {total_optimized_time:,.0f} seconds")
     print(f"  Total time saved: {total_time_saved:,.0f} seconds")
@@ -201,17 +172,160 @@ def analyze_speedups(speedups: Dict[str, float], baseline_metrics: Dict[str, Dic
                 time_str = f"lost {abs(time_diff):,.0f} s"
             print(f"    {i+1}. {filename}: {speedup:.2f}x ({time_str})")
 
+def proven_cycles(metrics_data: Dict, execution_metrics: Dict[str, Dict], filename: str) -> Optional[int]:
+    """Cycle count of a proven file, from its execution run or from the file itself."""
+    execution_data = execution_metrics.get(filename)
+    return total_cycles(execution_data) if execution_data is not None else total_cycles(metrics_data)
+
+def print_group_totals(speedups: Dict[str, float], baseline_metrics: Dict[str, Dict],
+                       optimized_metrics: Dict[str, Dict], baseline_execution: Dict[str, Dict],
+                       optimized_execution: Dict[str, Dict]):
+    """Print total proving time and proven cycles per second for every zkVM version."""
+    # group -> [files, baseline secs, optimized secs, baseline cycles, baseline cycle secs, optimized ...]
+    totals: Dict[str, List[float]] = {}
+    for filename in speedups:
+        baseline_time = extract_proving_time(baseline_metrics[filename])
+        optimized_time = extract_proving_time(optimized_metrics[filename])
+        group = totals.setdefault(group_name(filename), [0, 0.0, 0.0, 0, 0.0, 0, 0.0])
+        group[0] += 1
+        group[1] += baseline_time
+        group[2] += optimized_time
+        cycles = proven_cycles(baseline_metrics[filename], baseline_execution, filename)
+        if cycles is not None:
+            group[3] += cycles
+            group[4] += baseline_time
+        cycles = proven_cycles(optimized_metrics[filename], optimized_execution, filename)
+        if cycles is not None:
+            group[5] += cycles
+            group[6] += optimized_time
+
+    print("\n" + "="*80)
+    print("PROVING TIME PER ZKVM VERSION")
+    print("="*80)
+    group_width = max([len(name) for name in totals] + [20]) + 2
+    header = ("Group".ljust(group_width) + "Files".ljust(8) + "Baseline (s)".ljust(15) + "Optimized (s)".ljust(15) +
+              "Saved (s)".ljust(15) + "Speedup".ljust(10) + "Mcycles/s base".ljust(16) + "Mcycles/s opt".ljust(16) +
+              "Change")
+    print(header)
+    print("-" * len(header))
+    for name in sorted(totals):
+        files, base_secs, opt_secs, base_cycles, base_cycle_secs, opt_cycles, opt_cycle_secs = totals[name]
+        base_rate = base_cycles / 1_000_000 / base_cycle_secs if base_cycle_secs else None
+        opt_rate = opt_cycles / 1_000_000 / opt_cycle_secs if opt_cycle_secs else None
+        print((name or "(root)").ljust(group_width) + str(files).ljust(8) + f"{base_secs:,.0f}".ljust(15) +
+              f"{opt_secs:,.0f}".ljust(15) + f"{base_secs - opt_secs:,.0f}".ljust(15) +
+              format_change(base_secs, opt_secs, higher_is_better=False).ljust(10) +
+              format_throughput(base_rate).ljust(16) + format_throughput(opt_rate).ljust(16) +
+              format_change(base_rate, opt_rate, higher_is_better=True))
+    if not any(group[3] or group[5] for group in totals.values()):
+        print("\nNo cycle counts found; pass --baseline-execution/--optimized-execution for Mcycles/s")
+
+def calculate_proof_size_changes(baseline_metrics: Dict[str, Dict],
+                                 optimized_metrics: Dict[str, Dict]) -> Dict[str, Tuple[int, int]]:
+    """`(baseline, optimized)` proof size of every common file with both sizes."""
+    sizes = {}
+    for filename in set(baseline_metrics) & set(optimized_metrics):
+        baseline_size = extract_proof_size(baseline_metrics[filename])
+        optimized_size = extract_proof_size(optimized_metrics[filename])
+        if baseline_size and optimized_size:
+            sizes[filename] = (baseline_size, optimized_size)
+    return sizes
+
+def print_proof_sizes(sizes: Dict[str, Tuple[int, int]]):
+    """Print average proof sizes per zkVM version and the files whose proofs changed most."""
+    print("\n" + "="*80)
+    print("PROOF SIZE")
+    print("="*80)
+    if not sizes:
+        print("No proof sizes found")
+        return
+
+    groups: Dict[str, List[int]] = {}
+    for filename, (baseline_size, optimized_size) in sizes.items():
+        group = groups.setdefault(group_name(filename), [0, 0, 0, 0])
+        group[0] += 1
+        group[1] += baseline_size
+        group[2] += optimized_size
+        group[3] += baseline_size != optimized_size
+
+    group_width = max([len(name) for name in groups] + [20]) + 2
+    header = ("Group".ljust(group_width) + "Files".ljust(8) + "Baseline avg (B)".ljust(18) +
+              "Optimized avg (B)".ljust(19) + "Change".ljust(10) + "Files changed")
+    print(header)
+    print("-" * len(header))
+    for name in sorted(groups):
+        files, baseline_total, optimized_total, changed = groups[name]
+        change_pct = (optimized_total / baseline_total - 1.0) * 100
+        print((name or "(root)").ljust(group_width) + str(files).ljust(8) +
+              f"{baseline_total / files:,.0f}".ljust(18) + f"{optimized_total / files:,.0f}".ljust(19) +
+              f"{change_pct:+.1f}%".ljust(10) + str(changed))
+
+    changes = sorted(
+        ((optimized_size - baseline_size, filename, baseline_size, optimized_size)
+         for filename, (baseline_size, optimized_size) in sizes.items() if optimized_size != baseline_size),
+        key=lambda item: (item[0], item[1])
+    )
+    if changes:
+        print("  Largest proof size decreases:")
+        for delta, filename, baseline_size, optimized_size in [c for c in changes if c[0] < 0][:3]:
+            print(f"    {filename}: {baseline_size:,} -> {optimized_size:,} bytes ({delta:+,})")
+        print("  Largest proof size increases:")
+        for delta, filename, baseline_size, optimized_size in [c for c in reversed(changes) if c[0] > 0][:3]:
+            print(f"    {filename}: {baseline_size:,} -> {optimized_size:,} bytes ({delta:+,})")
+
+def print_gas_throughput(baseline_metrics: Dict[str, Dict], optimized_metrics: Dict[str, Dict],
+                         files: List[str]):
+    """Print gas-normalized proving throughput per subfolder and rank the subfolders."""
+    baseline = throughput_by_group(baseline_metrics, files)
+    optimized = throughput_by_group(optimized_metrics, files)
+
+    print("\n" + "="*80)
+    print("GAS-NORMALIZED THROUGHPUT")
+    print("="*80)
+    if not any(totals.files for totals in optimized.values()):
+        print("No block_used_gas metadata found")
+        return
+
+    print_throughput_table(baseline, optimized, [
+        ("Prove Mgas/s", "proving_mgas_per_sec", True),
+    ])
+    print_rankings("proving Mgas/s", baseline, optimized, "proving_mgas_per_sec", higher_is_better=True)
+
 def main():
     """Main function."""
-    if len(sys.argv) != 3:
-        print("Usage: python3 compare_provings.py <baseline_folder> <optimized_folder>")
-        print("\nExample:")
-        print("  python3 compare_provings.py foo-baseline foo-optimized")
-        print("  python3 compare_provings.py /path/to/baseline /path/to/optimized")
-        sys.exit(1)
-    
-    baseline_folder = sys.argv[1]
-    optimized_folder = sys.argv[2]
+    parser = argparse.ArgumentParser(
+        description="Compare proving time metrics between a baseline and an optimized run",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""Example:
+  python3 compare_provings.py foo-baseline foo-optimized
+  python3 compare_provings.py /path/to/baseline /path/to/optimized
+  python3 compare_provings.py results.sqlite#baseline results.sqlite#optimized
+  python3 compare_provings.py base opt --gate --threshold proving_time=5 --json-report gate.json"""
+    )
+    parser.add_argument("baseline_folder",
+                        help="Folder with the baseline metrics, or a results store (<file>.sqlite[#<run>])")
+    parser.add_argument("optimized_folder",
+                        help="Folder with the optimized metrics, or a results store (<file>.sqlite[#<run>])")
+    parser.add_argument("-j", "--jobs", type=int, default=None,
+                        help="Number of worker processes used to parse metrics (default: CPU count)")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Do not read or update the metrics cache stored in each folder")
+    parser.add_argument("--baseline-repeat", action="append", default=[], metavar="FOLDER",
+                        help="Folder with a repeated baseline run; may be given several times")
+    parser.add_argument("--optimized-repeat", action="append", default=[], metavar="FOLDER",
+                        help="Folder with a repeated optimized run; may be given several times")
+    parser.add_argument("--alpha", type=float, default=0.05,
+                        help="Significance level for repeated-run tests (default: 0.05)")
+    parser.add_argument("--baseline-execution", metavar="FOLDER",
+                        help="Execution run of the baseline fixtures, for proven cycles per second")
+    parser.add_argument("--optimized-execution", metavar="FOLDER",
+                        help="Execution run of the optimized fixtures, for proven cycles per second")
+    add_gate_arguments(parser, "proving_time, proof_size")
+    args = parser.parse_args()
+    validate_gate_arguments(parser, args)
+
+    baseline_folder = args.baseline_folder
+    optimized_folder = args.optimized_folder
     
     # Convert to absolute paths if relative paths are provided
     if not os.path.isabs(baseline_folder):
@@ -220,20 +334,26 @@ def main():
         optimized_folder = os.path.abspath(optimized_folder)
     
     print(f"Loading baseline metrics from: {baseline_folder}")
-    baseline_metrics = load_metrics(baseline_folder)
+    baseline_metrics = load_metrics(baseline_folder, args.jobs, not args.no_cache)
     print(f"Loaded {len(baseline_metrics)} baseline files")
     
     print(f"\nLoading optimized metrics from: {optimized_folder}")
-    optimized_metrics = load_metrics(optimized_folder)
+    optimized_metrics = load_metrics(optimized_folder, args.jobs, not args.no_cache)
     print(f"Loaded {len(optimized_metrics)} optimized files")
     
     print("\nCalculating speedups...")
     speedups, files = calculate_speedups(baseline_metrics, optimized_metrics)
     print(f"Found {len(speedups)} common files")
     
+    failures = candidate_failures(baseline_metrics, optimized_metrics, "proving") if args.gate else {}
     if not speedups:
         print("No common files found or no valid data")
-        return
+        if args.gate:
+            # Nothing comparable never passes, but the crashed and missing files are still reported
+            context = {"baseline": baseline_folder, "optimized": optimized_folder, "files": 0}
+            run_gate(args, "compare_provings", {}, context, failures)
+            return 1
+        return 0
     
     print("\n" + "="*80)
     print("PROVING TIME SPEEDUP COMPARISON TABLE")
@@ -242,14 +362,28 @@ def main():
     
     analyze_speedups(speedups, baseline_metrics, optimized_metrics)
     
+    execution_runs = []
+    for folder in (args.baseline_execution, args.optimized_execution):
+        if folder:
+            print(f"\nLoading execution metrics from: {folder}")
+            execution_runs.append(load_metrics(os.path.abspath(folder), args.jobs, not args.no_cache))
+        else:
+            execution_runs.append({})
+    print_group_totals(speedups, baseline_metrics, optimized_metrics, *execution_runs)
+    
+    proof_sizes = calculate_proof_size_changes(baseline_metrics, optimized_metrics)
+    print_proof_sizes(proof_sizes)
+    
+    print_gas_throughput(baseline_metrics, optimized_metrics, files)
+    
     # Summary of key findings
     print("\n" + "="*80)
     print("KEY FINDINGS")
     print("="*80)
     
     # Calculate overall metrics
-    speedup_values = list(speedups.values())
-    avg_speedup = statistics.mean(speedup_values)
+    summary = summarize_speedups(list(speedups.values()))
+    avg_speedup = summary.geometric_mean
     improvement_pct = (avg_speedup - 1.0) * 100
     
     # Calculate total time savings
@@ -259,8 +393,8 @@ def main():
     
     print(f"\nTotal files analyzed: {len(speedups)}")
     
-    # Only show IMPROVEMENT/REGRESSION if change is > 0.5%
-    if abs(improvement_pct) > 0.5:
+    # Only show IMPROVEMENT/REGRESSION if change is > 0.5% and outside the confidence interval
+    if abs(improvement_pct) > 0.5 and summary.significant:
         status = "IMPROVEMENT" if avg_speedup > 1.0 else "REGRESSION"
     else:
         status = "NO CHANGE"
@@ -271,12 +405,41 @@ def main():
     else:
         pct_str = f"({improvement_pct:+.1f}%)"
         
-    print(f"\n🎯 OVERALL PROVING PERFORMANCE: {avg_speedup:.2f}x {pct_str} - {status}")
+    print(f"\n🎯 OVERALL PROVING PERFORMANCE: {avg_speedup:.2f}x {pct_str} {format_ci(summary)} - {status}")
     print(f"   Total time saved: {total_time_saved:,.0f} seconds")
     
     if avg_speedup > 1.0:
         efficiency_gain = (1 - 1/avg_speedup) * 100
         print(f"   Efficiency gain: {efficiency_gain:.1f}% reduction in proving time")
+    
+    if proof_sizes:
+        baseline_total = sum(baseline_size for baseline_size, _ in proof_sizes.values())
+        optimized_total = sum(optimized_size for _, optimized_size in proof_sizes.values())
+        size_change_pct = (optimized_total / baseline_total - 1.0) * 100
+        print(f"   Average proof size: {baseline_total / len(proof_sizes):,.0f} -> "
+              f"{optimized_total / len(proof_sizes):,.0f} bytes ({size_change_pct:+.1f}%)")
+    
+    if args.baseline_repeat or args.optimized_repeat:
+        baseline_runs = [baseline_metrics] + [
+            load_metrics(os.path.abspath(folder), args.jobs, not args.no_cache) for folder in args.baseline_repeat
+        ]
+        optimized_runs = [optimized_metrics] + [
+            load_metrics(os.path.abspath(folder), args.jobs, not args.no_cache) for folder in args.optimized_repeat
+        ]
+        comparisons = compare_samples(
+            collect_samples(baseline_runs, proving_seconds),
+            collect_samples(optimized_runs, proving_seconds),
+        )
+        print_significance_table(comparisons, args.alpha, "proving_time_ms")
+    
+    if args.gate:
+        context = {"baseline": baseline_folder, "optimized": optimized_folder, "files": len(speedups)}
+        # A smaller proof is an improvement, so its "speedup" is baseline / optimized size
+        size_ratios = {filename: baseline_size / optimized_size
+                       for filename, (baseline_size, optimized_size) in proof_sizes.items()}
+        return run_gate(args, "compare_provings", {"proving_time": speedups, "proof_size": size_ratios}, context,
+                        failures)
+    return 0
 
 if __name__ == "__main__":
-    main()
+    exit(main())
@@ -0,0 +1,302 @@
+#!/usr/bin/env python3
+"""
+Script to compare many benchmark runs at once, e.g. several zkVM SDK versions
+or a series of nightly runs.
+
+Usage:
+    python3 compare_runs.py <run> <run> [<run> ...] [--baseline RUN] [--pairwise] [--proving]
+
+Example:
+    python3 compare_runs.py nightly-01 nightly-02 nightly-03 nightly-04 --baseline nightly-01
+    python3 compare_runs.py results.sqlite#v1 results.sqlite#v2 results.sqlite#v3 --pairwise
+
+Every run is a metrics folder or a results store run, as accepted by
+compare_executions.py. Files are matched across runs on their EL, zkVM and
+test name, ignoring the zkVM version, so runs of different SDK versions can
+be compared; runs without --labels are named after their zkVM versions or the
+part of their path that tells them apart. Execution runs are compared on
+every region of region_cycles, total_num_cycles and execution_duration; with
+--proving, on proving_time_ms.
+
+Output includes:
+- A matrix of geometric-mean speedups of every run against the baseline, per metric
+- With --pairwise, one run-by-run speedup matrix per metric
+- Runs ranked per metric, optionally with bootstrap confidence intervals (--ci)
+
+Each run is reduced to one number per file and metric as soon as it is loaded
+and speedups are computed on demand, so memory grows linearly with the number
+of runs.
+"""
+
+import argparse
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from compare_executions import abbreviate_region_name, extract_region_cycles
+from gas_metrics import execution_seconds, group_name, proving_seconds
+from metrics_loader import load_metrics, locate_result_file, parse_store_source
+from speedup_stats import format_ci, geometric_mean, summarize_speedups
+
+EXECUTION_DURATION = "execution_duration"
+PROVING_TIME = "proving_time"
+
+
+@dataclass
+class RunValues:
+    """One number per metric and file of a run; lower values are better."""
+    label: str
+    source: str
+    files: int
+    values: Dict[str, Dict[str, float]]
+
+
+def match_key(filename: str) -> str:
+    """
+    Key a file is matched on across runs: its EL, zkVM and test name without
+    the zkVM version, e.g. `reth/sp1/test_worst_add` for the `load_metrics` key
+    `reth/sp1-v5.0.0/test_worst_add`.
+    """
+    el, zkvm, _, _, _ = locate_result_file(Path(f"{filename}.json"))
+    return f"{el}/{zkvm}/{filename.rsplit('/', 1)[-1]}"
+
+
+def run_versions(metrics: Dict[str, Dict]) -> str:
+    """The `<zkvm>-<version>` folders of a run, e.g. `sp1-v5.0.0,zisk-v0.12.0`."""
+    return ",".join(sorted({group_name(filename).rsplit("/", 1)[-1] for filename in metrics}))
+
+
+def extract_values(metrics: Dict[str, Dict], proving: bool) -> Dict[str, Dict[str, float]]:
+    """
+    Reduce loaded metrics to `metric -> match key -> value`, keeping only
+    positive values. When a run holds several versions of a zkVM, the last
+    version in name order wins.
+    """
+    values: Dict[str, Dict[str, float]] = {}
+    keys = {filename: match_key(filename) for filename in metrics}
+    duplicates = len(keys) - len(set(keys.values()))
+    if duplicates:
+        print(f"Warning: {duplicates} files have the same EL, zkVM and test as a file of another zkVM version, "
+              "keeping the last version")
+    for filename in sorted(metrics):
+        data = metrics[filename]
+        if proving:
+            measurements = {PROVING_TIME: proving_seconds(data)}
+        else:
+            measurements = dict(extract_region_cycles(data))
+            measurements[EXECUTION_DURATION] = execution_seconds(data)
+        for metric, value in measurements.items():
+            if value:
+                values.setdefault(metric, {})[keys[filename]] = value
+    return values
+
+
+def run_label(source: str) -> str:
+    """Default label of a run: the store run label or the folder name."""
+    store_source = parse_store_source(source)
+    if store_source is not None:
+        store_path, run = store_source
+        return run or store_path.stem
+    path = Path(source).resolve()
+    # EL folders such as zkevm-metrics/reth are named after their parent
+    return f"{path.parent.name}/{path.name}" if path.parent.name.startswith("zkevm-metrics") else path.name
+
+
+def source_parts(source: str) -> Tuple[str, ...]:
+    """Path components of a metrics folder or of the database of a results store run."""
+    store_source = parse_store_source(source)
+    return (store_source[0] if store_source else Path(source)).resolve().parts
+
+
+def distinct_labels(labels: List[str], sources: List[str], versions: List[str]) -> List[str]:
+    """
+    Tell apart runs that share a default label by their zkVM versions, or else
+    by the last path component in which their sources differ.
+    """
+    labels = list(labels)
+    for label in sorted(set(labels)):
+        same = [i for i, other in enumerate(labels) if other == label]
+        if len(same) < 2:
+            continue
+        candidates = [versions[i] for i in same]
+        if len(set(candidates)) < len(same) or not all(candidates):
+            parts = [source_parts(sources[i]) for i in same]
+            for depth in range(1, min(len(part) for part in parts) + 1):
+                components = [part[-depth] for part in parts]
+                if len(set(components)) == len(same):
+                    candidates = [f"{component}/{label}" for component in components]
+                    break
+        if len(set(candidates)) == len(same):
+            for i, candidate in zip(same, candidates):
+                labels[i] = candidate
+    return labels
+
+
+def load_runs(sources: List[str], labels: Optional[List[str]], proving: bool,
+              workers: Optional[int], use_cache: bool) -> List[RunValues]:
+    runs = []
+    versions = []
+    for i, source in enumerate(sources):
+        if not parse_store_source(source) and not os.path.isabs(source):
+            source = os.path.abspath(source)
+        print(f"Loading run {i + 1} from: {source}")
+        metrics = load_metrics(source, workers, use_cache)
+        runs.append(RunValues("", source, len(metrics), extract_values(metrics, proving)))
+        versions.append(run_versions(metrics))
+        print(f"Loaded {len(metrics)} files")
+
+    if not labels:
+        labels = distinct_labels([run_label(run.source) for run in runs], [run.source for run in runs], versions)
+    # Keep labels unique so they can be used to select the baseline
+    seen: Dict[str, int] = {}
+    for run, label in zip(runs, labels):
+        seen[label] = seen.get(label, 0) + 1
+        run.label = label if seen[label] == 1 else f"{label}#{seen[label]}"
+    return runs
+
+
+def ordered_metrics(runs: List[RunValues]) -> List[str]:
+    """All metrics of all runs: regions by name, then total cycles and wall time."""
+    metrics = sorted({metric for run in runs for metric in run.values})
+    for last in ("total_num_cycles", EXECUTION_DURATION):
+        if last in metrics:
+            metrics.remove(last)
+            metrics.append(last)
+    return metrics
+
+
+def ratios(baseline: Dict[str, float], candidate: Dict[str, float]) -> List[float]:
+    """Per-file speedups of `candidate` over `baseline` on their common files."""
+    if len(candidate) < len(baseline):
+        return [baseline[f] / value for f, value in candidate.items() if f in baseline]
+    return [value / candidate[f] for f, value in baseline.items() if f in candidate]
+
+
+def speedup(baseline: RunValues, candidate: RunValues, metric: str) -> Optional[float]:
+    """Geometric-mean speedup of `candidate` over `baseline` for `metric`."""
+    values = ratios(baseline.values.get(metric, {}), candidate.values.get(metric, {}))
+    return geometric_mean(values) if values else None
+
+
+def format_speedup(value: Optional[float]) -> str:
+    return f"{value:.2f}x" if value is not None else "N/A"
+
+
+def print_baseline_matrix(runs: List[RunValues], baseline: RunValues, metrics: List[str]):
+    """Print one row per run and one column per metric, each cell the speedup over the baseline."""
+    print("\n" + "="*80)
+    print(f"SPEEDUP MATRIX vs {baseline.label}")
+    print("="*80)
+    label_width = max(max(len(run.label) for run in runs) + 2, 20)
+    header = "Run".ljust(label_width) + "Files".ljust(8)
+    for metric in metrics:
+        header += abbreviate_region_name(metric).ljust(14)
+    print(header)
+    print("-" * len(header))
+    for run in runs:
+        row = run.label.ljust(label_width) + str(run.files).ljust(8)
+        for metric in metrics:
+            row += format_speedup(speedup(baseline, run, metric)).ljust(14)
+        print(row)
+
+
+def print_pairwise_matrices(runs: List[RunValues], metrics: List[str]):
+    """Print a run-by-run matrix per metric; a cell is the speedup of the column run over the row run."""
+    label_width = max(max(len(run.label) for run in runs) + 2, 20)
+    column_width = max(max(len(run.label) for run in runs) + 2, 10)
+    for metric in metrics:
+        print("\n" + "="*80)
+        print(f"PAIRWISE SPEEDUPS: {metric} (column run over row run)")
+        print("="*80)
+        header = "".ljust(label_width) + "".join(run.label.ljust(column_width) for run in runs)
+        print(header)
+        print("-" * len(header))
+        for row_run in runs:
+            row = row_run.label.ljust(label_width)
+            for column_run in runs:
+                value = 1.0 if column_run is row_run else speedup(row_run, column_run, metric)
+                row += format_speedup(value).ljust(column_width)
+            print(row)
+
+
+def print_rankings(runs: List[RunValues], baseline: RunValues, metrics: List[str], with_ci: bool):
+    """Rank the runs per metric by their speedup over the baseline."""
+    print("\n" + "="*80)
+    print(f"RANKINGS (speedup vs {baseline.label}, higher is better)")
+    print("="*80)
+    for metric in metrics:
+        ranked = []
+        for run in runs:
+            values = ratios(baseline.values.get(metric, {}), run.values.get(metric, {}))
+            if values:
+                ranked.append((run, geometric_mean(values), values))
+        if not ranked:
+            continue
+        ranked.sort(key=lambda item: item[1], reverse=True)
+
+        print(f"\n{metric.upper().replace('_', ' ')}:")
+        for i, (run, value, values) in enumerate(ranked):
+            line = f"  {i+1}. {run.label}: {value:.2f}x over {len(values)} files"
+            if with_ci and run is not baseline:
+                line += f", {format_ci(summarize_speedups(values))}"
+            print(line)
+
+
+def main():
+    """Main function."""
+    parser = argparse.ArgumentParser(
+        description="Compare many benchmark runs against a baseline or pairwise",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""Example:
+  python3 compare_runs.py nightly-01 nightly-02 nightly-03 --baseline nightly-01
+  python3 compare_runs.py results.sqlite#v1 results.sqlite#v2 results.sqlite#v3 --pairwise
+  python3 compare_runs.py proving-v1 proving-v2 proving-v3 --proving"""
+    )
+    parser.add_argument("runs", nargs="+",
+                        help="Metrics folders or results store runs (<file>.sqlite[#<run>]) to compare")
+    parser.add_argument("--labels", nargs="+", default=None, help="Display labels, one per run")
+    parser.add_argument("--baseline", default=None,
+                        help="Label or 1-based position of the baseline run (default: the first run)")
+    parser.add_argument("--pairwise", action="store_true",
+                        help="Also print a run-by-run speedup matrix per metric")
+    parser.add_argument("--proving", action="store_true",
+                        help="Compare proving_time_ms instead of execution metrics")
+    parser.add_argument("--ci", action="store_true",
+                        help="Add bootstrap confidence intervals to the rankings")
+    parser.add_argument("-j", "--jobs", type=int, default=None,
+                        help="Number of worker processes used to parse metrics (default: CPU count)")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Do not read or update the metrics cache stored in each folder")
+    args = parser.parse_args()
+
+    if len(args.runs) < 2:
+        parser.error("at least two runs are required")
+    if args.labels and len(args.labels) != len(args.runs):
+        parser.error("--labels needs one label per run")
+
+    runs = load_runs(args.runs, args.labels, args.proving, args.jobs, not args.no_cache)
+
+    baseline = runs[0]
+    if args.baseline is not None:
+        by_label = {run.label: run for run in runs}
+        if args.baseline in by_label:
+            baseline = by_label[args.baseline]
+        elif args.baseline.isdigit() and 1 <= int(args.baseline) <= len(runs):
+            baseline = runs[int(args.baseline) - 1]
+        else:
+            parser.error(f"unknown baseline '{args.baseline}', expected one of {list(by_label)}")
+
+    metrics = ordered_metrics(runs)
+    if not metrics:
+        print("No comparable data found")
+        return 1
+
+    print_baseline_matrix(runs, baseline, metrics)
+    if args.pairwise:
+        print_pairwise_matrices(runs, metrics)
+    print_rankings(runs, baseline, metrics, args.ci)
+    return 0
+
+if __name__ == "__main__":
+    exit(main())
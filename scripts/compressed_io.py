@@ -0,0 +1,135 @@
+"""
+Transparent compression for the JSON files read and written by the scripts.
+
+Fixtures and metrics may be stored as `<name>.json`, `<name>.json.gz`,
+`<name>.json.zst` or `<name>.json.lz4`; the codec is picked from the file
+name:
+
+- `.gz` uses the standard library `gzip` module.
+- `.zst` needs the `zstandard` package and `.lz4` the `lz4` package. Both are
+  optional; opening such a file without the package raises a ValueError
+  naming the package to install.
+- Anything else is read and written as is.
+
+`open_file` streams through the codec in both directions, so a file is never
+held in memory in compressed and decompressed form at the same time, and
+`json_stem` gives the name of a file without its JSON and compression
+suffixes, i.e. the test or fixture name, whatever format it is stored in.
+"""
+
+import gzip
+import io
+from pathlib import Path
+from typing import IO, Any, List, Optional, Tuple
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+try:
+    import lz4.frame as lz4_frame
+except ImportError:
+    lz4_frame = None
+
+JSON_SUFFIX = '.json'
+# Compression suffix -> package needed to read and write it
+COMPRESSION_SUFFIXES = {'.gz': 'gzip', '.zst': 'zstandard', '.lz4': 'lz4'}
+JSON_SUFFIXES = (JSON_SUFFIX,) + tuple(JSON_SUFFIX + suffix for suffix in COMPRESSION_SUFFIXES)
+COMPRESSION_CHOICES = ['none'] + [suffix[1:] for suffix in COMPRESSION_SUFFIXES]
+
+# Errors raised while reading a file that is missing, truncated or corrupted
+READ_ERRORS: Tuple[type, ...] = (OSError, ValueError, EOFError)
+if zstandard is not None:
+    READ_ERRORS += (zstandard.ZstdError,)
+
+
+class _LZ4Reader(io.RawIOBase):
+    """
+    Decompressing reader of an lz4 file. lz4 reports corrupted data with a
+    bare RuntimeError, which is raised as a ValueError instead so callers do
+    not have to catch every RuntimeError.
+    """
+
+    def __init__(self, path: Any):
+        self._stream = lz4_frame.open(path, 'rb')
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        try:
+            data = self._stream.read(len(buffer))
+        except RuntimeError as e:
+            raise ValueError(f"corrupted lz4 data: {e}") from e
+        buffer[:len(data)] = data
+        return len(data)
+
+    def close(self) -> None:
+        if not self.closed:
+            self._stream.close()
+        super().close()
+
+
+def compression_suffix(path: Any) -> str:
+    """The compression suffix of `path` (e.g. `.gz`), or '' if it is not compressed."""
+    suffix = Path(path).suffix
+    return suffix if suffix in COMPRESSION_SUFFIXES else ''
+
+
+def is_json_file(path: Any) -> bool:
+    """Return True if `path` names a JSON file, compressed or not."""
+    return Path(path).name.endswith(JSON_SUFFIXES)
+
+
+def json_stem(path: Any) -> str:
+    """The name of `path` without its JSON and compression suffixes."""
+    name = Path(path).name
+    for suffix in sorted(JSON_SUFFIXES, key=len, reverse=True):
+        if name.endswith(suffix):
+            return name[:-len(suffix)]
+    return Path(path).stem
+
+
+def json_file_name(stem: str, compression: str = 'none') -> str:
+    """File name for `stem` stored with `compression` (one of COMPRESSION_CHOICES)."""
+    return stem + JSON_SUFFIX + ('' if compression == 'none' else f".{compression}")
+
+
+def find_json_files(folder: Path, recursive: bool = False) -> List[Path]:
+    """All JSON files, compressed or not, in `folder` (and below it when `recursive`), sorted."""
+    paths = folder.rglob('*.json*') if recursive else folder.glob('*.json*')
+    return sorted(path for path in paths if is_json_file(path) and path.is_file())
+
+
+def open_file(path: Any, mode: str = 'rb', compression: Optional[str] = None) -> IO:
+    """
+    Open `path` for streaming reads (`r`, `rb`) or writes (`w`, `wb`),
+    compressing or decompressing according to its suffix, or according to
+    `compression` (a suffix such as `.zst`, '' for none) when given. Text
+    modes use UTF-8.
+    """
+    suffix = compression_suffix(path) if compression is None else compression
+    text = 'b' not in mode
+    binary_mode = mode.replace('t', '').replace('b', '') + 'b'
+    writing = binary_mode[0] in 'wax'
+
+    if not suffix:
+        return open(path, mode, encoding='utf-8') if text else open(path, mode)
+    if suffix == '.gz':
+        stream = gzip.open(path, binary_mode, compresslevel=6)
+    elif suffix == '.zst':
+        if zstandard is None:
+            raise ValueError(f"{path} is zstd-compressed; install the zstandard package to use it")
+        raw = open(path, binary_mode)
+        if writing:
+            stream = zstandard.ZstdCompressor(level=9).stream_writer(raw, closefd=True)
+        else:
+            stream = zstandard.ZstdDecompressor().stream_reader(raw, closefd=True)
+    elif suffix == '.lz4':
+        if lz4_frame is None:
+            raise ValueError(f"{path} is lz4-compressed; install the lz4 package to use it")
+        stream = lz4_frame.open(path, binary_mode) if writing else io.BufferedReader(_LZ4Reader(path))
+    else:
+        raise ValueError(f"unknown compression {suffix}")
+    return io.TextIOWrapper(stream, encoding='utf-8') if text else stream
@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+"""
+Script to find pathological EEST benchmark fixtures, i.e. the opcodes and
+precompiles that are unusually expensive to prove on a zkVM.
+
+Usage:
+    python3 find_hotspots.py <metrics_folder> [--threshold 3.5] [--top 50]
+
+Example:
+    python3 find_hotspots.py zkevm-metrics/reth
+    python3 find_hotspots.py results.sqlite#nightly --json hotspots.json
+
+For every `test_worst_<opcode or precompile>[...]` fixture the cost is
+measured as execution cycles per million gas. A fixture is flagged when it is
+a robust outlier (median/MAD z-score above --threshold):
+
+- against its own zkVM: its cycles/Mgas compared to all fixtures on that zkVM
+- against the other zkVMs: its cost relative to the zkVM's median, compared to
+  the same fixture's relative cost on the other zkVMs of the same EL
+
+Output includes:
+- A ranked list of flagged fixtures per zkVM
+- A ranking of opcodes and precompiles by how often and how badly they are hotspots
+"""
+
+import argparse
+import json
+import math
+import re
+import statistics
+from dataclasses import asdict, dataclass
+from typing import Dict, List, Optional, Sequence
+
+from compressed_io import open_file
+from gas_metrics import MGAS, block_gas, format_throughput, group_name, total_cycles
+from metrics_loader import load_metrics
+
+# Iglewicz and Hoaglin's recommended cut-off for modified z-scores
+DEFAULT_THRESHOLD = 3.5
+# Scales the MAD to the standard deviation of a normal distribution
+MAD_SCALE = 0.6745
+# Scales the mean absolute deviation likewise, used when the MAD is zero
+MEAN_AD_SCALE = 0.7979
+
+HOTSPOT_PATTERN = re.compile(r'test_worst_([^\[]+)')
+
+
+@dataclass
+class FixtureCost:
+    """Cycles per gas of one fixture on one zkVM, with its outlier scores."""
+    group: str
+    fixture: str
+    target: str
+    cycles_per_mgas: float
+    relative_cost: float = 1.0
+    self_score: float = 0.0
+    peer_factor: Optional[float] = None
+    peer_score: Optional[float] = None
+
+    @property
+    def scope(self) -> str:
+        """EL prefix of the group; fixtures are only compared to zkVMs of the same EL."""
+        return group_name(self.group)
+
+    def score(self) -> float:
+        return max(self.self_score, self.peer_score or 0.0)
+
+    def flagged(self, threshold: float) -> bool:
+        return self.score() > threshold
+
+
+def hotspot_target(name: str) -> Optional[str]:
+    """Opcode or precompile exercised by a `test_worst_*` fixture, or None."""
+    match = HOTSPOT_PATTERN.match(name)
+    return match.group(1) if match else None
+
+
+def robust_scores(values: Sequence[float]) -> List[float]:
+    """
+    Modified z-scores, `0.6745 * (x - median) / MAD`. Falls back to the mean
+    absolute deviation when more than half of the values are identical.
+    """
+    if len(values) < 3:
+        return [0.0] * len(values)
+    median = statistics.median(values)
+    deviations = [abs(value - median) for value in values]
+    mad = statistics.median(deviations)
+    if mad > 0:
+        return [MAD_SCALE * (value - median) / mad for value in values]
+    mean_ad = statistics.fmean(deviations)
+    if mean_ad > 0:
+        return [MEAN_AD_SCALE * (value - median) / mean_ad for value in values]
+    return [0.0] * len(values)
+
+
+def collect_costs(metrics: Dict[str, Dict], all_fixtures: bool) -> List[FixtureCost]:
+    """Cycles/Mgas of every successful fixture with gas and cycle data."""
+    costs = []
+    for filename, data in metrics.items():
+        fixture = filename.rsplit("/", 1)[-1]
+        target = hotspot_target(data.get("name", fixture))
+        if target is None:
+            if not all_fixtures:
+                continue
+            target = "(other)"
+        gas = block_gas(data)
+        cycles = total_cycles(data)
+        if gas is None or cycles is None:
+            continue
+        costs.append(FixtureCost(group_name(filename), fixture, target, cycles / (gas / MGAS)))
+    return costs
+
+
+def score_costs(costs: List[FixtureCost]) -> None:
+    """Fill in the relative costs, peer factors and both outlier scores."""
+    by_group: Dict[str, List[FixtureCost]] = {}
+    for cost in costs:
+        by_group.setdefault(cost.group, []).append(cost)
+
+    # Against the zkVM's own distribution, on a log scale as costs are ratios
+    for group_costs in by_group.values():
+        median = statistics.median(cost.cycles_per_mgas for cost in group_costs)
+        scores = robust_scores([math.log(cost.cycles_per_mgas) for cost in group_costs])
+        for cost, score in zip(group_costs, scores):
+            cost.relative_cost = cost.cycles_per_mgas / median
+            cost.self_score = score
+
+    # Against the same fixture on the other zkVMs, after removing each zkVM's baseline cost
+    by_fixture: Dict[tuple, List[FixtureCost]] = {}
+    for cost in costs:
+        by_fixture.setdefault((cost.scope, cost.fixture), []).append(cost)
+    for fixture_costs in by_fixture.values():
+        for cost in fixture_costs:
+            peers = [peer.relative_cost for peer in fixture_costs if peer is not cost]
+            if peers:
+                cost.peer_factor = cost.relative_cost / statistics.median(peers)
+
+    for group_costs in by_group.values():
+        with_peers = [cost for cost in group_costs if cost.peer_factor is not None]
+        scores = robust_scores([math.log(cost.peer_factor) for cost in with_peers])
+        for cost, score in zip(with_peers, scores):
+            cost.peer_score = score
+
+
+def format_factor(value: Optional[float]) -> str:
+    return f"{value:.2f}x" if value is not None else "N/A"
+
+
+def format_score(value: Optional[float]) -> str:
+    return f"{value:.1f}" if value is not None else "N/A"
+
+
+def print_hotspots(costs: List[FixtureCost], threshold: float, top: int):
+    """Print the flagged fixtures of every zkVM, worst first."""
+    flagged = sorted((cost for cost in costs if cost.flagged(threshold)), key=lambda cost: cost.score(), reverse=True)
+
+    print("\n" + "="*80)
+    print(f"HOTSPOT FIXTURES (robust z-score > {threshold})")
+    print("="*80)
+    if not flagged:
+        print("No outliers found")
+        return
+
+    shown = flagged[:top]
+    group_width = max(max(len(cost.group) for cost in shown) + 2, 12)
+    fixture_width = max(max(len(cost.fixture) for cost in shown) + 2, 30)
+    header = ("#".ljust(5) + "zkVM".ljust(group_width) + "Fixture".ljust(fixture_width) + "Cycles/Mgas".ljust(16) +
+              "vs zkVM".ljust(10) + "z".ljust(8) + "vs peers".ljust(10) + "peer z")
+    print(header)
+    print("-" * len(header))
+    for i, cost in enumerate(shown):
+        print(str(i + 1).ljust(5) + cost.group.ljust(group_width) + cost.fixture.ljust(fixture_width) +
+              format_throughput(cost.cycles_per_mgas).ljust(16) + format_factor(cost.relative_cost).ljust(10) +
+              format_score(cost.self_score).ljust(8) + format_factor(cost.peer_factor).ljust(10) +
+              format_score(cost.peer_score))
+    if len(flagged) > top:
+        print(f"... and {len(flagged) - top} more (use --top to show more)")
+
+    print("\nFlagged fixtures per zkVM:")
+    totals: Dict[str, List[int]] = {}
+    for cost in costs:
+        counts = totals.setdefault(cost.group, [0, 0])
+        counts[0] += cost.flagged(threshold)
+        counts[1] += 1
+    for group in sorted(totals):
+        print(f"  {group}: {totals[group][0]} of {totals[group][1]}")
+
+
+def print_target_ranking(costs: List[FixtureCost], threshold: float, top: int):
+    """Rank opcodes and precompiles by their hotspot fixtures."""
+    by_target: Dict[str, List[FixtureCost]] = {}
+    for cost in costs:
+        by_target.setdefault(cost.target, []).append(cost)
+
+    ranking = []
+    for target, target_costs in by_target.items():
+        flagged = [cost for cost in target_costs if cost.flagged(threshold)]
+        if flagged:
+            worst = max(flagged, key=lambda cost: cost.score())
+            ranking.append((target, len(flagged), len(target_costs), worst,
+                            sorted({cost.group for cost in flagged})))
+    ranking.sort(key=lambda item: (item[1], item[3].score()), reverse=True)
+
+    print("\n" + "="*80)
+    print("ACCELERATION TARGETS (opcodes and precompiles with hotspot fixtures)")
+    print("="*80)
+    if not ranking:
+        print("No outliers found")
+        return
+    for i, (target, flagged, total, worst, groups) in enumerate(ranking[:top]):
+        print(f"  {i+1}. {target}: {flagged} of {total} fixture runs flagged, worst {worst.relative_cost:.2f}x "
+              f"the zkVM median on {worst.group} (z={worst.score():.1f}); zkVMs: {', '.join(groups)}")
+
+
+def write_json_report(path: str, costs: List[FixtureCost], threshold: float):
+    flagged = sorted((cost for cost in costs if cost.flagged(threshold)), key=lambda cost: cost.score(), reverse=True)
+    report = {
+        "threshold": threshold,
+        "fixtures": len(costs),
+        "hotspots": [{**asdict(cost), "score": cost.score()} for cost in flagged],
+    }
+    with open_file(path, 'w') as f:
+        json.dump(report, f, indent=2)
+
+
+def main():
+    """Main function."""
+    parser = argparse.ArgumentParser(
+        description="Find outlier test_worst_* fixtures by cycles per gas",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""Example:
+  python3 find_hotspots.py zkevm-metrics/reth
+  python3 find_hotspots.py results.sqlite#nightly --threshold 5 --top 20 --json hotspots.json"""
+    )
+    parser.add_argument("metrics", help="Metrics folder or results store run (<file>.sqlite[#<run>])")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help=f"Robust z-score above which a fixture is flagged (default: {DEFAULT_THRESHOLD})")
+    parser.add_argument("--top", type=int, default=50, help="Number of entries to print per list (default: 50)")
+    parser.add_argument("--all-fixtures", action="store_true",
+                        help="Also include fixtures that are not named test_worst_*")
+    parser.add_argument("--json", metavar="FILE", help="Write the flagged fixtures as JSON")
+    parser.add_argument("-j", "--jobs", type=int, default=None,
+                        help="Number of worker processes used to parse metrics (default: CPU count)")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Do not read or update the metrics cache stored in the folder")
+    args = parser.parse_args()
+
+    print(f"Loading metrics from: {args.metrics}")
+    metrics = load_metrics(args.metrics, args.jobs, not args.no_cache)
+    print(f"Loaded {len(metrics)} files")
+
+    costs = collect_costs(metrics, args.all_fixtures)
+    if not costs:
+        print("No fixtures with gas and cycle data found")
+        return 1
+    score_costs(costs)
+
+    print_hotspots(costs, args.threshold, args.top)
+    print_target_ranking(costs, args.threshold, args.top)
+
+    if args.json:
+        write_json_report(args.json, costs, args.threshold)
+        print(f"\nJSON report written to {args.json}")
+    return 0
+
+if __name__ == "__main__":
+    exit(main())
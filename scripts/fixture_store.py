@@ -0,0 +1,485 @@
+#!/usr/bin/env python3
+"""
+Script to keep fixture folders in a content-addressed, deduplicated and
+compressed store, and to write individual fixtures back out on demand.
+
+Usage:
+    python3 fixture_store.py pack <fixtures_dir> [--set NAME] [--codec zstd|lz4|zlib|none]
+    python3 fixture_store.py list
+    python3 fixture_store.py get --set NAME [names...] [--include STR] -o <dir>
+    python3 fixture_store.py remove --set NAME
+
+Example:
+    python3 fixture_store.py pack zkevm-fixtures-input --set eest-v5.0.0
+    python3 fixture_store.py pack mainnet-fixtures --set mainnet
+    python3 fixture_store.py get --set eest-v5.0.0 --include gas-value_10M -o zkevm-fixtures-input
+
+Every fixture is split along its JSON structure into a Merkle tree of chunks:
+any object, array or string whose encoding reaches --min-chunk bytes becomes
+a chunk of its own, addressed by the SHA-256 of its encoding, and is replaced
+by a reference in its parent. Identical bytecode, trie nodes or the
+`chain_config` added by the mainnet migration are therefore stored once for
+all fixtures of all sets. New chunks are compressed with zstd or lz4 when the
+`zstandard` or `lz4` package is installed and with zlib otherwise; the codec
+is recorded per chunk, so stores stay readable as long as the codecs they
+use are installed.
+
+Fixtures are written back as compact JSON, streamed chunk by chunk, so a
+fixture never has to be held in memory as a whole. Both packing and writing
+back also handle `.json.gz`, `.json.zst` and `.json.lz4` files (see
+compressed_io.py). The result has the same
+content as the packed file but not necessarily the same whitespace. Packing
+a folder again only reads new and changed files, and drops fixtures whose
+file was removed from the set.
+
+The standard library json module is used on purpose: witnesses may contain
+integers wider than 64 bits, which faster decoders silently turn into floats.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sqlite3
+import sys
+import zlib
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, BinaryIO, Callable, Dict, List, Optional, Sequence, Tuple
+
+from compressed_io import (
+    COMPRESSION_CHOICES, READ_ERRORS, compression_suffix, find_json_files, json_file_name, json_stem, open_file
+)
+from metrics_loader import map_files
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+try:
+    import lz4.frame as lz4_frame
+except ImportError:
+    lz4_frame = None
+
+STORE_FILE = 'fixtures-store.sqlite'
+MIN_CHUNK_SIZE = 512
+
+# JSON text never contains a raw NUL byte, so it marks a chunk reference:
+# the marker is followed by the raw digest of the referenced chunk.
+REFERENCE_MARKER = b'\x00'
+DIGEST_SIZE = hashlib.sha256().digest_size
+REFERENCE_SIZE = len(REFERENCE_MARKER) + DIGEST_SIZE
+
+
+def _codecs() -> Dict[str, Tuple[Callable[[bytes], bytes], Callable[[bytes], bytes]]]:
+    """Available codecs as `{name: (compress, decompress)}`, preferred first."""
+    codecs = {}
+    if zstandard is not None:
+        codecs['zstd'] = (zstandard.ZstdCompressor(level=9).compress, zstandard.ZstdDecompressor().decompress)
+    if lz4_frame is not None:
+        codecs['lz4'] = (lz4_frame.compress, lz4_frame.decompress)
+    codecs['zlib'] = (lambda data: zlib.compress(data, 6), zlib.decompress)
+    codecs['none'] = (bytes, bytes)
+    return codecs
+
+
+CODECS = _codecs()
+DEFAULT_CODEC = next(iter(CODECS))
+
+
+def format_bytes(size: float) -> str:
+    for unit in ('B', 'KiB', 'MiB', 'GiB'):
+        if abs(size) < 1024 or unit == 'GiB':
+            return f"{size:.0f} {unit}" if unit == 'B' else f"{size:.1f} {unit}"
+        size /= 1024
+
+
+class ChunkEncoder:
+    """Encodes JSON values into chunk templates, collecting the chunks."""
+
+    def __init__(self, min_chunk_size: int = MIN_CHUNK_SIZE):
+        self.min_chunk_size = min_chunk_size
+        self.chunks: Dict[bytes, bytes] = {}
+
+    def add_chunk(self, data: bytes) -> bytes:
+        """Store `data` as a chunk and return the reference to it."""
+        digest = hashlib.sha256(data).digest()
+        self.chunks.setdefault(digest, data)
+        return REFERENCE_MARKER + digest
+
+    def encode(self, value: Any) -> Tuple[bytes, int]:
+        """
+        Encode `value` as compact JSON with large parts replaced by chunk
+        references. Returns `(template, size of the fully expanded JSON)`.
+        """
+        if isinstance(value, dict):
+            parts, size = [], 1 + max(len(value) - 1, 0)
+            for key, item in value.items():
+                key_data = json.dumps(key).encode()
+                item_data, item_size = self.encode(item)
+                parts.append(key_data + b':' + item_data)
+                size += len(key_data) + 1 + item_size
+            data, size = b'{' + b','.join(parts) + b'}', size + 1
+        elif isinstance(value, list):
+            parts, size = [], 1 + max(len(value) - 1, 0)
+            for item in value:
+                item_data, item_size = self.encode(item)
+                parts.append(item_data)
+                size += item_size
+            data, size = b'[' + b','.join(parts) + b']', size + 1
+        else:
+            data = json.dumps(value).encode()
+            size = len(data)
+
+        if len(data) >= self.min_chunk_size:
+            return self.add_chunk(data), size
+        return data, size
+
+
+def encode_fixture(task: Tuple[Path, int]) -> Tuple[Path, Optional[bytes], int, Dict[bytes, bytes], Optional[str]]:
+    """Split one fixture into chunks; returns `(path, root digest, size, chunks, error)`."""
+    path, min_chunk_size = task
+    try:
+        with open_file(path, 'r') as f:
+            data = json.load(f)
+        encoder = ChunkEncoder(min_chunk_size)
+        template, size = encoder.encode(data)
+        root = template[len(REFERENCE_MARKER):] if template.startswith(REFERENCE_MARKER) else \
+            encoder.add_chunk(template)[len(REFERENCE_MARKER):]
+        return path, root, size, encoder.chunks, None
+    except READ_ERRORS as e:
+        return path, None, 0, {}, str(e)
+
+
+class FixtureStore:
+    """SQLite store of deduplicated, compressed fixture chunks, grouped in named sets."""
+
+    SCHEMA_VERSION = 1
+
+    SCHEMA = '''
+        CREATE TABLE IF NOT EXISTS chunks (
+            digest BLOB PRIMARY KEY,
+            codec TEXT NOT NULL,
+            size INTEGER NOT NULL,
+            data BLOB NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS fixtures (
+            set_name TEXT NOT NULL,
+            name TEXT NOT NULL,
+            root BLOB NOT NULL,
+            size INTEGER NOT NULL,
+            source_size INTEGER NOT NULL,
+            source_mtime_ns INTEGER NOT NULL,
+            PRIMARY KEY (set_name, name)
+        );
+    '''
+
+    def __init__(self, path: Path, create: bool = False):
+        if not create and not path.is_file():
+            raise FileNotFoundError(f"{path} does not exist, run `fixture_store.py pack` first")
+        self.path = path
+        self.conn = sqlite3.connect(str(path))
+        version = self.conn.execute('PRAGMA user_version').fetchone()[0]
+        if version == 0 and create:
+            self.conn.executescript(self.SCHEMA)
+            self.conn.execute(f'PRAGMA user_version = {self.SCHEMA_VERSION}')
+        elif version != self.SCHEMA_VERSION:
+            self.conn.close()
+            raise ValueError(f"{path} is not a fixture store with schema version {self.SCHEMA_VERSION}")
+        self.load_chunk = lru_cache(maxsize=4096)(self._load_chunk)
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def _load_chunk(self, digest: bytes) -> bytes:
+        row = self.conn.execute('SELECT codec, data FROM chunks WHERE digest = ?', (digest,)).fetchone()
+        if row is None:
+            raise ValueError(f"missing chunk {digest.hex()}")
+        codec, data = row
+        if codec not in CODECS:
+            raise ValueError(f"chunk {digest.hex()} is compressed with {codec}, which is not installed")
+        data = CODECS[codec][1](data)
+        if hashlib.sha256(data).digest() != digest:
+            raise ValueError(f"chunk {digest.hex()} is corrupted")
+        return data
+
+    @staticmethod
+    def references(template: bytes) -> List[bytes]:
+        """Digests of the chunks referenced by `template`, in order."""
+        digests, pos = [], template.find(REFERENCE_MARKER)
+        while pos >= 0:
+            digests.append(template[pos + 1:pos + REFERENCE_SIZE])
+            pos = template.find(REFERENCE_MARKER, pos + REFERENCE_SIZE)
+        return digests
+
+    def write_chunk(self, digest: bytes, out: BinaryIO) -> None:
+        """Stream the fully expanded JSON of chunk `digest` to `out`."""
+        data = self.load_chunk(digest)
+        template = memoryview(data)
+        pos, marker = 0, data.find(REFERENCE_MARKER)
+        while marker >= 0:
+            out.write(template[pos:marker])
+            self.write_chunk(data[marker + 1:marker + REFERENCE_SIZE], out)
+            pos = marker + REFERENCE_SIZE
+            marker = data.find(REFERENCE_MARKER, pos)
+        out.write(template[pos:])
+
+    def pack(self, root: Path, set_name: str, codec: str, min_chunk_size: int = MIN_CHUNK_SIZE,
+             workers: Optional[int] = None) -> Tuple[int, int, int, int, List[str]]:
+        """
+        Pack the JSON files below `root` into set `set_name`. Returns
+        `(packed files, unchanged files, new chunks, new stored bytes, errors)`.
+        """
+        compress = CODECS[codec][0]
+        paths = find_json_files(root, recursive=True)
+        stats = {path: path.stat() for path in paths}
+        # Fixtures are named as plain JSON files, whatever compression they were packed from
+        names = {path: (path.parent.relative_to(root) / json_file_name(json_stem(path))).as_posix() for path in paths}
+        known = {name: (size, mtime_ns) for name, size, mtime_ns in self.conn.execute(
+            'SELECT name, source_size, source_mtime_ns FROM fixtures WHERE set_name = ?', (set_name,))}
+        changed = [path for path in paths
+                   if known.get(names[path]) != (stats[path].st_size, stats[path].st_mtime_ns)]
+
+        with self.conn:
+            current = set(names.values())
+            self.conn.executemany('DELETE FROM fixtures WHERE set_name = ? AND name = ?',
+                                  [(set_name, name) for name in known if name not in current])
+
+        new_chunks, new_bytes, errors = 0, 0, []
+        for path, root_digest, size, chunks, error in map_files(
+                encode_fixture, [(path, min_chunk_size) for path in changed], workers):
+            if error is not None:
+                errors.append(f"{path}: {error}")
+                continue
+            rows = []
+            for digest, data in chunks.items():
+                if self.conn.execute('SELECT 1 FROM chunks WHERE digest = ?', (digest,)).fetchone():
+                    continue
+                compressed = compress(data)
+                if len(compressed) < len(data):
+                    rows.append((digest, codec, len(data), compressed))
+                else:
+                    rows.append((digest, 'none', len(data), data))
+                new_bytes += len(rows[-1][3])
+            new_chunks += len(rows)
+            with self.conn:
+                self.conn.executemany('INSERT INTO chunks (digest, codec, size, data) VALUES (?, ?, ?, ?)', rows)
+                self.conn.execute('''
+                    INSERT OR REPLACE INTO fixtures (set_name, name, root, size, source_size, source_mtime_ns)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                ''', (set_name, names[path], root_digest, size, stats[path].st_size, stats[path].st_mtime_ns))
+        return len(changed) - len(errors), len(paths) - len(changed), new_chunks, new_bytes, errors
+
+    def fixtures(self, set_name: str) -> List[Tuple[str, bytes, int]]:
+        """`(name, root digest, size)` of the fixtures in set `set_name`, sorted by name."""
+        return self.conn.execute(
+            'SELECT name, root, size FROM fixtures WHERE set_name = ? ORDER BY name', (set_name,)).fetchall()
+
+    def sets(self) -> List[Tuple[str, int, int, int]]:
+        """`(set name, fixtures, expanded size, source size)` of every set."""
+        return self.conn.execute('''
+            SELECT set_name, COUNT(*), SUM(size), SUM(source_size) FROM fixtures
+            GROUP BY set_name ORDER BY set_name
+        ''').fetchall()
+
+    def chunk_totals(self) -> Tuple[int, int, int]:
+        """`(chunks, uncompressed bytes, stored bytes)` over the whole store."""
+        return self.conn.execute(
+            'SELECT COUNT(*), COALESCE(SUM(size), 0), COALESCE(SUM(LENGTH(data)), 0) FROM chunks').fetchone()
+
+    def remove_set(self, set_name: str) -> Tuple[int, int]:
+        """
+        Remove set `set_name` and every chunk no other set references.
+        Returns `(removed fixtures, removed chunks)`.
+        """
+        with self.conn:
+            removed = self.conn.execute('DELETE FROM fixtures WHERE set_name = ?', (set_name,)).rowcount
+
+        # Mark every chunk reachable from the remaining fixtures, then sweep the rest
+        marked = set()
+        pending = [row[0] for row in self.conn.execute('SELECT DISTINCT root FROM fixtures')]
+        while pending:
+            digest = pending.pop()
+            if digest in marked:
+                continue
+            marked.add(digest)
+            pending.extend(self.references(self.load_chunk(digest)))
+
+        with self.conn:
+            self.conn.execute('CREATE TEMP TABLE marked (digest BLOB PRIMARY KEY)')
+            self.conn.executemany('INSERT INTO marked (digest) VALUES (?)', ((digest,) for digest in marked))
+            swept = self.conn.execute(
+                'DELETE FROM chunks WHERE digest NOT IN (SELECT digest FROM marked)').rowcount
+            self.conn.execute('DROP TABLE marked')
+        self.load_chunk.cache_clear()
+        self.conn.execute('VACUUM')
+        return removed, swept
+
+
+def write_fixture(store: FixtureStore, root: bytes, path: Path) -> None:
+    """Write a fixture to `path` atomically via a temporary file in the same folder."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + '.tmp')
+    try:
+        with open_file(tmp_path, 'wb', compression=compression_suffix(path)) as f:
+            store.write_chunk(root, f)
+        os.replace(tmp_path, path)
+    finally:
+        if tmp_path.exists():
+            tmp_path.unlink()
+
+
+def select_fixtures(fixtures: Sequence[Tuple[str, bytes, int]], names: Sequence[str], includes: Sequence[str],
+                    excludes: Sequence[str]) -> List[Tuple[str, bytes, int]]:
+    """Fixtures listed in `names` (all when empty) whose name contains every include and no exclude."""
+    wanted = set(names)
+    return [
+        fixture for fixture in fixtures
+        if (not wanted or fixture[0] in wanted or Path(fixture[0]).stem in wanted)
+        and all(include in fixture[0] for include in includes)
+        and not any(exclude in fixture[0] for exclude in excludes)
+    ]
+
+
+def command_pack(args: argparse.Namespace) -> int:
+    root = Path(args.fixtures)
+    if not root.is_dir():
+        print(f"Error: {root} is not a directory")
+        return 1
+    if args.codec not in CODECS:
+        print(f"Error: codec {args.codec} is not available, install the {'zstandard' if args.codec == 'zstd' else 'lz4'} package "
+              f"or use one of: {', '.join(CODECS)}")
+        return 1
+    set_name = args.set or root.resolve().name
+    print(f"Packing {root} into set '{set_name}' of {args.store} ({args.codec})")
+    store = FixtureStore(Path(args.store), create=True)
+    try:
+        packed, unchanged, new_chunks, new_bytes, errors = store.pack(
+            root, set_name, args.codec, args.min_chunk, args.jobs)
+    finally:
+        store.close()
+    for error in errors:
+        print(f"Warning: Could not pack {error}")
+    print(f"Packed {packed} fixtures ({unchanged} unchanged), {new_chunks:,} new chunks, "
+          f"{format_bytes(new_bytes)} added to the store")
+    return 1 if errors else 0
+
+
+def command_list(args: argparse.Namespace) -> int:
+    store = FixtureStore(Path(args.store))
+    try:
+        sets = store.sets()
+        chunks, chunk_bytes, stored_bytes = store.chunk_totals()
+    finally:
+        store.close()
+
+    header = "Set".ljust(30) + "Fixtures".ljust(12) + "Source size".ljust(16) + "JSON size"
+    print(header)
+    print("-" * len(header))
+    for set_name, count, size, source_size in sets:
+        print(set_name.ljust(30) + f"{count:,}".ljust(12) + format_bytes(source_size).ljust(16) + format_bytes(size))
+
+    source_total = sum(row[3] for row in sets)
+    store_size = Path(args.store).stat().st_size
+    print(f"\n{chunks:,} unique chunks, {format_bytes(chunk_bytes)} after deduplication, "
+          f"{format_bytes(stored_bytes)} compressed ({format_bytes(store_size)} on disk)")
+    if store_size:
+        print(f"Source fixtures are {source_total / store_size:.1f}x the size of the store")
+    return 0
+
+
+def command_get(args: argparse.Namespace) -> int:
+    store = FixtureStore(Path(args.store))
+    try:
+        fixtures = select_fixtures(store.fixtures(args.set), args.names, args.include, args.exclude)
+        if not fixtures:
+            print(f"No fixtures selected from set '{args.set}'", file=sys.stderr)
+            return 1
+        if args.output == '-':
+            if len(fixtures) != 1:
+                print(f"Writing to stdout needs exactly one fixture, {len(fixtures)} selected", file=sys.stderr)
+                return 1
+            store.write_chunk(fixtures[0][1], sys.stdout.buffer)
+            return 0
+
+        output = Path(args.output)
+        for name, root, _ in fixtures:
+            target = output / (Path(name).name if args.flat else name)
+            target = target.with_name(json_file_name(json_stem(target), args.compress))
+            if args.skip_existing and target.exists():
+                continue
+            write_fixture(store, root, target)
+    finally:
+        store.close()
+    print(f"Wrote {len(fixtures)} fixtures to {output}")
+    return 0
+
+
+def command_remove(args: argparse.Namespace) -> int:
+    store = FixtureStore(Path(args.store))
+    try:
+        removed, swept = store.remove_set(args.set)
+    finally:
+        store.close()
+    if not removed:
+        print(f"Error: set '{args.set}' is not in {args.store}")
+        return 1
+    print(f"Removed {removed} fixtures of set '{args.set}' and {swept:,} chunks no other set uses")
+    return 0
+
+
+def main():
+    """Main function."""
+    parser = argparse.ArgumentParser(
+        description="Pack fixture folders into a deduplicated, compressed store and write fixtures back out",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""Example:
+  python3 fixture_store.py pack zkevm-fixtures-input --set eest-v5.0.0
+  python3 fixture_store.py list
+  python3 fixture_store.py get --set eest-v5.0.0 --include gas-value_10M -o zkevm-fixtures-input
+  python3 fixture_store.py remove --set eest-v5.0.0"""
+    )
+    parser.add_argument("--store", default=STORE_FILE, help=f"Store file (default: {STORE_FILE})")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    pack_parser = subparsers.add_parser("pack", help="Pack or re-pack a fixtures folder into a set")
+    pack_parser.add_argument("fixtures", help="Folder with fixture JSON files")
+    pack_parser.add_argument("--set", default=None, help="Set name (default: the folder name)")
+    pack_parser.add_argument("--codec", default=DEFAULT_CODEC, choices=['zstd', 'lz4', 'zlib', 'none'],
+                             help=f"Compression of new chunks (default: {DEFAULT_CODEC})")
+    pack_parser.add_argument("--min-chunk", type=int, default=MIN_CHUNK_SIZE,
+                             help=f"Smallest JSON value stored as a chunk of its own, in bytes (default: {MIN_CHUNK_SIZE})")
+    pack_parser.add_argument("-j", "--jobs", type=int, default=None,
+                             help="Number of worker processes used to split files (default: CPU count)")
+
+    subparsers.add_parser("list", help="Show the sets in the store and its deduplication and compression")
+
+    get_parser = subparsers.add_parser("get", help="Write fixtures of a set back out as JSON")
+    get_parser.add_argument("names", nargs="*", help="Fixture names or file stems (default: all)")
+    get_parser.add_argument("--set", required=True, help="Set name")
+    get_parser.add_argument("--include", action="append", default=[],
+                            help="Only fixtures whose name contains this string (repeatable, all must match)")
+    get_parser.add_argument("--exclude", action="append", default=[],
+                            help="Drop fixtures whose name contains this string (repeatable)")
+    get_parser.add_argument("-o", "--output", required=True,
+                            help="Output folder, or - to write a single fixture to stdout")
+    get_parser.add_argument("--flat", action="store_true",
+                            help="Write all fixtures directly into the output folder, as ere-hosts expects")
+    get_parser.add_argument("--compress", choices=COMPRESSION_CHOICES, default="none",
+                            help="Write the fixtures with this compression (default: none)")
+    get_parser.add_argument("--skip-existing", action="store_true", help="Keep fixtures already in the output folder")
+
+    remove_parser = subparsers.add_parser("remove", help="Remove a set and the chunks only it uses")
+    remove_parser.add_argument("--set", required=True, help="Set name")
+
+    args = parser.parse_args()
+    commands = {"pack": command_pack, "list": command_list, "get": command_get, "remove": command_remove}
+    try:
+        return commands[args.command](args)
+    except (FileNotFoundError, ValueError, sqlite3.Error) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,196 @@
+"""
+Gas-normalized throughput metrics for benchmark results.
+
+Raw cycle counts and proving times are only comparable between fixtures of the
+same size. Dividing by `metadata.block_used_gas` gives numbers that are:
+
+- cycles/Mgas: execution cycles per million gas (lower is better)
+- execution Mgas/s: million gas executed per second of execution wall time
+- proving Mgas/s: million gas proven per second of proving time
+
+Aggregates over many fixtures are gas-weighted (total cycles / total gas,
+total gas / total time) rather than means of per-fixture ratios, so a group's
+number is what the whole workload actually achieved.
+"""
+
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+
+MGAS = 1_000_000
+
+
+def block_gas(metrics_data: Dict) -> Optional[int]:
+    """Return `metadata.block_used_gas`, or None if missing or zero."""
+    gas = (metrics_data.get("metadata") or {}).get("block_used_gas")
+    return gas if gas else None
+
+
+def execution_seconds(metrics_data: Dict) -> Optional[float]:
+    """Return the execution wall time in seconds, or None if not recorded."""
+    try:
+        duration = metrics_data["execution"]["success"]["execution_duration"]
+        seconds = duration["secs"] + duration["nanos"] / 1_000_000_000
+    except (KeyError, TypeError):
+        return None
+    return seconds if seconds > 0 else None
+
+
+def total_cycles(metrics_data: Dict) -> Optional[int]:
+    """Return `total_num_cycles` of a successful execution, or None."""
+    try:
+        cycles = metrics_data["execution"]["success"]["total_num_cycles"]
+    except (KeyError, TypeError):
+        return None
+    return cycles if cycles else None
+
+
+def proving_seconds(metrics_data: Dict) -> Optional[float]:
+    """Return the proving time in seconds, or None if proving did not succeed."""
+    try:
+        proving_time_ms = metrics_data["proving"]["success"]["proving_time_ms"]
+    except (KeyError, TypeError):
+        return None
+    return proving_time_ms / 1000.0 if proving_time_ms else None
+
+
+@dataclass
+class GasThroughput:
+    """Gas-weighted throughput totals of a set of results."""
+    files: int = 0
+    gas: int = 0
+    cycles: int = 0
+    cycles_gas: int = 0
+    execution_secs: float = 0.0
+    execution_gas: int = 0
+    proving_secs: float = 0.0
+    proving_gas: int = 0
+
+    def add(self, metrics_data: Dict) -> None:
+        gas = block_gas(metrics_data)
+        if gas is None:
+            return
+        self.files += 1
+        self.gas += gas
+
+        cycles = total_cycles(metrics_data)
+        if cycles is not None:
+            self.cycles += cycles
+            self.cycles_gas += gas
+
+        seconds = execution_seconds(metrics_data)
+        if seconds is not None:
+            self.execution_secs += seconds
+            self.execution_gas += gas
+
+        seconds = proving_seconds(metrics_data)
+        if seconds is not None:
+            self.proving_secs += seconds
+            self.proving_gas += gas
+
+    @property
+    def cycles_per_mgas(self) -> Optional[float]:
+        return self.cycles / (self.cycles_gas / MGAS) if self.cycles_gas else None
+
+    @property
+    def execution_mgas_per_sec(self) -> Optional[float]:
+        return self.execution_gas / MGAS / self.execution_secs if self.execution_secs else None
+
+    @property
+    def proving_mgas_per_sec(self) -> Optional[float]:
+        return self.proving_gas / MGAS / self.proving_secs if self.proving_secs else None
+
+
+def group_name(filename: str) -> str:
+    """Group of a `load_metrics` key, i.e. everything before the file stem."""
+    return filename.rsplit("/", 1)[0] if "/" in filename else ""
+
+
+def throughput_by_group(metrics: Dict[str, Dict], files: Iterable[str]) -> Dict[str, GasThroughput]:
+    """Aggregate the given files of `metrics` per group (zkVM subfolder)."""
+    groups: Dict[str, GasThroughput] = {}
+    for filename in files:
+        groups.setdefault(group_name(filename), GasThroughput()).add(metrics[filename])
+    return groups
+
+
+def format_throughput(value: Optional[float], digits: Optional[int] = None) -> str:
+    """
+    Format a throughput value with thousands separators, or N/A. Unless
+    `digits` is given, values of 1,000 and above are shown without decimals.
+    """
+    if value is None:
+        return "N/A"
+    if digits is None:
+        digits = 0 if abs(value) >= 1000 else 2
+    return f"{value:,.{digits}f}"
+
+
+def format_change(baseline: Optional[float], optimized: Optional[float], higher_is_better: bool) -> str:
+    """Improvement factor between two throughput values, e.g. `1.25x`."""
+    if not baseline or not optimized:
+        return "N/A"
+    factor = optimized / baseline if higher_is_better else baseline / optimized
+    return f"{factor:.2f}x"
+
+
+def rank_groups(
+    groups: Dict[str, GasThroughput],
+    metric: str,
+    higher_is_better: bool
+) -> List[Tuple[str, float]]:
+    """Return `(group, value)` for every group with a value, best first."""
+    ranked = [(name, getattr(totals, metric)) for name, totals in groups.items()
+              if getattr(totals, metric) is not None]
+    ranked.sort(key=lambda item: item[1], reverse=higher_is_better)
+    return ranked
+
+
+def print_rankings(
+    title: str,
+    baseline: Dict[str, GasThroughput],
+    optimized: Dict[str, GasThroughput],
+    metric: str,
+    higher_is_better: bool
+) -> None:
+    """Print groups ranked by the optimized run's value of `metric`."""
+    ranked = rank_groups(optimized, metric, higher_is_better)
+    if not ranked:
+        return
+    direction = "higher" if higher_is_better else "lower"
+    print(f"\nRanked by {title} ({direction} is better):")
+    for i, (name, value) in enumerate(ranked):
+        base_value = getattr(baseline[name], metric) if name in baseline else None
+        change = format_change(base_value, value, higher_is_better)
+        print(f"  {i+1}. {name or '(root)'}: {format_throughput(value)} "
+              f"(baseline {format_throughput(base_value)}, {change})")
+
+
+def print_throughput_table(
+    baseline: Dict[str, GasThroughput],
+    optimized: Dict[str, GasThroughput],
+    columns: List[Tuple[str, str, bool]]
+) -> None:
+    """
+    Print baseline, optimized and improvement per group for each
+    `(title, metric, higher_is_better)` column.
+    """
+    names = sorted(set(baseline) | set(optimized))
+    group_width = max([len(name) for name in names] + [20]) + 2
+
+    header = "Group".ljust(group_width) + "Files".ljust(8) + "Mgas".ljust(12)
+    for title, _, _ in columns:
+        header += f"{title} base".ljust(20) + f"{title} opt".ljust(20) + "Change".ljust(10)
+    print(header)
+    print("-" * len(header))
+
+    for name in names:
+        base = baseline.get(name, GasThroughput())
+        opt = optimized.get(name, GasThroughput())
+        row = (name or "(root)").ljust(group_width) + str(opt.files).ljust(8) + \
+            format_throughput(opt.gas / MGAS, 1).ljust(12)
+        for _, metric, higher_is_better in columns:
+            base_value = getattr(base, metric)
+            opt_value = getattr(opt, metric)
+            row += format_throughput(base_value).ljust(20) + format_throughput(opt_value).ljust(20) + \
+                format_change(base_value, opt_value, higher_is_better).ljust(10)
+        print(row)
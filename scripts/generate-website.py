@@ -4,26 +4,47 @@ Generate a website displaying zkEVM benchmark metrics.
 
 This script processes zkevm-metrics files generated by the stateless-validator
 integration tests and creates an HTML website showing cycle counts and execution
-times per zkVM and EL combination.
+times per zkVM and EL combination. Result files may also be stored compressed
+as `.json.gz`, `.json.zst` or `.json.lz4` (see compressed_io.py).
+
+Results are held in a columnar table (see results_table.py), so numpy must be
+installed.
+
+Every result's `region_cycles` is shown as a stacked bar, per test in the
+detailed tables and aggregated per zkVM in the summary.
+
+With --history, trend sparklines per test and per zkVM are drawn from the
+history of a results store (see ingest_metrics.py), without reading any of the
+historical result files.
 """
 
 import argparse
+import hashlib
 import json
+import math
+import os
 import re
-from dataclasses import dataclass, field
+import statistics
+from dataclasses import dataclass
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple
+from itertools import chain, groupby
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
 
-@dataclass
-class MetricsFile:
-    """Represents a single metrics file with its metadata."""
-    name: str
-    metrics: Dict[str, Any]
-    zkvm: str
-    version: str
-    file_path: str
-    el: str = 'unknown'
+import numpy as np
+
+from gas_metrics import MGAS, format_throughput
+from compressed_io import json_stem
+from metrics_loader import ResultsStore, find_result_files, load_named_files, parse_store_source
+from results_table import (
+    PivotSection, ResultTable, ResultTableBuilder, build_pivot, group_reduce
+)
+
+# Pages are produced in many small chunks, so they are written through a large buffer
+WRITE_BUFFER_SIZE = 1 << 20
+
+# Most recent history points drawn per sparkline
+SPARKLINE_POINTS = 30
 
 
 @dataclass
@@ -41,20 +62,33 @@ class TestResult:
     execution_time_max: Optional[float] = None
     execution_time_avg: Optional[float] = None
     execution_time_sum: Optional[float] = None
+    cycles_per_mgas: Optional[float] = None
+    execution_mgas_per_sec: Optional[float] = None
+    proving_mgas_per_sec: Optional[float] = None
 
 
 @dataclass
-class ZkVMMetrics:
-    """Container for metrics organized by zkVM and EL."""
-    data: Dict[str, Dict[str, List[MetricsFile]]] = field(default_factory=dict)
+class TrendData:
+    """Sparkline series read from the history of a results store."""
+    # (el, zkvm, test name) -> total_num_cycles of the latest points
+    tests: Dict[Tuple[str, str, str], List[int]]
+    # (el, zkvm) -> metric -> [(day, cost index)]
+    zkvms: Dict[Tuple[str, str], Dict[str, List[Tuple[str, float]]]]
+    digest: str
+
+
+# Guest regions in pipeline order; any other region follows alphabetically
+REGION_ORDER = ('read_input', 'verify_witness', 'block_execution', 'post_state_compute', 'validation')
+REGION_COLORS = ('#7e57c2', '#ef6c00', '#1976d2', '#43a047', '#00897b', '#c2185b', '#6d4c41', '#546e7a')
+# Cycles not covered by any region
+UNATTRIBUTED_COLOR = '#bdbdbd'
 
-    def add_metrics(self, zkvm_with_version: str, el: str, metrics_file: MetricsFile) -> None:
-        """Add a metrics file to the collection."""
-        if zkvm_with_version not in self.data:
-            self.data[zkvm_with_version] = {}
-        if el not in self.data[zkvm_with_version]:
-            self.data[zkvm_with_version][el] = []
-        self.data[zkvm_with_version][el].append(metrics_file)
+
+# (key, title, HistoryPoint column) of the per-zkVM trends
+TREND_METRICS = (
+    ('cycles', 'Cycles', 6),
+    ('proving', 'Proving time', 7),
+)
 
 
 def find_metrics_directories(base_path: Path) -> List[Path]:
@@ -64,15 +98,6 @@ def find_metrics_directories(base_path: Path) -> List[Path]:
         if item.is_dir() and item.name.startswith('zkevm-metrics')
     )
 
-def parse_metrics_file(file_path: Path) -> Optional[Dict[str, Any]]:
-    """Parse a single metrics JSON file."""
-    try:
-        with open(file_path, 'r') as f:
-            return json.load(f)
-    except (json.JSONDecodeError, FileNotFoundError) as e:
-        print(f"Warning: Could not parse {file_path}: {e}")
-        return None
-
 def extract_zkvm_and_variant(metrics_dir: Path) -> Tuple[Optional[str], Optional[str]]:
     """Extract zkVM and variant information from directory structure or file names."""
     dir_name = metrics_dir.name
@@ -93,163 +118,264 @@ def extract_zkvm_and_variant(metrics_dir: Path) -> Tuple[Optional[str], Optional
 
     return None, None
 
-def process_metrics_file(
-    json_file: Path,
-    zkvm: str,
-    version: str,
-    zkvm_with_version: str,
-    el: Optional[str] = None
-) -> Optional[MetricsFile]:
-    """Process a single metrics JSON file and return a MetricsFile object."""
-    if json_file.name == 'hardware.json':
-        return None
-
-    metrics = parse_metrics_file(json_file)
-    if metrics is None:
-        return None
+# (zkvm, version, zkvm_with_version, el) describing where a result file lives
+ResultLocation = Tuple[str, str, str, Optional[str]]
 
-    test_name = metrics.get('name', json_file.stem)
 
-    return MetricsFile(
-        name=test_name,
-        metrics=metrics,
-        zkvm=zkvm,
-        version=version,
-        file_path=str(json_file),
-        el=el
-    )
-
-
-def process_metrics_directory(metrics_dir: Path, zkvm_metrics: ZkVMMetrics) -> None:
-    """Process a single metrics directory and add to zkvm_metrics."""
+def find_metrics_directory_files(metrics_dir: Path) -> List[Tuple[ResultLocation, Path]]:
+    """List every result file of a metrics directory together with its location."""
+    files: List[Tuple[ResultLocation, Path]] = []
     if metrics_dir.name == 'zkevm-metrics':
-        for el_dir in metrics_dir.iterdir():
-            if el_dir.is_dir() and el_dir.name != 'hardware.json':
-                el_name = el_dir.name  
+        for el_dir in sorted(metrics_dir.iterdir()):
+            if el_dir.is_dir():
+                el_name = el_dir.name
 
                 # Process each zkVM subdirectory within the EL folder
-                for zkvm_dir in el_dir.iterdir():
+                for zkvm_dir in sorted(el_dir.iterdir()):
                     if zkvm_dir.is_dir():
                         match = re.match(r'([^-]+)-(.+)', zkvm_dir.name)
                         if match:
                             zkvm = match.group(1)
                             version = match.group(2)
-                            zkvm_with_version = f"{zkvm} ({version})"
-
-                            for json_file in zkvm_dir.glob('*.json'):
-                                metrics_file = process_metrics_file(
-                                    json_file, zkvm, version, zkvm_with_version, el_name
-                                )
-                                if metrics_file:
-                                    zkvm_metrics.add_metrics(
-                                        zkvm_with_version, el_name, metrics_file
-                                    )
+                            location = (zkvm, version, f"{zkvm} ({version})", el_name)
+                            files.extend((location, f) for f in find_result_files(zkvm_dir))
     else:
         # Process other zkevm-metrics-* directories
         zkvm, variant = extract_zkvm_and_variant(metrics_dir)
         if zkvm is None:
-            return
+            return files
 
         zkvm_with_version = f"{zkvm} ({variant})" if variant else zkvm
+        location = (zkvm, variant or '', zkvm_with_version, None)
+        files.extend((location, f) for f in find_result_files(metrics_dir))
+
+    return files
+
+
+def collect_metrics_data(
+    base_path: Path,
+    workers: Optional[int] = None,
+    use_cache: bool = True
+) -> ResultTable:
+    """
+    Collect all metrics data into a columnar result table.
+
+    Files from every metrics directory are parsed together in one parallel pass.
+    Unless `use_cache` is False, unchanged files are served from the metrics
+    cache stored in `base_path`. If `base_path` names a results store, the
+    results are read from it instead.
+    """
+    builder = ResultTableBuilder()
+    store_source = parse_store_source(base_path)
+    if store_source is not None:
+        store_path, run = store_source
+        store = ResultsStore.open(store_path)
+        if store is None:
+            return builder.build()
+        try:
+            for (el, zkvm, version, _, stem), metrics in store.results(run):
+                zkvm_with_version = f"{zkvm} ({version})" if version else zkvm
+                builder.add(metrics.get('name', stem), zkvm_with_version, el, metrics)
+        except KeyError as e:
+            print(f"Warning: {e.args[0]}")
+        finally:
+            store.close()
+        return builder.build()
+
+    entries = []
+    for metrics_dir in find_metrics_directories(base_path):
+        for location, json_file in find_metrics_directory_files(metrics_dir):
+            entries.append(((location, json_file), json_file))
+
+    cache_root = base_path if use_cache else None
+    for (location, json_file), metrics in load_named_files(entries, workers, cache_root):
+        _, _, zkvm_with_version, el = location
+        test_name = metrics.get('name', json_stem(json_file))
+        builder.add(test_name, zkvm_with_version, el or 'unknown', metrics)
+
+    return builder.build()
+
+def load_trends(store_path: Path) -> Optional[TrendData]:
+    """
+    Read the sparkline series from the history of a results store.
+
+    Every test keeps its latest SPARKLINE_POINTS cycle counts. For every zkVM
+    and day there is a cost index: the geometric mean over tests of each value
+    divided by that test's median, so days that cover different subsets of
+    tests stay comparable.
+    """
+    store = ResultsStore.open(store_path)
+    if store is None:
+        return None
+
+    tests: Dict[Tuple[str, str, str], List[int]] = {}
+    log_sums: Dict[Tuple[str, str], Dict[str, Dict[str, List[float]]]] = {}
+    try:
+        for (el, zkvm, name), points in groupby(store.history(), key=lambda point: (point[0], point[1], point[3])):
+            points = list(points)
+            cycles = [round(point[6]) for point in points if point[6]]
+            if len(cycles) > 1:
+                tests[(el, zkvm, name)] = cycles[-SPARKLINE_POINTS:]
+
+            for metric, _, column in TREND_METRICS:
+                values = [(point[4][:10], point[column]) for point in points if point[column]]
+                if not values:
+                    continue
+                median = statistics.median(value for _, value in values)
+                days = log_sums.setdefault((el, zkvm), {}).setdefault(metric, {})
+                for day, value in values:
+                    entry = days.setdefault(day, [0.0, 0])
+                    entry[0] += math.log(value / median)
+                    entry[1] += 1
+        digest = store.history_digest()
+    finally:
+        store.close()
+
+    zkvms = {
+        group: {
+            metric: [(day, math.exp(total / count)) for day, (total, count) in sorted(days.items())][-SPARKLINE_POINTS:]
+            for metric, days in metrics.items()
+        }
+        for group, metrics in log_sums.items()
+    }
+    return TrendData(tests=tests, zkvms=zkvms, digest=digest)
 
-        for json_file in metrics_dir.glob('*.json'):
-            metrics_file = process_metrics_file(
-                json_file, zkvm, variant or '', zkvm_with_version
-            )
-            if metrics_file:
-                zkvm_metrics.add_metrics(
-                    zkvm_with_version, metrics_file.el, metrics_file
-                )
 
+def history_zkvm(zkvm_with_version: str) -> str:
+    """The zkVM a history series belongs to, i.e. the table label without its version."""
+    return zkvm_with_version.split(' (', 1)[0]
 
-def collect_metrics_data(base_path: Path) -> Dict[str, Dict[str, List[MetricsFile]]]:
+
+def calculate_summary_stats(table: ResultTable) -> Dict[Tuple[str, str], TestResult]:
     """
-    Collect all metrics data organized by zkVM and EL combination.
+    Calculate summary statistics for every (zkVM, EL) combination.
 
     Returns:
-        Dict with structure: {zkvm_with_version: {el: [metrics_data]}}
+        Dict with structure: {(zkvm_with_version, el): TestResult}
     """
-    zkvm_metrics = ZkVMMetrics()
-    metrics_dirs = find_metrics_directories(base_path)
-
-    for metrics_dir in metrics_dirs:
-        process_metrics_directory(metrics_dir, zkvm_metrics)
-
-    return zkvm_metrics.data
-
-def calculate_summary_stats(test_data: List[MetricsFile]) -> TestResult:
-    """Calculate summary statistics for a list of test results."""
-    if not test_data:
-        return TestResult()
-
-    cycle_counts: List[int] = []
-    execution_times: List[float] = []
-    successful_tests = 0
-    crashed_tests = 0
-    total_tests = len(test_data)
-
-    for test in test_data:
-        metrics = test.metrics
-        execution = metrics.get('execution', {})
-
-        if 'success' in execution:
-            successful_tests += 1
-            success_data = execution['success']
-
-            # Extract cycle count
-            total_cycles = success_data.get('total_num_cycles')
-            if total_cycles:
-                cycle_counts.append(total_cycles)
-
-            # Extract execution time (convert to seconds)
-            duration = success_data.get('execution_duration', {})
-            if 'secs' in duration and 'nanos' in duration:
-                total_seconds = duration['secs'] + duration['nanos'] / 1_000_000_000
-                execution_times.append(total_seconds)
-        else:
-            # Count as crashed if not successful
-            crashed_tests += 1
-
-    result = TestResult(
-        test_count=total_tests,
-        successful_tests=successful_tests,
-        crashed_tests=crashed_tests,
-        success_percentage=(successful_tests / total_tests * 100) if total_tests > 0 else 0
+    results: Dict[Tuple[str, str], TestResult] = {}
+    if len(table) == 0:
+        return results
+
+    groups = table.group_codes()
+    all_rows = group_reduce(groups, table.success.astype(np.int64))
+    cycles = group_reduce(groups, table.cycles, table.success & (table.cycles > 0))
+    durations = group_reduce(groups, table.duration_ns, table.success & (table.duration_ns >= 0))
+
+    for group, total_tests, _, _, successful_tests in all_rows.items():
+        zkvm, el = table.split_group_code(group)
+        results[(table.zkvm_names[zkvm], table.el_names[el])] = TestResult(
+            test_count=total_tests,
+            successful_tests=successful_tests,
+            crashed_tests=total_tests - successful_tests,
+            success_percentage=successful_tests / total_tests * 100
+        )
+
+    for group, count, minimum, maximum, total in cycles.items():
+        zkvm, el = table.split_group_code(group)
+        result = results[(table.zkvm_names[zkvm], table.el_names[el])]
+        result.total_cycles_min = minimum
+        result.total_cycles_max = maximum
+        result.total_cycles_avg = total / count
+        result.total_cycles_sum = total
+
+    for group, count, minimum, maximum, total in durations.items():
+        zkvm, el = table.split_group_code(group)
+        result = results[(table.zkvm_names[zkvm], table.el_names[el])]
+        result.execution_time_min = minimum / 1_000_000_000
+        result.execution_time_max = maximum / 1_000_000_000
+        result.execution_time_avg = total / count / 1_000_000_000
+        result.execution_time_sum = total / 1_000_000_000
+
+    # Gas-weighted throughput: totals over the rows that have both gas and the measurement
+    has_gas = table.gas > 0
+    cycles_mask = table.success & (table.cycles > 0) & has_gas
+    duration_mask = table.success & (table.duration_ns > 0) & has_gas
+    proving_mask = (table.proving_ms > 0) & has_gas
+    throughput = (
+        ('cycles_per_mgas', table.cycles, cycles_mask, lambda gas, cycles: cycles / (gas / MGAS)),
+        ('execution_mgas_per_sec', table.duration_ns, duration_mask,
+         lambda gas, duration_ns: gas / MGAS / (duration_ns / 1_000_000_000)),
+        ('proving_mgas_per_sec', table.proving_ms, proving_mask,
+         lambda gas, proving_ms: gas / MGAS / (proving_ms / 1000)),
     )
+    for attribute, column, mask, ratio in throughput:
+        gas_totals = group_reduce(groups, table.gas, mask)
+        value_totals = group_reduce(groups, column, mask)
+        for group, gas, value in zip(gas_totals.groups.tolist(), gas_totals.total.tolist(),
+                                     value_totals.total.tolist()):
+            zkvm, el = table.split_group_code(group)
+            setattr(results[(table.zkvm_names[zkvm], table.el_names[el])], attribute, ratio(gas, value))
 
-    if cycle_counts:
-        result.total_cycles_min = min(cycle_counts)
-        result.total_cycles_max = max(cycle_counts)
-        result.total_cycles_avg = sum(cycle_counts) / len(cycle_counts)
-        result.total_cycles_sum = sum(cycle_counts)
+    return results
 
-    if execution_times:
-        result.execution_time_min = min(execution_times)
-        result.execution_time_max = max(execution_times)
-        result.execution_time_avg = sum(execution_times) / len(execution_times)
-        result.execution_time_sum = sum(execution_times)
+def region_display_order(table: ResultTable) -> List[int]:
+    """Region codes of `table` in display order (see REGION_ORDER)."""
+    rank = {name: i for i, name in enumerate(REGION_ORDER)}
+    return sorted(range(len(table.region_names)),
+                  key=lambda code: (rank.get(table.region_names[code], len(REGION_ORDER)), table.region_names[code]))
 
-    return result
 
-def format_number(num: float, precision: int = 2) -> str:
-    """Format a number with thousands separators."""
-    if isinstance(num, int) or num.is_integer():
-        return f"{int(num):,}"
-    else:
-        return f"{num:,.{precision}f}"
-
-def format_time(seconds: float) -> str:
-    """Format time duration in a human-readable format."""
-    if seconds < 1:
-        return f"{seconds * 1000:.1f}ms"
-    elif seconds < 60:
-        return f"{seconds:.2f}s"
-    elif seconds < 3600:
-        minutes = seconds / 60
-        return f"{minutes:.1f}m"
-    else:
-        hours = seconds / 3600
-        return f"{hours:.1f}h"
+def region_colors(table: ResultTable) -> List[Tuple[str, str]]:
+    """`(region name, color)` of every region of `table`, in display order."""
+    return [(table.region_names[code], REGION_COLORS[i % len(REGION_COLORS)])
+            for i, code in enumerate(region_display_order(table))]
+
+
+def calculate_region_shares(table: ResultTable) -> Dict[Tuple[str, str], Tuple[int, int, List[int]]]:
+    """
+    Sum the region cycles of every (zkVM, EL) combination.
+
+    Only successful results that report regions are counted. Returns
+    `{(zkvm_with_version, el): (tests, total cycles, region totals in display order)}`.
+    """
+    shares: Dict[Tuple[str, str], Tuple[int, int, List[int]]] = {}
+    if len(table) == 0 or not table.region_names:
+        return shares
+
+    mask = table.success & (table.cycles > 0) & (table.region_cycles >= 0).any(axis=1)
+    groups = table.group_codes()
+    totals = group_reduce(groups, table.cycles, mask)
+    region_totals = [
+        group_reduce(groups, np.maximum(table.region_cycles[:, code], 0), mask).total.tolist()
+        for code in region_display_order(table)
+    ]
+    for i, (group, count, _, _, total) in enumerate(totals.items()):
+        zkvm, el = table.split_group_code(group)
+        shares[(table.zkvm_names[zkvm], table.el_names[el])] = (count, total, [column[i] for column in region_totals])
+    return shares
+
+
+def region_bar(segments: List[Tuple[str, str, int]], total: int, compact: bool = False) -> str:
+    """
+    Draw `(region, color, cycles)` segments as a stacked bar. Cycles not
+    covered by any region are shown in grey; if regions overlap and add up to
+    more than `total`, shares are relative to their sum instead.
+    """
+    covered = sum(cycles for _, _, cycles in segments)
+    denominator = max(total, covered)
+    if denominator <= 0:
+        return ''
+    if total > covered:
+        segments = segments + [('unattributed', UNATTRIBUTED_COLOR, total - covered)]
+
+    spans = []
+    title = []
+    for region, color, cycles in segments:
+        if cycles > 0:
+            share = cycles / denominator * 100
+            spans.append(f'<span style="width: {share:.2f}%; background: {color}"></span>')
+            title.append(f"{region} {share:.1f}%")
+    css_class = 'region-bar compact' if compact else 'region-bar'
+    return f'<div class="{css_class}" title="{", ".join(title)}">{"".join(spans)}</div>'
+
+
+def region_legend(colors: List[Tuple[str, str]]) -> str:
+    """Legend for the region bars."""
+    items = [f'<span><i style="background: {color}"></i>{region}</span>' for region, color in colors]
+    items.append(f'<span><i style="background: {UNATTRIBUTED_COLOR}"></i>unattributed</span>')
+    return f'<div class="region-legend">{"".join(items)}</div>'
+
 
 def get_html_template() -> str:
     """Return the HTML template for the report."""
@@ -468,14 +594,92 @@ def get_css_styles() -> str:
         .toggle-indicator.rotated {
             transform: rotate(-90deg);
         }
+        .table-toolbar {
+            display: flex;
+            align-items: center;
+            gap: 12px;
+            padding: 10px 20px 0;
+        }
+        .table-filter {
+            flex: 1;
+            max-width: 400px;
+            padding: 6px 10px;
+            border: 1px solid #ccc;
+            border-radius: 4px;
+        }
+        .row-count {
+            color: #666;
+            font-size: 0.9em;
+        }
+        .virtual-scroll {
+            max-height: 75vh;
+            overflow-y: auto;
+        }
+        .virtual-scroll .test-name-cell {
+            white-space: nowrap;
+            overflow: hidden;
+            text-overflow: ellipsis;
+        }
+        .spacer-row td {
+            padding: 0;
+            border: none;
+        }
+        .page-links li {
+            margin: 6px 0;
+            font-size: 1.1em;
+        }
+        .sparkline {
+            display: block;
+        }
+        .region-bar {
+            display: flex;
+            height: 14px;
+            min-width: 240px;
+            border-radius: 3px;
+            overflow: hidden;
+            background-color: #eee;
+        }
+        .region-bar.compact {
+            height: 6px;
+            min-width: 0;
+            margin-top: 2px;
+        }
+        .region-bar span {
+            display: block;
+            height: 100%;
+        }
+        .region-legend {
+            display: flex;
+            flex-wrap: wrap;
+            gap: 4px 14px;
+            font-size: 0.85em;
+            color: #555;
+        }
+        .region-legend i {
+            display: inline-block;
+            width: 10px;
+            height: 10px;
+            margin-right: 4px;
+            border-radius: 2px;
+        }
+        .sparkline polyline {
+            fill: none;
+            stroke: #007acc;
+            stroke-width: 1.5;
+        }
     '''
 
 
 def get_javascript_code() -> str:
     """Return the JavaScript code for the report."""
     return '''
-        let currentSort = { column: -1, direction: 'desc' }; // Default to desc for average column
-        let elSorts = {}; // Track sort state for each EL section
+        // Each EL table is rendered from the JSON payload embedded next to it.
+        // Only the rows inside the scroll viewport (plus some overscan) are in
+        // the DOM, and sort keys are computed once when the payload is loaded.
+        const DEFAULT_ROW_HEIGHT = 56;
+        const OVERSCAN_ROWS = 20;
+        const UNATTRIBUTED_COLOR = '#bdbdbd'; // UNATTRIBUTED_COLOR on the Python side
+        const tables = {}; // Table state per EL section
 
         function toggleSection(el) {
             const content = document.getElementById(`section-${el}`);
@@ -485,6 +689,7 @@ def get_javascript_code() -> str:
                 content.classList.remove('collapsed');
                 indicator.classList.remove('rotated');
                 indicator.textContent = '▼';
+                scheduleRender(tables[el]);
             } else {
                 content.classList.add('collapsed');
                 indicator.classList.add('rotated');
@@ -492,118 +697,267 @@ def get_javascript_code() -> str:
             }
         }
 
-        function extractNumericValue(cellContent, isAverageColumn = false) {
-            if (isAverageColumn) {
-                // For average column, use the data-avg-time attribute
-                const cell = cellContent.closest ? cellContent : document.createElement('div');
-                if (typeof cellContent === 'string') {
-                    cell.innerHTML = cellContent;
-                }
-                const avgTimeAttr = cell.querySelector('[data-avg-time]');
-                if (avgTimeAttr) {
-                    const avgTime = parseFloat(avgTimeAttr.getAttribute('data-avg-time'));
-                    return avgTime >= 0 ? avgTime : -1; // -1 for no data
-                }
-                return -1;
+        function escapeHtml(text) {
+            return text.replace(/[&<>"']/g, c => ({
+                '&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;', "'": '&#39;'
+            })[c]);
+        }
+
+        function formatCycles(cycles) {
+            return cycles.toLocaleString('en-US');
+        }
+
+        function formatTime(seconds) {
+            if (seconds < 1) {
+                return `${(seconds * 1000).toFixed(1)}ms`;
+            } else if (seconds < 60) {
+                return `${seconds.toFixed(2)}s`;
+            } else if (seconds < 3600) {
+                return `${(seconds / 60).toFixed(1)}m`;
             }
+            return `${(seconds / 3600).toFixed(1)}h`;
+        }
 
-            // Extract cycles from the cell content
-            const cyclesMatch = cellContent.match(/([0-9,]+)\s+cycles/);
-            if (cyclesMatch) {
-                return parseInt(cyclesMatch[1].replace(/,/g, ''));
+        function sparkline(values) {
+            // Same drawing as sparkline_svg() on the Python side
+            const width = 120, height = 24;
+            const low = Math.min(...values), high = Math.max(...values);
+            const span = high - low || 1;
+            const step = width / (values.length - 1);
+            const points = values.map((value, i) =>
+                `${(i * step).toFixed(1)},${(height - 2 - (value - low) / span * (height - 4)).toFixed(1)}`).join(' ');
+            const change = (values[values.length - 1] / values[0] - 1) * 100;
+            return `<svg class="sparkline" width="${width}" height="${height}" viewBox="0 0 ${width} ${height}">` +
+                `<title>${values.length} points, ${change >= 0 ? '+' : ''}${change.toFixed(1)}% cycles</title>` +
+                `<polyline points="${points}"/></svg>`;
+        }
+
+        function regionBar(regions, parts, total) {
+            // Same drawing as region_bar() on the Python side
+            let covered = 0;
+            parts.forEach(cycles => { covered += cycles; });
+            const denominator = Math.max(total, covered);
+            if (denominator <= 0) {
+                return '';
             }
+            const segments = parts.map((cycles, i) => [regions[i][0], regions[i][1], cycles]);
+            if (total > covered) {
+                segments.push(['unattributed', UNATTRIBUTED_COLOR, total - covered]);
+            }
+            const spans = [], title = [];
+            segments.forEach(([region, color, cycles]) => {
+                if (cycles > 0) {
+                    const share = cycles / denominator * 100;
+                    spans.push(`<span style="width: ${share.toFixed(2)}%; background: ${color}"></span>`);
+                    title.push(`${region} ${share.toFixed(1)}%`);
+                }
+            });
+            return `<div class="region-bar compact" title="${title.join(', ')}">${spans.join('')}</div>`;
+        }
 
-            // If it's a failed/error/no-data cell, return appropriate values for sorting
-            if (cellContent.includes('Failed') || cellContent.includes('Error')) {
-                return -1; // Special value for failed tests
+        function loadTable(script) {
+            const el = script.getAttribute('data-el');
+            const payload = JSON.parse(script.textContent);
+            const rowCount = payload.tests.length;
+            const columnCount = payload.zkvms.length;
+
+            const cycles = payload.cycles.map(column => Float64Array.from(column));
+            const times = payload.times_us.map(column => Float64Array.from(column, t => t >= 0 ? t / 1e6 : -1));
+
+            // Sort keys: cycles, -1 for failed runs, -2 for missing data
+            const keys = cycles.map(column => Float64Array.from(column, c => c > 0 ? c : (c === -1 ? -1 : -2)));
+            const avg = new Float64Array(rowCount);
+            for (let row = 0; row < rowCount; row++) {
+                let sum = 0, count = 0;
+                for (let col = 0; col < columnCount; col++) {
+                    if (times[col][row] >= 0) {
+                        sum += times[col][row];
+                        count++;
+                    }
+                }
+                avg[row] = count > 0 ? sum / count : -1;
             }
-            if (cellContent.includes('No cycle data') || cellContent.includes('-')) {
-                return -2; // Special value for missing data
+            keys.push(avg);
+
+            const state = {
+                el,
+                rowCount,
+                columnCount,
+                names: payload.tests,
+                lowerNames: payload.tests.map(name => name.toLowerCase()),
+                cycles,
+                times,
+                trends: payload.trends || null,
+                regions: payload.regions || null,
+                regionCycles: payload.region_cycles || null,
+                avg,
+                keys,
+                order: Int32Array.from({ length: rowCount }, (_, i) => i),
+                visible: null,
+                filter: '',
+                sort: { column: -1, direction: 'asc' },
+                rowHeight: DEFAULT_ROW_HEIGHT,
+                pending: false,
+                scroller: document.getElementById(`scroll-${el}`),
+                tbody: document.getElementById(`tbody-${el}`),
+                counter: document.getElementById(`count-${el}`),
+            };
+            state.visible = state.order;
+            tables[el] = state;
+
+            state.scroller.addEventListener('scroll', () => scheduleRender(state));
+            document.getElementById(`filter-${el}`).addEventListener('input', function() {
+                state.filter = this.value.trim().toLowerCase();
+                applyFilter(state);
+            });
+            return state;
+        }
+
+        function compareKeys(valueA, valueB, direction, isAverageColumn) {
+            if (direction === 'desc') {
+                // For descending, put Failed (-1) at the top for cycle columns, but bottom for average
+                if (!isAverageColumn) {
+                    if (valueA === -1 && valueB !== -1) return -1;
+                    if (valueA !== -1 && valueB === -1) return 1;
+                    if (valueA === -1 && valueB === -1) return 0;
+                }
+
+                // For missing data, put at bottom
+                if (valueA < 0 && valueB >= 0) return 1;
+                if (valueA >= 0 && valueB < 0) return -1;
+                if (valueA < 0 && valueB < 0) return valueA - valueB;
+
+                return valueB - valueA;
             }
 
-            return -3; // Default for other cases
+            // For ascending, put Failed and missing data at bottom
+            if (valueA < 0 && valueB >= 0) return 1;
+            if (valueA >= 0 && valueB < 0) return -1;
+            if (valueA < 0 && valueB < 0) return valueA - valueB;
+
+            return valueA - valueB;
         }
 
         function sortElTable(el, columnIndex) {
-            const table = document.querySelector(`#tbody-${el}`);
-            const rows = Array.from(table.querySelectorAll('tr'));
+            const state = tables[el];
             const headers = document.querySelectorAll(`#section-${el} .sortable`);
-            const isAverageColumn = columnIndex === headers.length - 1; // Last column is average
-
-            // Initialize sort state for this EL if not exists
-            if (!elSorts[el]) {
-                elSorts[el] = { column: -1, direction: 'asc' };
-            }
+            const isAverageColumn = columnIndex === state.columnCount;
 
             // Determine sort direction
-            if (elSorts[el].column === columnIndex) {
-                elSorts[el].direction = elSorts[el].direction === 'asc' ? 'desc' : 'asc';
+            if (state.sort.column === columnIndex) {
+                state.sort.direction = state.sort.direction === 'asc' ? 'desc' : 'asc';
             } else {
-                elSorts[el].column = columnIndex;
-                elSorts[el].direction = 'asc';
+                state.sort.column = columnIndex;
+                state.sort.direction = 'asc';
             }
 
             // Update sort indicators for this EL section
             headers.forEach(th => {
                 th.classList.remove('sort-asc', 'sort-desc');
             });
+            headers[columnIndex].classList.add(state.sort.direction === 'asc' ? 'sort-asc' : 'sort-desc');
 
-            const currentHeader = headers[columnIndex];
-            currentHeader.classList.add(elSorts[el].direction === 'asc' ? 'sort-asc' : 'sort-desc');
-
-            // Sort rows
-            rows.sort((a, b) => {
-                const cellIndexInRow = isAverageColumn ? a.cells.length - 1 : columnIndex + 1; // +1 because first column is test name
-                const cellA = a.cells[cellIndexInRow];
-                const cellB = b.cells[cellIndexInRow];
-
-                let valueA, valueB;
-
-                if (isAverageColumn) {
-                    // For average column, extract from data-avg-time attribute
-                    const attrA = cellA.getAttribute('data-avg-time');
-                    const attrB = cellB.getAttribute('data-avg-time');
-                    valueA = attrA ? parseFloat(attrA) : -1;
-                    valueB = attrB ? parseFloat(attrB) : -1;
-                } else {
-                    // For other columns, extract cycles from content
-                    valueA = extractNumericValue(cellA.innerHTML);
-                    valueB = extractNumericValue(cellB.innerHTML);
-                }
+            const keys = state.keys[columnIndex];
+            const direction = state.sort.direction;
+            state.order = Int32Array.from({ length: state.rowCount }, (_, i) => i)
+                .sort((a, b) => compareKeys(keys[a], keys[b], direction, isAverageColumn));
+            applyFilter(state);
+        }
 
-                let comparison = 0;
+        function applyFilter(state) {
+            if (state.filter) {
+                state.visible = state.order.filter(row => state.lowerNames[row].includes(state.filter));
+            } else {
+                state.visible = state.order;
+            }
+            state.scroller.scrollTop = 0;
+            state.counter.textContent = `${state.visible.length.toLocaleString('en-US')} of ${state.rowCount.toLocaleString('en-US')} tests`;
+            scheduleRender(state);
+        }
 
-                if (elSorts[el].direction === 'desc') {
-                    // For descending, put Failed (-1) at the top for cycle columns, but bottom for average
-                    if (!isAverageColumn) {
-                        if (valueA === -1 && valueB !== -1) return -1;
-                        if (valueA !== -1 && valueB === -1) return 1;
-                        if (valueA === -1 && valueB === -1) return 0;
-                    }
+        function scheduleRender(state) {
+            if (!state || state.pending) {
+                return;
+            }
+            state.pending = true;
+            requestAnimationFrame(() => {
+                state.pending = false;
+                renderRows(state);
+            });
+        }
 
-                    // For missing data, put at bottom
-                    if (valueA < 0 && valueB >= 0) return 1;
-                    if (valueA >= 0 && valueB < 0) return -1;
-                    if (valueA < 0 && valueB < 0) return valueA - valueB;
+        function renderCell(state, col, row) {
+            const cycles = state.cycles[col][row];
+            if (cycles === -2) {
+                return '<td><span class="no-data">-</span></td>';
+            }
+            if (cycles === -1) {
+                return '<td><span class="error-value">Failed</span></td>';
+            }
 
-                    comparison = valueB - valueA; // Descending for numeric values
-                } else {
-                    // For ascending, put Failed and missing data at bottom
-                    if ((valueA < 0) && (valueB >= 0)) return 1;
-                    if ((valueA >= 0) && (valueB < 0)) return -1;
-                    if ((valueA < 0) && (valueB < 0)) return valueA - valueB; // Sort negative values
+            let content = '<div class="combined-cell">';
+            content += cycles > 0
+                ? `<span class="cycles-value">${formatCycles(cycles)} cycles</span>`
+                : '<span class="no-data">No cycle data</span>';
+            const seconds = state.times[col][row];
+            content += seconds >= 0
+                ? `<span class="time-value">${formatTime(seconds)}</span>`
+                : '<span class="no-data">No time data</span>';
+            const regions = state.regionCycles && state.regionCycles[col][row];
+            if (regions) {
+                content += regionBar(state.regions, regions, cycles);
+            }
+            const trend = state.trends && state.trends[col][row];
+            if (trend) {
+                content += sparkline(trend);
+            }
+            return `<td>${content}</div></td>`;
+        }
 
-                    comparison = valueA - valueB; // Ascending for numeric values
-                }
+        function renderRows(state) {
+            const total = state.visible.length;
+            const viewport = state.scroller.clientHeight || window.innerHeight;
+            const first = Math.max(0, Math.floor(state.scroller.scrollTop / state.rowHeight) - OVERSCAN_ROWS);
+            const last = Math.min(total, first + Math.ceil(viewport / state.rowHeight) + 2 * OVERSCAN_ROWS);
+            const span = state.columnCount + 2;
 
-                return comparison;
-            });
+            const parts = [];
+            if (first > 0) {
+                parts.push(`<tr class="spacer-row" style="height: ${first * state.rowHeight}px"><td colspan="${span}"></td></tr>`);
+            }
+            for (let i = first; i < last; i++) {
+                const row = state.visible[i];
+                const name = escapeHtml(state.names[row]);
+                parts.push(`<tr class="data-row"><td class="test-name-cell" title="${name}">${name}</td>`);
+                for (let col = 0; col < state.columnCount; col++) {
+                    parts.push(renderCell(state, col, row));
+                }
+                const avg = state.avg[row];
+                parts.push(avg >= 0
+                    ? `<td class="time-value">${formatTime(avg)}</td></tr>`
+                    : '<td class="no-data">No data</td></tr>');
+            }
+            if (last < total) {
+                parts.push(`<tr class="spacer-row" style="height: ${(total - last) * state.rowHeight}px"><td colspan="${span}"></td></tr>`);
+            }
+            state.tbody.innerHTML = parts.join('');
 
-            // Re-append sorted rows
-            rows.forEach(row => table.appendChild(row));
+            // Adopt the real row height once rows are laid out, so spacers stay accurate
+            const sample = state.tbody.querySelector('tr.data-row');
+            if (sample && sample.offsetHeight > 0 && sample.offsetHeight !== state.rowHeight) {
+                state.rowHeight = sample.offsetHeight;
+                scheduleRender(state);
+            }
         }
 
         function initializeSorting() {
+            // Load every EL payload and sort each table by its average execution time column
+            document.querySelectorAll('script.el-data').forEach(script => {
+                const state = loadTable(script);
+                state.sort = { column: state.columnCount, direction: 'asc' }; // Will be toggled to desc
+                sortElTable(state.el, state.columnCount);
+            });
+
             // Add event listeners to all sortable headers
             const sortableHeaders = document.querySelectorAll('.sortable[data-el][data-col]');
             sortableHeaders.forEach(header => {
@@ -613,19 +967,6 @@ def get_javascript_code() -> str:
                     sortElTable(el, col);
                 });
             });
-
-            // Get all EL sections and sort each by average execution time column by default
-            const elSections = document.querySelectorAll('[id^="section-"]');
-            elSections.forEach(section => {
-                const el = section.id.replace('section-', '');
-                const headers = section.querySelectorAll('.sortable');
-
-                if (headers.length > 0) {
-                    const avgColumnIndex = headers.length - 1; // Last column is average
-                    elSorts[el] = { column: avgColumnIndex, direction: 'asc' }; // Will be toggled to desc
-                    sortElTable(el, avgColumnIndex);
-                }
-            });
         }
 
         // Initialize when DOM is loaded
@@ -633,17 +974,21 @@ def get_javascript_code() -> str:
     '''
 
 
-def generate_summary_table(metrics_data: Dict[str, Dict[str, List[MetricsFile]]]) -> str:
-    """Generate the summary table HTML."""
-    if not metrics_data:
-        return '''
+NO_DATA_HTML = '''
         <div class="no-data">
             <h2>No metrics data found</h2>
             <p>No benchmark results were found in the specified directories.</p>
         </div>
         '''
 
-    html = '''
+
+def generate_summary_table(table: ResultTable, pivot: Dict[int, PivotSection]) -> Iterator[str]:
+    """Yield the summary table HTML in chunks."""
+    if len(table) == 0:
+        yield NO_DATA_HTML
+        return
+
+    yield '''
         <h2 class="section-title">📊 Summary by zkVM and EL</h2>
         <div class="overflow-container">
         <table class="summary-table">
@@ -655,19 +1000,24 @@ def generate_summary_table(metrics_data: Dict[str, Dict[str, List[MetricsFile]]]
                     <th>Crashed</th>
                     <th>Total</th>
                     <th>Success %</th>
+                    <th title="Execution cycles per million gas (lower is better)">Cycles/Mgas</th>
+                    <th title="Million gas executed per second of execution time">Exec Mgas/s</th>
+                    <th title="Million gas proven per second of proving time">Prove Mgas/s</th>
                 </tr>
             </thead>
             <tbody>
     '''
 
+    stats_by_group = calculate_summary_stats(table)
     summary_rows = []
-    for zkvm, el_data in metrics_data.items():
-        for el, test_data in el_data.items():
-            stats = calculate_summary_stats(test_data)
-            summary_rows.append((el, zkvm, stats))
+    for el_code, section in pivot.items():
+        el = table.el_names[el_code]
+        for zkvm_code in section.zkvms.tolist():
+            zkvm = table.zkvm_names[zkvm_code]
+            summary_rows.append((el, zkvm, stats_by_group[(zkvm, el)]))
 
     for el, zkvm, stats in sorted(summary_rows, key=lambda item: (item[0].lower(), item[1].lower())):
-        html += f'''
+        yield f'''
                 <tr>
                     <td>{el}</td>
                     <td><strong>{zkvm}</strong></td>
@@ -675,90 +1025,332 @@ def generate_summary_table(metrics_data: Dict[str, Dict[str, List[MetricsFile]]]
                     <td class="error-value">{stats.crashed_tests}</td>
                     <td class="neutral-value">{stats.test_count}</td>
                     <td class="metric-value">{stats.success_percentage:.1f}%</td>
+                    <td class="cycles-value">{format_throughput(stats.cycles_per_mgas)}</td>
+                    <td class="time-value">{format_throughput(stats.execution_mgas_per_sec)}</td>
+                    <td class="time-value">{format_throughput(stats.proving_mgas_per_sec)}</td>
                 </tr>'''
 
-    html += '''
+    yield '''
+            </tbody>
+        </table>
+        </div>
+    '''
+
+    yield from generate_throughput_rankings(summary_rows)
+
+
+# (title, TestResult attribute, higher is better) of each ranking
+THROUGHPUT_RANKINGS = (
+    ('Cycles/Mgas', 'cycles_per_mgas', False),
+    ('Exec Mgas/s', 'execution_mgas_per_sec', True),
+    ('Prove Mgas/s', 'proving_mgas_per_sec', True),
+)
+
+
+def generate_throughput_rankings(summary_rows: List[Tuple[str, str, TestResult]]) -> Iterator[str]:
+    """Yield one table per EL ranking its zkVMs by each gas-normalized throughput metric."""
+    by_el: Dict[str, List[Tuple[str, TestResult]]] = {}
+    for el, zkvm, stats in summary_rows:
+        by_el.setdefault(el, []).append((zkvm, stats))
+
+    rankings = []
+    for el in sorted(by_el, key=str.lower):
+        columns = []
+        for _, attribute, higher_is_better in THROUGHPUT_RANKINGS:
+            ranked = [(zkvm, getattr(stats, attribute)) for zkvm, stats in by_el[el]
+                      if getattr(stats, attribute) is not None]
+            ranked.sort(key=lambda item: item[1], reverse=higher_is_better)
+            columns.append(ranked)
+        if any(columns):
+            rankings.append((el, columns))
+
+    if not rankings:
+        return
+
+    yield '''
+        <h2 class="section-title">🏁 Gas Throughput Rankings</h2>
+        <div class="overflow-container">
+        <table class="summary-table">
+            <thead>
+                <tr>
+                    <th>EL</th>
+                    <th>Rank</th>'''
+    for title, _, higher_is_better in THROUGHPUT_RANKINGS:
+        direction = 'higher' if higher_is_better else 'lower'
+        yield f'''
+                    <th title="{direction} is better">{title}</th>'''
+    yield '''
+                </tr>
+            </thead>
+            <tbody>
+    '''
+
+    for el, columns in rankings:
+        for rank in range(max(len(ranked) for ranked in columns)):
+            cells = []
+            for ranked in columns:
+                if rank < len(ranked):
+                    zkvm, value = ranked[rank]
+                    cells.append(f'<td><strong>{zkvm}</strong> <span class="cycles-value">'
+                                 f'{format_throughput(value)}</span></td>')
+                else:
+                    cells.append('<td></td>')
+            yield f'''
+                <tr>
+                    <td>{el}</td>
+                    <td class="neutral-value">{rank + 1}</td>
+                    {''.join(cells)}
+                </tr>'''
+
+    yield '''
+            </tbody>
+        </table>
+        </div>
+    '''
+
+
+def generate_region_breakdown(table: ResultTable) -> Iterator[str]:
+    """
+    Yield a table with one row per (EL, zkVM) showing how its cycles split
+    over the guest regions, summed over all successful tests.
+    """
+    shares = calculate_region_shares(table)
+    if not shares:
+        return
+
+    colors = region_colors(table)
+    yield f'''
+        <h2 class="section-title">🧩 Cycle Breakdown by Region</h2>
+        {region_legend(colors)}
+        <div class="overflow-container">
+        <table class="summary-table">
+            <thead>
+                <tr>
+                    <th>EL</th>
+                    <th>zkVM</th>
+                    <th>Tests</th>
+                    <th>Breakdown</th>'''
+    for region, _ in colors:
+        yield f'''
+                    <th>{region}</th>'''
+    yield '''
+                    <th>unattributed</th>
+                </tr>
+            </thead>
+            <tbody>
+    '''
+
+    for (zkvm, el) in sorted(shares, key=lambda group: (group[1].lower(), group[0].lower())):
+        tests, total, region_totals = shares[(zkvm, el)]
+        denominator = max(total, sum(region_totals))
+        percentages = [f"{cycles / denominator * 100:.1f}%" for cycles in region_totals]
+        percentages.append(f"{max(total - sum(region_totals), 0) / denominator * 100:.1f}%")
+        bar = region_bar([(region, color, cycles) for (region, color), cycles in zip(colors, region_totals)], total)
+        yield f'''
+                <tr>
+                    <td>{el}</td>
+                    <td><strong>{zkvm}</strong></td>
+                    <td class="neutral-value">{tests}</td>
+                    <td>{bar}</td>
+                    {''.join(f'<td class="cycles-value">{percentage}</td>' for percentage in percentages)}
+                </tr>'''
+
+    yield '''
             </tbody>
         </table>
         </div>
     '''
-    return html
-
-
-def generate_test_cell(
-    test_result: Optional[MetricsFile],
-    cycle_counts: List[int],
-    execution_times: List[float]
-) -> Tuple[str, Optional[int], Optional[float]]:
-    """Generate HTML content for a test result cell."""
-    if test_result:
-        metrics = test_result.metrics
-        execution = metrics.get('execution', {})
-
-        if 'success' in execution:
-            success_data = execution['success']
-            cycles = success_data.get('total_num_cycles')
-            duration = success_data.get('execution_duration', {})
-
-            cell_content = '<div class="combined-cell">'
-
-            if cycles:
-                cycles_formatted = format_number(cycles)
-                cell_content += f'<span class="cycles-value">{cycles_formatted} cycles</span>'
-                cycle_counts.append(cycles)
-            else:
-                cell_content += '<span class="no-data">No cycle data</span>'
-
-            if 'secs' in duration and 'nanos' in duration:
-                total_seconds = duration['secs'] + duration['nanos'] / 1_000_000_000
-                time_formatted = format_time(total_seconds)
-                cell_content += f'<span class="time-value">{time_formatted}</span>'
-                execution_times.append(total_seconds)
-            else:
-                cell_content += '<span class="no-data">No time data</span>'
-
-            cell_content += '</div>'
-            return f'<td>{cell_content}</td>', cycles, total_seconds if 'secs' in duration else None
-        else:
-            # Test failed or no success data
-            error_msg = "Failed"
-            if 'failure' in execution:
-                error_msg = "Failed"
-            elif 'error' in execution:
-                error_msg = "Error"
-            return f'<td><span class="error-value">{error_msg}</span></td>', None, None
-    else:
-        # No test result for this combination
-        return '<td><span class="no-data">-</span></td>', None, None
 
 
-def generate_detailed_results(metrics_data: Dict[str, Dict[str, List[MetricsFile]]]) -> str:
-    """Generate the detailed test results HTML."""
-    html = '''
+def sparkline_svg(values: List[float], title: str) -> str:
+    """Draw `values` as a small inline SVG line, scaled to their own range."""
+    width, height = 120, 24
+    low, high = min(values), max(values)
+    span = (high - low) or 1.0
+    step = width / (len(values) - 1)
+    points = ' '.join(
+        f"{i * step:.1f},{height - 2 - (value - low) / span * (height - 4):.1f}"
+        for i, value in enumerate(values)
+    )
+    return (f'<svg class="sparkline" width="{width}" height="{height}" viewBox="0 0 {width} {height}">'
+            f'<title>{title}</title><polyline points="{points}"/></svg>')
+
+
+def generate_trend_summary(trends: TrendData) -> Iterator[str]:
+    """
+    Yield a table with one row per (EL, zkVM) of the history, showing the
+    daily cost index of every trend metric as a sparkline.
+    """
+    if not trends.zkvms:
+        return
+
+    yield '''
+        <h2 class="section-title">📈 Trends</h2>
+        <p class="no-data">Daily cost index per zkVM across all versions: geometric mean over tests of each
+        value relative to the test's median (lower is better).</p>
+        <div class="overflow-container">
+        <table class="summary-table">
+            <thead>
+                <tr>
+                    <th>EL</th>
+                    <th>zkVM</th>'''
+    for _, title, _ in TREND_METRICS:
+        yield f'''
+                    <th>{title}</th>
+                    <th>Change</th>'''
+    yield '''
+                </tr>
+            </thead>
+            <tbody>
+    '''
+
+    for (el, zkvm) in sorted(trends.zkvms, key=lambda group: (group[0].lower(), group[1].lower())):
+        cells = []
+        for metric, title, _ in TREND_METRICS:
+            series = trends.zkvms[(el, zkvm)].get(metric, [])
+            if len(series) < 2:
+                cells.append('<td class="no-data">-</td><td class="no-data">-</td>')
+                continue
+            values = [value for _, value in series]
+            change = (values[-1] / values[0] - 1) * 100
+            title_text = f"{title} index, {series[0][0]} to {series[-1][0]}: {change:+.1f}%"
+            cells.append(f'<td>{sparkline_svg(values, title_text)}</td>'
+                         f'<td class="neutral-value">{change:+.1f}%</td>')
+        yield f'''
+                <tr>
+                    <td>{el}</td>
+                    <td><strong>{zkvm}</strong></td>
+                    {''.join(cells)}
+                </tr>'''
+
+    yield '''
+            </tbody>
+        </table>
+        </div>
+    '''
+
+
+def generate_detailed_results(
+    table: ResultTable,
+    pivot: Dict[int, PivotSection],
+    render_section: Optional[Callable[[PivotSection], Iterable[str]]] = None
+) -> Iterator[str]:
+    """
+    Yield the detailed test results HTML in chunks.
+
+    `render_section` can replace `generate_el_section`, e.g. to serve
+    unchanged sections from a cache.
+    """
+    yield '''
         <h2 class="section-title">🔍 Detailed Test Results</h2>
     '''
 
-    # Get all unique ELs
-    all_els = set()
-    for zkvm_data in metrics_data.values():
-        for el in zkvm_data.keys():
-            all_els.add(el)
+    for el_code in sorted(pivot, key=lambda code: table.el_names[code]):
+        if render_section is None:
+            yield from generate_el_section(table, pivot[el_code])
+        else:
+            yield from render_section(pivot[el_code])
 
-    for el in sorted(all_els):
-        html += generate_el_section(el, metrics_data)
 
-    return html
+def build_el_payload(
+    table: ResultTable,
+    section: PivotSection,
+    zkvm_indices: List[int],
+    trends: Optional[TrendData] = None
+) -> Dict[str, Any]:
+    """
+    Build the compact JSON payload the browser renders an EL table from.
+
+    Tests are ordered by display name. For every shown zkVM column, `cycles`
+    holds the cycle count (0 when a successful run has no cycle data, -1 for
+    a failed run, -2 when there is no result) and `times_us` the execution
+    time in microseconds (-1 when unavailable). If any result reports
+    regions, `regions` lists `(name, color)` in display order and
+    `region_cycles` the cycles per region of every successful result (null
+    otherwise). With `trends`, `trends` holds each test's historical cycle
+    counts, or null when it has no history.
+    """
+    present = (section.cells[:, zkvm_indices] >= 0).any(axis=1)
+    named_tests = sorted(
+        (clean_test_name(table.test_names[test_code]), test_index)
+        for test_index, test_code in enumerate(section.tests.tolist())
+        if present[test_index]
+    )
+    test_order = np.array([test_index for _, test_index in named_tests], dtype=np.int64)
+
+    region_order = region_display_order(table)
+    cycles_columns = []
+    times_columns = []
+    region_columns = []
+    for zkvm_index in zkvm_indices:
+        rows = section.cells[test_order, zkvm_index] if len(test_order) else np.empty(0, dtype=np.int64)
+        has_result = rows >= 0
+        safe_rows = np.where(has_result, rows, 0)
+        success = has_result & table.success[safe_rows]
+        cycles = np.where(success, np.maximum(table.cycles[safe_rows], 0), np.where(has_result, -1, -2))
+        duration_ns = table.duration_ns[safe_rows]
+        times_us = np.where(success & (duration_ns >= 0), duration_ns // 1_000, -1)
+        cycles_columns.append(cycles.tolist())
+        times_columns.append(times_us.tolist())
+        if region_order:
+            regions = table.region_cycles[safe_rows][:, region_order]
+            has_regions = (success & (regions >= 0).any(axis=1)).tolist()
+            region_columns.append([
+                parts if has else None
+                for parts, has in zip(np.maximum(regions, 0).tolist(), has_regions)
+            ])
+
+    payload = {
+        'zkvms': [table.zkvm_names[int(section.zkvms[i])] for i in zkvm_indices],
+        'tests': [name for name, _ in named_tests],
+        'cycles': cycles_columns,
+        'times_us': times_columns,
+    }
+    if any(parts is not None for column in region_columns for parts in column):
+        payload['regions'] = region_colors(table)
+        payload['region_cycles'] = region_columns
+    if trends is not None:
+        el = table.el_names[section.el]
+        test_names = [table.test_names[int(section.tests[test_index])] for _, test_index in named_tests]
+        payload['trends'] = [
+            [trends.tests.get((el, history_zkvm(zkvm), name)) for name in test_names]
+            for zkvm in payload['zkvms']
+        ]
+    return payload
+
+
+def generate_el_section(
+    table: ResultTable,
+    section: PivotSection,
+    zkvm_indices: Optional[List[int]] = None,
+    trends: Optional[TrendData] = None
+) -> Iterator[str]:
+    """
+    Yield the HTML for a single EL section from its pivot matrix.
 
+    The table body is left empty; its rows are rendered in the browser from
+    the embedded JSON payload, so large sections stay responsive.
+
+    If `zkvm_indices` is given, only those columns of the section are shown and
+    tests without a result for any of them are skipped.
+    """
+    el = table.el_names[section.el]
+    if zkvm_indices is None:
+        zkvm_indices = list(range(len(section.zkvms)))
+    payload = build_el_payload(table, section, zkvm_indices, trends)
 
-def generate_el_section(el: str, metrics_data: Dict[str, Dict[str, List[MetricsFile]]]) -> str:
-    """Generate HTML for a single EL section."""
     html = f'''
         <div class="el-section">
             <h3 class="el-header" onclick="toggleSection('{el}')" style="cursor: pointer; user-select: none;">
                 📊 {el.upper()} <span id="toggle-{el}" class="toggle-indicator">▼</span>
             </h3>
             <div id="section-{el}" class="el-content">
-                <div class="overflow-container">
+                <div class="table-toolbar">
+                    <input type="search" id="filter-{el}" class="table-filter" placeholder="Filter tests...">
+                    <span id="count-{el}" class="row-count"></span>
+                    {region_legend(payload['regions']) if 'regions' in payload else ''}
+                </div>
+                <div id="scroll-{el}" class="overflow-container virtual-scroll">
                     <table class="results-table">
                         <thead>
                             <tr>
@@ -766,81 +1358,28 @@ def generate_el_section(el: str, metrics_data: Dict[str, Dict[str, List[MetricsF
     '''
 
     # Create column headers for zkVMs available for this EL
-    el_combinations = []
-    for zkvm in sorted(metrics_data.keys()):
-        if el in metrics_data[zkvm]:
-            el_combinations.append(zkvm)
-            html += f'<th class="sortable" data-el="{el}" data-col="{len(el_combinations)-1}">{zkvm}<span class="sort-indicator"></span></th>'
+    for col, zkvm in enumerate(payload['zkvms']):
+        html += f'<th class="sortable" data-el="{el}" data-col="{col}">{zkvm}<span class="sort-indicator"></span></th>'
 
-    # Add the average cycles column for this EL
-    html += f'<th class="sortable" data-el="{el}" data-col="{len(el_combinations)}">Avg. Execution Time<span class="sort-indicator"></span></th>'
+    # Add the average execution time column for this EL
+    html += f'<th class="sortable" data-el="{el}" data-col="{len(payload["zkvms"])}">Avg. Execution Time<span class="sort-indicator"></span></th>'
 
-    html += '''
+    html += f'''
                             </tr>
                         </thead>
-                        <tbody id="tbody-''' + el + '''">
-    '''
-
-    # Collect all unique test names for this EL
-    el_test_names = set()
-    for zkvm in el_combinations:
-        if zkvm in metrics_data and el in metrics_data[zkvm]:
-            for test in metrics_data[zkvm][el]:
-                test_name = test.name
-                clean_name = clean_test_name(test_name)
-                el_test_names.add((test_name, clean_name))
-
-    # Sort test names for consistent display
-    sorted_el_test_names = sorted(el_test_names, key=lambda x: x[1])
-
-    # Generate table rows for this EL
-    for original_name, display_name in sorted_el_test_names:
-        html += f'''
-                            <tr>
-                                <td class="test-name-cell">{display_name}</td>
-        '''
-
-        # Collect cycle counts for this test across all zkVMs for this EL
-        cycle_counts: List[int] = []
-        execution_times: List[float] = []
-        row_cells = []
-
-        for zkvm in el_combinations:
-            # Find test result for this combination
-            test_result = None
-            if zkvm in metrics_data and el in metrics_data[zkvm]:
-                for test in metrics_data[zkvm][el]:
-                    if test.name == original_name:
-                        test_result = test
-                        break
-
-            cell_html, _, _ = generate_test_cell(test_result, cycle_counts, execution_times)
-            row_cells.append(cell_html)
-
-        # Add all the zkVM cells for this EL
-        for cell in row_cells:
-            html += cell
-
-        # Calculate and add average execution time for this EL
-        if execution_times:
-            avg_time = sum(execution_times) / len(execution_times)
-            avg_time_formatted = format_time(avg_time)
-            html += f'<td class="time-value" data-avg-time="{avg_time}">{avg_time_formatted}</td>'
-        else:
-            html += '<td class="no-data" data-avg-time="-1">No data</td>'
-
-        html += '''
-                            </tr>
-        '''
-
-    html += '''
-                        </tbody>
+                        <tbody id="tbody-{el}"></tbody>
                     </table>
                 </div>
             </div>
+            <script type="application/json" class="el-data" data-el="{el}">'''
+    yield html
+
+    # Keep "</script>" sequences inside test names from closing the payload early
+    yield json.dumps(payload, separators=(',', ':')).replace('</', '<\\/')
+
+    yield '''</script>
         </div>
     '''
-    return html
 
 
 def clean_test_name(test_name: str) -> str:
@@ -852,59 +1391,282 @@ def clean_test_name(test_name: str) -> str:
             .replace(']', ')'))
 
 
-def generate_html_report(metrics_data: Dict[str, Dict[str, List[MetricsFile]]], output_file: Path) -> None:
-    """Generate an HTML report from the metrics data."""
-    # Build content sections
-    content = ''
-    if not metrics_data:
-        content = '''
-        <div class="no-data">
-            <h2>No metrics data found</h2>
-            <p>No benchmark results were found in the specified directories.</p>
-        </div>
-        '''
-    else:
-        content = generate_summary_table(metrics_data) + generate_detailed_results(metrics_data)
-
-    # Generate final HTML
+def write_html_page(output_file: Path, chunks: Iterable[str]) -> None:
+    """Stream an HTML page to `output_file`, writing content chunks as they are produced."""
+    header, footer = get_html_template().split('{content}')
     timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S UTC")
-    html_content = get_html_template().format(
-        css_styles=get_css_styles(),
-        javascript_code=get_javascript_code(),
-        content=content,
-        timestamp=timestamp
-    )
 
-    # Write the HTML file
-    with open(output_file, 'w') as f:
-        f.write(html_content)
+    with open(output_file, 'w', buffering=WRITE_BUFFER_SIZE) as f:
+        f.write(header.format(
+            css_styles=get_css_styles(),
+            javascript_code=get_javascript_code()
+        ))
+        for chunk in chunks:
+            f.write(chunk)
+        f.write(footer.format(timestamp=timestamp))
+
+
+def slugify(name: str) -> str:
+    """Turn an EL or zkVM label into a file-name friendly slug."""
+    return re.sub(r'[^a-z0-9.]+', '-', name.lower()).strip('-')
+
+
+def generate_page_links(links: List[Tuple[str, str, int]]) -> Iterator[str]:
+    """Yield the index page list linking to each shard page."""
+    yield '''
+        <h2 class="section-title">🔍 Detailed Test Results</h2>
+        <ul class="page-links">
+    '''
+    for href, label, test_count in links:
+        yield f'''
+            <li><a href="{href}">{label}</a> <span class="no-data">({test_count} tests)</span></li>'''
+    yield '''
+        </ul>
+    '''
+
+
+def generate_shard_header(title: str, index_name: str) -> str:
+    """Return the heading shown at the top of a shard page."""
+    return f'''
+        <p><a href="{index_name}">← Back to summary</a></p>
+        <h2 class="section-title">📊 {title}</h2>
+    '''
+
+
+class SectionCache:
+    """
+    Rendered EL sections from previous runs, with a manifest of the input
+    content hashes each one was rendered from.
+
+    A section is re-rendered only when the hash of its inputs (see
+    `ResultTable.group_digests`) or of the renderer itself changes; otherwise
+    the cached fragment is spliced into the output as-is.
+    """
+
+    MANIFEST = 'manifest.json'
+
+    def __init__(self, cache_dir: Path):
+        self.cache_dir = cache_dir
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        try:
+            with open(cache_dir / self.MANIFEST) as f:
+                self.previous: Dict[str, str] = json.load(f).get('fragments', {})
+        except (OSError, ValueError):
+            self.previous = {}
+        self.current: Dict[str, str] = {}
+        self.reused = 0
+        self.rendered = 0
+
+    def _fragment_path(self, key: str) -> Path:
+        return self.cache_dir / f"{hashlib.sha1(key.encode()).hexdigest()}.html"
+
+    def is_fresh(self, key: str, digest: str) -> bool:
+        """True if the fragment for `key` was rendered from inputs hashing to `digest`."""
+        return self.previous.get(key) == digest and self._fragment_path(key).exists()
+
+    def fragment(self, key: str, digest: str, render: Callable[[], Iterable[str]]) -> Iterator[str]:
+        """Yield the cached fragment for `key`, or render it and store it while yielding."""
+        self.current[key] = digest
+        path = self._fragment_path(key)
+        if self.is_fresh(key, digest):
+            self.reused += 1
+            with open(path) as f:
+                while True:
+                    chunk = f.read(WRITE_BUFFER_SIZE)
+                    if not chunk:
+                        break
+                    yield chunk
+            return
+
+        self.rendered += 1
+        tmp_path = path.with_suffix('.tmp')
+        with open(tmp_path, 'w', buffering=WRITE_BUFFER_SIZE) as f:
+            for chunk in render():
+                f.write(chunk)
+                yield chunk
+        os.replace(tmp_path, path)
+
+    def keep(self, key: str, digest: str) -> None:
+        """Record that a fresh fragment is still in use without reading it."""
+        self.current[key] = digest
+        self.reused += 1
+
+    def save(self) -> None:
+        """Write the manifest and drop fragments that are no longer referenced."""
+        for key in set(self.previous) - set(self.current):
+            self._fragment_path(key).unlink(missing_ok=True)
+        tmp_path = self.cache_dir / f"{self.MANIFEST}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump({'fragments': self.current}, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.cache_dir / self.MANIFEST)
+
+
+def renderer_digest() -> str:
+    """Hash of the code that renders sections, so code changes invalidate the cache."""
+    digest = hashlib.sha256()
+    for name in (Path(__file__).name, 'results_table.py'):
+        digest.update((Path(__file__).parent / name).read_bytes())
+    return digest.hexdigest()
+
+
+def section_digest(
+    table: ResultTable,
+    section: PivotSection,
+    zkvm_indices: List[int],
+    group_digests: Dict[Tuple[int, int], str],
+    renderer: str
+) -> str:
+    """Combine the input hashes of all (zkVM, EL) groups shown in a section."""
+    digest = hashlib.sha256(renderer.encode())
+    for zkvm_index in zkvm_indices:
+        zkvm_code = int(section.zkvms[zkvm_index])
+        digest.update(table.zkvm_names[zkvm_code].encode())
+        digest.update(group_digests[(zkvm_code, section.el)].encode())
+    return digest.hexdigest()
+
+
+def generate_html_report(
+    table: ResultTable,
+    output_file: Path,
+    split: str = 'none',
+    cache: Optional[SectionCache] = None,
+    trends: Optional[TrendData] = None
+) -> None:
+    """
+    Generate an HTML report from the metrics data.
+
+    With `split` set to 'el' or 'zkvm', `output_file` only holds the summary
+    and links to one page per EL or per zkVM written next to it.
+
+    With a `cache`, EL sections whose inputs did not change since the previous
+    run are spliced in from the cache instead of being rendered, and shard
+    pages made only of such sections are not rewritten at all.
+
+    With `trends`, the summary gains per-zkVM trend sparklines and every
+    result cell a sparkline of the test's history.
+    """
+    if len(table) == 0:
+        write_html_page(output_file, [NO_DATA_HTML])
+        print(f"HTML report generated: {output_file}")
+        return
+
+    pivot = build_pivot(table)
+    el_codes = sorted(pivot, key=lambda code: table.el_names[code])
+    group_digests = table.group_digests() if cache is not None else {}
+    renderer = renderer_digest() if cache is not None else ''
+    if cache is not None and trends is not None:
+        renderer += trends.digest
+
+    def section_chunks(key: str, section: PivotSection, zkvm_indices: List[int]) -> Iterable[str]:
+        render = lambda: generate_el_section(table, section, zkvm_indices, trends)
+        if cache is None:
+            return render()
+        digest = section_digest(table, section, zkvm_indices, group_digests, renderer)
+        return cache.fragment(key, digest, render)
+
+    def write_shard(page: Path, title: str, parts: List[Tuple[str, PivotSection, List[int]]]) -> None:
+        if cache is not None and page.exists():
+            digests = [
+                (key, section_digest(table, section, indices, group_digests, renderer))
+                for key, section, indices in parts
+            ]
+            if all(cache.is_fresh(key, digest) for key, digest in digests):
+                for key, digest in digests:
+                    cache.keep(key, digest)
+                return
+        write_html_page(page, chain(
+            [generate_shard_header(title, output_file.name)],
+            *(section_chunks(key, section, indices) for key, section, indices in parts)
+        ))
+
+    links: List[Tuple[str, str, int]] = []
+    if split == 'none':
+        detailed = generate_detailed_results(table, pivot, lambda section: section_chunks(
+            f"el:{table.el_names[section.el]}", section, list(range(len(section.zkvms)))
+        ))
+    elif split == 'el':
+        for el_code in el_codes:
+            el = table.el_names[el_code]
+            section = pivot[el_code]
+            page = output_file.with_name(f"el-{slugify(el)}.html")
+            write_shard(page, el.upper(), [(f"el:{el}", section, list(range(len(section.zkvms))))])
+            links.append((page.name, el.upper(), len(section.tests)))
+        detailed = generate_page_links(links)
+    else:
+        for zkvm_code in sorted(range(len(table.zkvm_names)), key=lambda code: table.zkvm_names[code]):
+            zkvm = table.zkvm_names[zkvm_code]
+            parts = [
+                (f"zkvm:{zkvm}:{table.el_names[el_code]}", pivot[el_code],
+                 [int(np.flatnonzero(pivot[el_code].zkvms == zkvm_code)[0])])
+                for el_code in el_codes if zkvm_code in pivot[el_code].zkvms
+            ]
+            page = output_file.with_name(f"zkvm-{slugify(zkvm)}.html")
+            write_shard(page, zkvm, parts)
+            test_count = sum(int((section.cells[:, indices[0]] >= 0).sum()) for _, section, indices in parts)
+            links.append((page.name, zkvm, test_count))
+        detailed = generate_page_links(links)
+
+    trend_summary = generate_trend_summary(trends) if trends is not None else []
+    write_html_page(output_file, chain(generate_summary_table(table, pivot), generate_region_breakdown(table),
+                                       trend_summary, detailed))
+
+    pages = f" (+{len(links)} {split} pages)" if links else ''
+    print(f"HTML report generated: {output_file}{pages}")
+    if cache is not None:
+        cache.save()
+        print(f"Sections rendered: {cache.rendered}, reused from cache: {cache.reused}")
 
-    print(f"HTML report generated: {output_file}")
 
 def main() -> int:
     """Main entry point for the script."""
     parser = argparse.ArgumentParser(description='Generate zkEVM benchmark website')
     parser.add_argument('--input-dir', '-i', type=Path, default=Path('.'),
-                        help='Input directory containing zkevm-metrics folders (default: current directory)')
+                        help='Input directory containing zkevm-metrics folders, or a results store '
+                             '(<file>.sqlite[#<run>]) written by ingest_metrics.py (default: current directory)')
     parser.add_argument('--output-file', '-o', type=Path, default=Path('index.html'),
                         help='Output HTML file (default: index.html)')
+    parser.add_argument('--jobs', '-j', type=int, default=None,
+                        help='Number of worker processes used to parse metrics (default: CPU count)')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='Do not read or update the metrics cache stored in the input directory '
+                             'or the rendered section cache')
+    parser.add_argument('--cache-dir', type=Path, default=None,
+                        help='Directory for rendered sections and their input manifest '
+                             '(default: .website-cache next to the output file)')
+    parser.add_argument('--split', choices=['none', 'el', 'zkvm'], default='none',
+                        help='Write one page per EL or per zkVM next to a light index page (default: none)')
+    parser.add_argument('--history', type=Path, default=None,
+                        help='Results store whose history is drawn as trend sparklines')
 
     args = parser.parse_args()
 
-    if not args.input_dir.exists():
+    store_source = parse_store_source(args.input_dir)
+    input_path = store_source[0] if store_source else args.input_dir
+    if not input_path.exists():
         print(f"Error: Input directory {args.input_dir} does not exist")
         return 1
+    if args.history is not None and not args.history.is_file():
+        print(f"Error: History store {args.history} does not exist")
+        return 1
 
     print(f"Scanning for metrics in: {args.input_dir}")
-    metrics_data = collect_metrics_data(args.input_dir)
+    table = collect_metrics_data(args.input_dir, args.jobs, not args.no_cache)
 
-    if not metrics_data:
+    if len(table) == 0:
         print("Warning: No metrics data found")
     else:
-        total_tests = sum(len(el_data) for zkvm_data in metrics_data.values() for el_data in zkvm_data.values())
-        print(f"Found {total_tests} test results across {len(metrics_data)} zkVMs")
-
-    generate_html_report(metrics_data, args.output_file)
+        print(f"Found {len(table)} test results across {len(table.zkvm_names)} zkVMs")
+
+    trends = None
+    if args.history is not None:
+        trends = load_trends(args.history)
+        if trends is not None:
+            print(f"Loaded trends for {len(trends.tests)} tests and {len(trends.zkvms)} zkVMs from {args.history}")
+
+    cache = None
+    if not args.no_cache:
+        cache = SectionCache(args.cache_dir or args.output_file.parent / '.website-cache')
+    generate_html_report(table, args.output_file, args.split, cache, trends)
     return 0
 
 if __name__ == '__main__':
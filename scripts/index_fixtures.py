@@ -0,0 +1,581 @@
+#!/usr/bin/env python3
+"""
+Script to index EEST blockchain test fixtures, so subsets can be selected,
+counted and sharded without loading the fixture JSON.
+
+Usage:
+    python3 index_fixtures.py index <fixtures_dir> [--index FILE]
+    python3 index_fixtures.py count [filters] [--by fork|gas|file]
+    python3 index_fixtures.py select [filters] [--shard I/N] [--format names|tsv|json]
+    python3 index_fixtures.py extract [filters] [--shard I/N] -o <dir>
+
+Example:
+    python3 index_fixtures.py index zkevm-fixtures
+    python3 index_fixtures.py count --fork Prague --by gas
+    python3 index_fixtures.py select --gas-value 10M --include test_worst_ --shard 1/4
+    python3 index_fixtures.py extract --gas-value 10M --include ADD -o subset
+    cargo run --release -- tests --eest-fixtures-path subset
+
+`index` walks `<fixtures_dir>/fixtures/blockchain_tests` (or `<fixtures_dir>`
+itself if it has no such folder). Every file is memory-mapped and scanned for
+the handful of fields that are indexed, skipping the rest of the JSON without
+decoding it. For every test the index records its name, file, byte offset and
+length, fork, gas value (from the `benchmark-gas-value_*` part of the name),
+the gas used by its last block, its number of blocks, the size of its `pre`
+state and, when the fixture carries one, the size of the last block's
+execution witness. Re-indexing only scans new and changed files.
+
+Filters match the witness generator: --include keeps tests whose name
+contains every given string and --exclude drops tests containing any. Names
+are the last path segment of the test key, as used for the generated
+fixtures. Shards are balanced by block gas used.
+
+`extract` writes the selected tests to `<dir>/fixtures/blockchain_tests`,
+copying each one straight from its byte range, for use with
+`witness-generator-cli tests --eest-fixtures-path <dir>`.
+"""
+
+import argparse
+import json
+import mmap
+import os
+import re
+import sqlite3
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from metrics_loader import map_files
+
+INDEX_FILE = 'fixtures-index.sqlite'
+SUITE_FOLDER = Path('fixtures') / 'blockchain_tests'
+
+GAS_VALUE_PATTERN = re.compile(r'gas-value_(\d+(?:\.\d+)?)([KMG]?)')
+FORK_PATTERN = re.compile(r'fork_([A-Za-z]+)')
+GAS_UNITS = {'': 1, 'K': 1_000, 'M': 1_000_000, 'G': 1_000_000_000}
+
+WHITESPACE = re.compile(rb'[ \t\r\n]*')
+STRING_END = re.compile(rb'(?:[^"\\]|\\.)*"', re.S)
+SCALAR = re.compile(rb'[^,}\]\s]+')
+# Runs of plain bytes and whole strings, up to the next bracket
+NON_BRACKETS = re.compile(rb'(?:[^{}\[\]"]+|"(?:[^"\\]|\\.)*")*', re.S)
+
+ANY_TEST = '*'
+ARRAY_ITEM = '[]'
+# Values captured per test, by their path below the test object
+STRING_FIELDS = {
+    (ANY_TEST, 'network'): 'network',
+    (ANY_TEST, 'blocks', ARRAY_ITEM, 'blockHeader', 'gasUsed'): 'gas_used',
+}
+SIZE_FIELDS = {
+    (ANY_TEST, 'pre'): 'pre_size',
+    (ANY_TEST, 'blocks', ARRAY_ITEM, 'executionWitness'): 'witness_size',
+    (ANY_TEST, 'blocks', ARRAY_ITEM, 'witness'): 'witness_size',
+}
+COUNT_FIELDS = {
+    (ANY_TEST, 'blocks', ARRAY_ITEM): 'blocks',
+}
+# Paths whose contents have to be walked; everything else is skipped
+INTERESTING = {path[:i] for path in (*STRING_FIELDS, *SIZE_FIELDS, *COUNT_FIELDS) for i in range(len(path) + 1)}
+
+
+@dataclass
+class IndexedTest:
+    """One blockchain test and where to find it."""
+    key: str
+    name: str
+    offset: int
+    length: int
+    fork: Optional[str]
+    gas_value: Optional[int]
+    block_gas_used: Optional[int]
+    blocks: int
+    pre_size: Optional[int]
+    witness_size: Optional[int]
+
+
+def short_name(key: str) -> str:
+    """Name of a test as used by the witness generator: the last path segment of its key."""
+    return key.rsplit('/', 1)[-1]
+
+
+def parse_gas_value(text: str) -> Optional[int]:
+    """Gas value of a test name or a size such as `10M`, or None."""
+    match = GAS_VALUE_PATTERN.search(text) or re.fullmatch(r'(\d+(?:\.\d+)?)([KMG]?)', text.strip().upper())
+    if not match:
+        return None
+    return int(float(match.group(1)) * GAS_UNITS[match.group(2)])
+
+
+def format_gas(value: Optional[int]) -> str:
+    if value is None:
+        return "N/A"
+    for unit, factor in (('G', 1_000_000_000), ('M', 1_000_000), ('K', 1_000)):
+        if value >= factor and value % factor == 0:
+            return f"{value // factor}{unit}"
+    return str(value)
+
+
+class FixtureScanner:
+    """
+    Single-pass scanner over a memory-mapped blockchain test file. Only the
+    containers on the way to an indexed field are walked; every other value
+    is skipped by matching brackets and strings, without decoding.
+    """
+
+    def __init__(self, buffer: Any):
+        self.buffer = buffer
+        self.captured: Dict[str, Any] = {}
+
+    def skip_whitespace(self, pos: int) -> int:
+        return WHITESPACE.match(self.buffer, pos).end()
+
+    def string_end(self, pos: int) -> int:
+        """End of the string starting with the quote at `pos`."""
+        match = STRING_END.match(self.buffer, pos + 1)
+        if match is None:
+            raise ValueError(f"unterminated string at byte {pos}")
+        return match.end()
+
+    def skip_value(self, pos: int) -> int:
+        """End of the value starting at `pos`."""
+        char = self.buffer[pos:pos + 1]
+        if char == b'"':
+            return self.string_end(pos)
+        if char not in (b'{', b'['):
+            return SCALAR.match(self.buffer, pos).end()
+        depth = 0
+        while True:
+            pos = NON_BRACKETS.match(self.buffer, pos).end()
+            char = self.buffer[pos:pos + 1]
+            if not char or char == b'"':
+                raise ValueError(f"unterminated value at byte {pos}")
+            depth += 1 if char in (b'{', b'[') else -1
+            pos += 1
+            if depth == 0:
+                return pos
+
+    def expect(self, pos: int, char: bytes) -> int:
+        pos = self.skip_whitespace(pos)
+        if self.buffer[pos:pos + 1] != char:
+            raise ValueError(f"expected {char.decode()} at byte {pos}")
+        return pos + 1
+
+    def members(self, pos: int) -> Iterator[Tuple[str, int]]:
+        """
+        Yield `(key, value start)` of every member of the object starting at
+        `pos`. The caller sets `self.pos` to the end of each value before
+        resuming; afterwards `self.pos` is the end of the object.
+        """
+        pos = self.expect(pos, b'{')
+        pos = self.skip_whitespace(pos)
+        if self.buffer[pos:pos + 1] == b'}':
+            self.pos = pos + 1
+            return
+        while True:
+            end = self.string_end(pos)
+            key = json.loads(self.buffer[pos:end])
+            pos = self.skip_whitespace(self.expect(end, b':'))
+            self.pos = pos
+            yield key, pos
+            pos = self.skip_whitespace(self.pos)
+            char = self.buffer[pos:pos + 1]
+            if char == b'}':
+                self.pos = pos + 1
+                return
+            if char != b',':
+                raise ValueError(f"expected , or }} at byte {pos}")
+            pos = self.skip_whitespace(pos + 1)
+
+    def scan_value(self, pos: int, path: Tuple[str, ...]) -> int:
+        """Scan the value at `pos`, capturing indexed fields; returns its end."""
+        if path not in INTERESTING:
+            return self.skip_value(pos)
+
+        char = self.buffer[pos:pos + 1]
+        if path in SIZE_FIELDS and not any(len(p) > len(path) and p[:len(path)] == path for p in INTERESTING):
+            end = self.skip_value(pos)
+            self.captured[SIZE_FIELDS[path]] = end - pos
+            return end
+        if path in COUNT_FIELDS:
+            name = COUNT_FIELDS[path]
+            self.captured[name] = self.captured.get(name, 0) + 1
+
+        if char == b'{':
+            for key, value_pos in self.members(pos):
+                self.pos = self.scan_value(value_pos, path + (key,))
+            return self.pos
+        if char == b'[':
+            pos = self.skip_whitespace(pos + 1)
+            if self.buffer[pos:pos + 1] == b']':
+                return pos + 1
+            while True:
+                pos = self.skip_whitespace(self.scan_value(pos, path + (ARRAY_ITEM,)))
+                char = self.buffer[pos:pos + 1]
+                if char == b']':
+                    return pos + 1
+                if char != b',':
+                    raise ValueError(f"expected , or ] at byte {pos}")
+                pos = self.skip_whitespace(pos + 1)
+
+        end = self.skip_value(pos)
+        if path in STRING_FIELDS:
+            raw = bytes(self.buffer[pos:end])
+            self.captured[STRING_FIELDS[path]] = json.loads(raw) if raw.startswith(b'"') else raw.decode()
+        return end
+
+    def tests(self) -> Iterator[IndexedTest]:
+        """Yield every test of the file in order."""
+        start = self.skip_whitespace(0)
+        for key, value_pos in self.members(start):
+            self.captured = {}
+            end = self.scan_value(value_pos, (ANY_TEST,))
+            self.pos = end
+            name = short_name(key)
+            fork = self.captured.get('network')
+            if fork is None:
+                match = FORK_PATTERN.search(name)
+                fork = match.group(1) if match else None
+            gas_used = self.captured.get('gas_used')
+            yield IndexedTest(
+                key=key,
+                name=name,
+                offset=value_pos,
+                length=end - value_pos,
+                fork=fork,
+                gas_value=parse_gas_value(name),
+                block_gas_used=int(gas_used, 0) if gas_used else None,
+                blocks=self.captured.get('blocks', 0),
+                pre_size=self.captured.get('pre_size'),
+                witness_size=self.captured.get('witness_size'),
+            )
+
+
+def scan_file(path: Path) -> Tuple[Path, Optional[List[IndexedTest]], Optional[str]]:
+    """Index one fixture file; returns `(path, tests, error)`."""
+    try:
+        with open(path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return path, [], None
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+                return path, list(FixtureScanner(buffer).tests()), None
+    except (OSError, ValueError, IndexError) as e:
+        return path, None, str(e)
+
+
+def read_test(path: Path, offset: int, length: int) -> bytes:
+    """The raw JSON of one test, read straight from its byte range."""
+    with open(path, 'rb') as f:
+        f.seek(offset)
+        return f.read(length)
+
+
+class FixtureIndex:
+    """SQLite index of the tests of a fixtures tree."""
+
+    SCHEMA_VERSION = 1
+
+    SCHEMA = '''
+        CREATE TABLE IF NOT EXISTS files (
+            id INTEGER PRIMARY KEY,
+            path TEXT NOT NULL UNIQUE,
+            mtime_ns INTEGER NOT NULL,
+            size INTEGER NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS tests (
+            id INTEGER PRIMARY KEY,
+            file_id INTEGER NOT NULL REFERENCES files(id),
+            key TEXT NOT NULL,
+            name TEXT NOT NULL,
+            offset INTEGER NOT NULL,
+            length INTEGER NOT NULL,
+            fork TEXT,
+            gas_value INTEGER,
+            block_gas_used INTEGER,
+            blocks INTEGER NOT NULL,
+            pre_size INTEGER,
+            witness_size INTEGER
+        );
+        CREATE INDEX IF NOT EXISTS tests_file ON tests(file_id);
+        CREATE INDEX IF NOT EXISTS tests_name ON tests(name);
+        CREATE INDEX IF NOT EXISTS tests_fork_gas ON tests(fork, gas_value);
+        CREATE INDEX IF NOT EXISTS tests_gas ON tests(gas_value);
+    '''
+
+    TEST_COLUMNS = ('key', 'name', 'offset', 'length', 'fork', 'gas_value', 'block_gas_used', 'blocks',
+                    'pre_size', 'witness_size')
+
+    def __init__(self, path: Path, create: bool = False):
+        if not create and not path.is_file():
+            raise FileNotFoundError(f"{path} does not exist, run `index_fixtures.py index` first")
+        self.path = path
+        self.conn = sqlite3.connect(str(path))
+        version = self.conn.execute('PRAGMA user_version').fetchone()[0]
+        if version == 0 and create:
+            self.conn.executescript(self.SCHEMA)
+            self.conn.execute(f'PRAGMA user_version = {self.SCHEMA_VERSION}')
+        elif version != self.SCHEMA_VERSION:
+            self.conn.close()
+            raise ValueError(f"{path} is not a fixture index with schema version {self.SCHEMA_VERSION}")
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def update(self, root: Path, workers: Optional[int] = None) -> Tuple[int, int, int, List[str]]:
+        """
+        Index the JSON files below `root`, rescanning only new and changed
+        files and dropping removed ones. Returns `(scanned files, unchanged
+        files, tests, errors)`.
+        """
+        paths = sorted(path for path in root.rglob('*.json') if path.is_file())
+        known = {path: (file_id, mtime_ns, size) for file_id, path, mtime_ns, size in
+                 self.conn.execute('SELECT id, path, mtime_ns, size FROM files')}
+        stats = {path: path.stat() for path in paths}
+        changed = [path for path in paths
+                   if known.get(str(path.resolve()), (None, None, None))[1:] !=
+                   (stats[path].st_mtime_ns, stats[path].st_size)]
+        current = {str(path.resolve()) for path in paths}
+
+        errors = []
+        with self.conn:
+            for path, (file_id, _, _) in known.items():
+                if path not in current:
+                    self.conn.execute('DELETE FROM tests WHERE file_id = ?', (file_id,))
+                    self.conn.execute('DELETE FROM files WHERE id = ?', (file_id,))
+            for path, tests, error in map_files(scan_file, changed, workers):
+                if error is not None:
+                    errors.append(f"{path}: {error}")
+                    continue
+                resolved = str(path.resolve())
+                row = known.get(resolved)
+                if row is not None:
+                    self.conn.execute('DELETE FROM tests WHERE file_id = ?', (row[0],))
+                    self.conn.execute('UPDATE files SET mtime_ns = ?, size = ? WHERE id = ?',
+                                      (stats[path].st_mtime_ns, stats[path].st_size, row[0]))
+                    file_id = row[0]
+                else:
+                    file_id = self.conn.execute('INSERT INTO files (path, mtime_ns, size) VALUES (?, ?, ?)',
+                                                (resolved, stats[path].st_mtime_ns, stats[path].st_size)).lastrowid
+                self.conn.executemany(f'''
+                    INSERT INTO tests (file_id, {', '.join(self.TEST_COLUMNS)})
+                    VALUES (?, {', '.join('?' * len(self.TEST_COLUMNS))})
+                ''', [(file_id,) + tuple(getattr(test, column) for column in self.TEST_COLUMNS) for test in tests])
+        total = self.conn.execute('SELECT COUNT(*) FROM tests').fetchone()[0]
+        return len(changed), len(paths) - len(changed), total, errors
+
+    def select(self, forks: Sequence[str] = (), gas_values: Sequence[int] = (), includes: Sequence[str] = (),
+               excludes: Sequence[str] = (), min_block_gas: Optional[int] = None,
+               max_block_gas: Optional[int] = None) -> List[Tuple]:
+        """`(file path, IndexedTest)` of the tests matching all filters, sorted by name."""
+        where, params = [], []
+        if forks:
+            where.append(f"fork IN ({', '.join('?' * len(forks))})")
+            params.extend(forks)
+        if gas_values:
+            where.append(f"gas_value IN ({', '.join('?' * len(gas_values))})")
+            params.extend(gas_values)
+        for include in includes:
+            where.append("instr(name, ?) > 0")
+            params.append(include)
+        for exclude in excludes:
+            where.append("instr(name, ?) = 0")
+            params.append(exclude)
+        if min_block_gas is not None:
+            where.append("block_gas_used >= ?")
+            params.append(min_block_gas)
+        if max_block_gas is not None:
+            where.append("block_gas_used <= ?")
+            params.append(max_block_gas)
+        clause = f"WHERE {' AND '.join(where)}" if where else ""
+        columns = ', '.join(f"tests.{column}" for column in self.TEST_COLUMNS)
+        rows = self.conn.execute(f'''
+            SELECT files.path, {columns} FROM tests JOIN files ON files.id = tests.file_id
+            {clause} ORDER BY tests.name, tests.key
+        ''', params)
+        return [(Path(row[0]), IndexedTest(*row[1:])) for row in rows]
+
+
+def shard(tests: List[Tuple[Path, IndexedTest]], index: int, count: int) -> List[Tuple[Path, IndexedTest]]:
+    """
+    Shard `index` (1-based) of `count`, with the tests spread so that every
+    shard gets about the same block gas, heaviest tests first.
+    """
+    loads = [0] * count
+    members: List[List[Tuple[Path, IndexedTest]]] = [[] for _ in range(count)]
+    for entry in sorted(tests, key=lambda e: (-(e[1].block_gas_used or 0), e[1].name, e[1].key)):
+        target = loads.index(min(loads))
+        members[target].append(entry)
+        loads[target] += entry[1].block_gas_used or 0
+    return sorted(members[index - 1], key=lambda e: (e[1].name, e[1].key))
+
+
+def parse_shard(value: str) -> Tuple[int, int]:
+    match = re.fullmatch(r'(\d+)/(\d+)', value)
+    if not match or not 1 <= int(match.group(1)) <= int(match.group(2)):
+        raise argparse.ArgumentTypeError(f"invalid shard '{value}', expected I/N with 1 <= I <= N")
+    return int(match.group(1)), int(match.group(2))
+
+
+def parse_gas_argument(value: str) -> int:
+    gas = parse_gas_value(value)
+    if gas is None:
+        raise argparse.ArgumentTypeError(f"invalid gas value '{value}', expected e.g. 10M or 30000000")
+    return gas
+
+
+def add_filter_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--index", default=INDEX_FILE, help=f"Index file (default: {INDEX_FILE})")
+    parser.add_argument("--fork", action="append", default=[], help="Only tests of this fork (repeatable)")
+    parser.add_argument("--gas-value", action="append", default=[], type=parse_gas_argument,
+                        help="Only tests with this benchmark gas value, e.g. 10M (repeatable)")
+    parser.add_argument("--include", action="append", default=[],
+                        help="Only tests whose name contains this string (repeatable, all must match)")
+    parser.add_argument("--exclude", action="append", default=[],
+                        help="Drop tests whose name contains this string (repeatable)")
+    parser.add_argument("--min-block-gas", type=parse_gas_argument, default=None,
+                        help="Only tests whose last block used at least this much gas")
+    parser.add_argument("--max-block-gas", type=parse_gas_argument, default=None,
+                        help="Only tests whose last block used at most this much gas")
+    parser.add_argument("--shard", type=parse_shard, default=None, metavar="I/N",
+                        help="Only shard I of N, balanced by block gas used")
+
+
+def selected_tests(args: argparse.Namespace) -> List[Tuple[Path, IndexedTest]]:
+    index = FixtureIndex(Path(args.index))
+    try:
+        tests = index.select(args.fork, args.gas_value, args.include, args.exclude,
+                             args.min_block_gas, args.max_block_gas)
+    finally:
+        index.close()
+    if args.shard is not None:
+        tests = shard(tests, *args.shard)
+    return tests
+
+
+def command_index(args: argparse.Namespace) -> int:
+    root = Path(args.fixtures)
+    if (root / SUITE_FOLDER).is_dir():
+        root = root / SUITE_FOLDER
+    if not root.is_dir():
+        print(f"Error: {root} is not a directory")
+        return 1
+    print(f"Indexing blockchain tests in: {root}")
+    index = FixtureIndex(Path(args.index), create=True)
+    try:
+        scanned, unchanged, total, errors = index.update(root, args.jobs)
+    finally:
+        index.close()
+    for error in errors:
+        print(f"Warning: Could not index {error}")
+    print(f"Scanned {scanned} files ({unchanged} unchanged), {total} tests indexed in {args.index}")
+    return 1 if errors else 0
+
+
+def command_count(args: argparse.Namespace) -> int:
+    tests = selected_tests(args)
+    groups: Dict[str, List[int]] = {}
+    for path, test in tests:
+        if args.by == 'fork':
+            group = test.fork or "N/A"
+        elif args.by == 'gas':
+            group = format_gas(test.gas_value)
+        else:
+            group = path.name
+        entry = groups.setdefault(group, [0, 0])
+        entry[0] += 1
+        entry[1] += test.block_gas_used or 0
+
+    group_width = max([len(group) for group in groups] + [20]) + 2
+    header = args.by.capitalize().ljust(group_width) + "Tests".ljust(10) + "Block gas used"
+    print(header)
+    print("-" * len(header))
+    for group in sorted(groups, key=lambda g: (parse_gas_value(g) or 0, g) if args.by == 'gas' else g):
+        count, gas = groups[group]
+        print(group.ljust(group_width) + f"{count:,}".ljust(10) + f"{gas:,}")
+    print(f"\n{len(tests):,} tests")
+    return 0
+
+
+def command_select(args: argparse.Namespace) -> int:
+    tests = selected_tests(args)
+    for path, test in tests:
+        if args.format == 'names':
+            print(test.name)
+        elif args.format == 'tsv':
+            print("\t".join(str(value) for value in (test.name, path, test.offset, test.length, test.fork,
+                                                    test.gas_value, test.block_gas_used, test.witness_size)))
+        else:
+            print(json.dumps({"file": str(path), **test.__dict__}))
+    return 0
+
+
+def command_extract(args: argparse.Namespace) -> int:
+    tests = selected_tests(args)
+    if not tests:
+        print("No tests selected")
+        return 1
+    output = Path(args.output) / SUITE_FOLDER
+    output.mkdir(parents=True, exist_ok=True)
+    by_file: Dict[Path, List[IndexedTest]] = {}
+    for path, test in tests:
+        by_file.setdefault(path, []).append(test)
+
+    # One output file per source file, keeping the tests in file order for sequential reads
+    for i, (path, file_tests) in enumerate(sorted(by_file.items())):
+        target = output / f"{i:04d}_{path.name}"
+        with open(path, 'rb') as source, open(target, 'wb') as out:
+            out.write(b'{\n')
+            for j, test in enumerate(sorted(file_tests, key=lambda t: t.offset)):
+                source.seek(test.offset)
+                out.write(b',\n' if j else b'')
+                out.write(json.dumps(test.key).encode() + b': ')
+                out.write(source.read(test.length))
+            out.write(b'\n}\n')
+    print(f"Extracted {len(tests)} tests from {len(by_file)} files to {output}", file=sys.stderr)
+    return 0
+
+
+def main():
+    """Main function."""
+    parser = argparse.ArgumentParser(
+        description="Index EEST blockchain test fixtures and select, count, shard or extract tests",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""Example:
+  python3 index_fixtures.py index zkevm-fixtures
+  python3 index_fixtures.py count --fork Prague --by gas
+  python3 index_fixtures.py select --gas-value 10M --include test_worst_ --shard 1/4
+  python3 index_fixtures.py extract --gas-value 10M --include ADD -o subset"""
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    index_parser = subparsers.add_parser("index", help="Index or re-index a fixtures tree")
+    index_parser.add_argument("fixtures", help="Fixtures folder, e.g. zkevm-fixtures")
+    index_parser.add_argument("--index", default=INDEX_FILE, help=f"Index file (default: {INDEX_FILE})")
+    index_parser.add_argument("-j", "--jobs", type=int, default=None,
+                              help="Number of worker processes used to scan files (default: CPU count)")
+
+    count_parser = subparsers.add_parser("count", help="Count the selected tests")
+    add_filter_arguments(count_parser)
+    count_parser.add_argument("--by", choices=["fork", "gas", "file"], default="fork",
+                              help="Group the counts by fork, gas value or file (default: fork)")
+
+    select_parser = subparsers.add_parser("select", help="List the selected tests")
+    add_filter_arguments(select_parser)
+    select_parser.add_argument("--format", choices=["names", "tsv", "json"], default="names",
+                               help="Output format (default: names)")
+
+    extract_parser = subparsers.add_parser("extract", help="Write the selected tests as a fixtures tree")
+    add_filter_arguments(extract_parser)
+    extract_parser.add_argument("-o", "--output", required=True, help="Output fixtures folder")
+
+    args = parser.parse_args()
+    commands = {"index": command_index, "count": command_count, "select": command_select, "extract": command_extract}
+    try:
+        return commands[args.command](args)
+    except (FileNotFoundError, ValueError) as e:
+        print(f"Error: {e}")
+        return 1
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Fold zkevm-metrics trees into a single indexed SQLite results store.
+
+Each metrics tree becomes a run of the store, identified by a label (by default
+the name of the tree's folder). Re-ingesting a label replaces that run.
+
+Usage:
+    python3 ingest_metrics.py <metrics_root> [<metrics_root> ...] -o results.sqlite
+
+Example:
+    python3 ingest_metrics.py zkevm-metrics -o results.sqlite --label baseline
+    python3 compare_executions.py results.sqlite#baseline results.sqlite#optimized
+    python3 generate-website.py -i results.sqlite#baseline
+
+A store (or one run of it, as `<file>.sqlite#<label>`) can be passed to
+compare_executions.py, compare_provings.py and generate-website.py wherever a
+metrics folder is accepted.
+
+Every ingested result is also appended to the store's history, which
+generate-website.py --history renders as trend sparklines. History points are
+never overwritten; conflicting results are reported and left out. Old history can be
+downsampled, e.g. to one point per week after 90 days:
+
+    python3 ingest_metrics.py nightly-42 -o results.sqlite --downsample-after 90 --bucket-days 7
+"""
+
+import argparse
+from pathlib import Path
+
+from metrics_loader import ResultsStore
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Ingest zkevm-metrics trees into an SQLite results store",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""Example:
+  python3 ingest_metrics.py zkevm-metrics -o results.sqlite --label baseline
+  python3 ingest_metrics.py --list -o results.sqlite
+  python3 ingest_metrics.py -o results.sqlite --downsample-after 90 --bucket-days 7"""
+    )
+    parser.add_argument("roots", type=Path, nargs='*',
+                        help="Metrics trees to ingest (a zkevm-metrics folder, an EL folder inside it, "
+                             "or a directory containing zkevm-metrics* folders)")
+    parser.add_argument("-o", "--output", type=Path, default=Path('results.sqlite'),
+                        help="Results store to create or update (default: results.sqlite)")
+    parser.add_argument("--label", help="Run label, only valid with a single root (default: folder name)")
+    parser.add_argument("-j", "--jobs", type=int, default=None,
+                        help="Number of worker processes used to parse metrics (default: CPU count)")
+    parser.add_argument("--list", action="store_true", help="List the runs in the store and exit")
+    parser.add_argument("--downsample-after", type=int, default=None, metavar="DAYS",
+                        help="Merge history points older than DAYS days into coarser buckets")
+    parser.add_argument("--bucket-days", type=int, default=7, metavar="DAYS",
+                        help="Width of the buckets old history is merged into (default: 7)")
+    args = parser.parse_args()
+
+    if args.label and len(args.roots) != 1:
+        parser.error("--label requires exactly one root")
+    if not args.roots and not args.list and args.downsample_after is None:
+        parser.error("no metrics roots given")
+    if args.bucket_days < 1:
+        parser.error("--bucket-days must be at least 1")
+
+    store = ResultsStore.open(args.output, create=bool(args.roots))
+    if store is None:
+        return 1
+
+    try:
+        for root in args.roots:
+            if not root.is_dir():
+                print(f"Error: {root} is not a directory")
+                return 1
+            label = args.label or root.resolve().name
+            results, hardware, conflicts = store.ingest(root, label, args.jobs)
+            print(f"Ingested {results} results and {hardware} hardware files from {root} as '{label}'")
+            if conflicts:
+                print(f"Warning: {conflicts} results were left out of the history: their EL, zkVM, version, test "
+                      "and timestamp match a point with different values or one merged by --downsample-after")
+
+        if args.downsample_after is not None:
+            before, after = store.downsample_history(args.downsample_after, args.bucket_days)
+            print(f"Downsampled {before} history points older than {args.downsample_after} days "
+                  f"into {after} points of {args.bucket_days} day(s)")
+
+        runs = store.runs()
+        print(f"\n{args.output} holds {len(runs)} run(s):")
+        for label, root, ingested_at, count in runs:
+            print(f"  {label:<30} {count:>8} results  {ingested_at}  {root}")
+        points, samples, first, last = store.history_summary()
+        if points:
+            print(f"History: {points} points from {samples} results, {first} to {last}")
+    finally:
+        store.close()
+
+    return 0
+
+
+if __name__ == '__main__':
+    exit(main())
@@ -0,0 +1,958 @@
+"""
+Shared loader for zkevm-metrics result trees.
+
+Used by compare_executions.py, compare_provings.py and generate-website.py so
+that all of them discover, parse and skip files in exactly the same way:
+
+- `hardware.json` (written by `run_benchmark` next to the results) is never
+  treated as a benchmark result.
+- Files that cannot be read or decoded are reported once and skipped.
+- Results may be stored compressed as `.json.gz`, `.json.zst` or `.json.lz4`
+  (see compressed_io.py); they are decompressed while being read and keyed
+  by their name without the suffixes, like plain `.json` files.
+- Parsing is fanned out over a process pool, using `orjson` when it is
+  installed and falling back to the standard library `json` module otherwise.
+- Results are reduced to the fields the scripts actually use (see
+  `summarize_result`) and, unless disabled, kept in an SQLite cache next to
+  the metrics root keyed by path, mtime and size, so re-runs only parse new or
+  changed files.
+- A whole tree can also be folded into a single indexed SQLite results store
+  (see `ResultsStore` and ingest_metrics.py) and read back from there. The
+  store also keeps a compact, downsampled time series of cycles and proving
+  time per test across all runs ever ingested.
+"""
+
+import json
+import os
+import re
+import sqlite3
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from compressed_io import JSON_SUFFIXES, READ_ERRORS, find_json_files, is_json_file, json_stem, open_file
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+HARDWARE_FILE = 'hardware.json'
+HARDWARE_STEM = 'hardware'
+CACHE_FILE = '.zkevm-metrics-cache.sqlite'
+
+# Below this many files the cost of spawning worker processes outweighs the
+# parsing work, so everything is parsed in the calling process.
+PARALLEL_THRESHOLD = 64
+
+
+def decode_json(data: bytes) -> Any:
+    """Decode a JSON document, using orjson when available."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def is_hardware_file(path: Path) -> bool:
+    """Return True if `path` is a `hardware.json`, compressed or not."""
+    return is_json_file(path) and json_stem(path) == HARDWARE_STEM
+
+
+def is_result_file(path: Path) -> bool:
+    """Return True if `path` looks like a benchmark result file."""
+    return is_json_file(path) and not is_hardware_file(path)
+
+
+def hardware_files_in(folder: Path) -> List[Path]:
+    """The `hardware.json` files directly inside `folder`, in any of the supported formats."""
+    return [folder / (HARDWARE_STEM + suffix) for suffix in JSON_SUFFIXES if (folder / (HARDWARE_STEM + suffix)).is_file()]
+
+
+def parse_metrics_file(file_path: Path) -> Optional[Dict[str, Any]]:
+    """Parse a single metrics JSON file, returning None if it is unreadable."""
+    try:
+        with open_file(file_path, 'rb') as f:
+            return decode_json(f.read())
+    except READ_ERRORS as e:
+        print(f"Warning: Could not parse {file_path}: {e}")
+        return None
+
+
+def summarize_result(data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Reduce a `BenchmarkRun` document to the fields used by the scripts.
+
+    The result keeps the original JSON shape (`execution.success.*`,
+    `proving.crashed.reason`, `metadata.block_used_gas`, ...) so callers do not
+    need to know whether it came from disk or from the cache.
+    """
+    slim: Dict[str, Any] = {}
+    if 'name' in data:
+        slim['name'] = data['name']
+
+    metadata = data.get('metadata')
+    if isinstance(metadata, dict) and 'block_used_gas' in metadata:
+        slim['metadata'] = {'block_used_gas': metadata['block_used_gas']}
+
+    execution = data.get('execution')
+    if isinstance(execution, dict):
+        if 'success' in execution:
+            success = execution['success']
+            slim['execution'] = {'success': {
+                key: success[key]
+                for key in ('total_num_cycles', 'region_cycles', 'execution_duration')
+                if key in success
+            }}
+        elif 'crashed' in execution:
+            slim['execution'] = {'crashed': {'reason': execution['crashed'].get('reason', '')}}
+
+    proving = data.get('proving')
+    if isinstance(proving, dict):
+        if 'success' in proving:
+            success = proving['success']
+            slim['proving'] = {'success': {
+                key: success[key] for key in ('proof_size', 'proving_time_ms') if key in success
+            }}
+        elif 'crashed' in proving:
+            slim['proving'] = {'crashed': {'reason': proving['crashed'].get('reason', '')}}
+
+    return slim
+
+
+def load_result_file(file_path: Path) -> Optional[Dict[str, Any]]:
+    """Parse and summarize a single result file."""
+    data = parse_metrics_file(file_path)
+    if not isinstance(data, dict):
+        return None
+    return summarize_result(data)
+
+
+# Flattened form of a summarized result, shared by the metrics cache and the
+# results store. See `result_to_row` and `row_to_result`.
+RESULT_COLUMNS = (
+    'name', 'block_used_gas',
+    'execution_status', 'total_num_cycles', 'region_cycles', 'execution_duration_ns',
+    'execution_crash_reason', 'proving_status', 'proving_time_ms', 'proof_size',
+    'proving_crash_reason',
+)
+
+RESULT_COLUMN_DEFINITIONS = '''
+    name TEXT,
+    block_used_gas INTEGER,
+    execution_status TEXT,
+    total_num_cycles INTEGER,
+    region_cycles TEXT,
+    execution_duration_ns INTEGER,
+    execution_crash_reason TEXT,
+    proving_status TEXT,
+    proving_time_ms INTEGER,
+    proof_size INTEGER,
+    proving_crash_reason TEXT
+'''
+
+
+def result_to_row(data: Dict[str, Any]) -> Tuple:
+    """Flatten a (summarized) result into values for `RESULT_COLUMNS`."""
+    execution = data.get('execution') or {}
+    proving = data.get('proving') or {}
+    exec_success = execution.get('success') or {}
+    prove_success = proving.get('success') or {}
+    metadata = data.get('metadata')
+
+    duration = exec_success.get('execution_duration')
+    duration_ns = None
+    if isinstance(duration, dict) and 'secs' in duration and 'nanos' in duration:
+        duration_ns = duration['secs'] * 1_000_000_000 + duration['nanos']
+    region_cycles = exec_success.get('region_cycles')
+
+    return (
+        data.get('name'),
+        metadata.get('block_used_gas') if isinstance(metadata, dict) else None,
+        next(iter(execution), None),
+        exec_success.get('total_num_cycles'),
+        json.dumps(region_cycles) if region_cycles is not None else None,
+        duration_ns,
+        (execution.get('crashed') or {}).get('reason'),
+        next(iter(proving), None),
+        prove_success.get('proving_time_ms'),
+        prove_success.get('proof_size'),
+        (proving.get('crashed') or {}).get('reason'),
+    )
+
+
+def row_to_result(row: Sequence) -> Dict[str, Any]:
+    """Rebuild the summarized result document from `RESULT_COLUMNS` values."""
+    (name, gas, exec_status, cycles, region_cycles, duration_ns, exec_reason,
+     prove_status, proving_time_ms, proof_size, prove_reason) = row
+    data: Dict[str, Any] = {}
+    if name is not None:
+        data['name'] = name
+    if gas is not None:
+        data['metadata'] = {'block_used_gas': gas}
+
+    if exec_status == 'success':
+        success: Dict[str, Any] = {}
+        if cycles is not None:
+            success['total_num_cycles'] = cycles
+        if region_cycles is not None:
+            success['region_cycles'] = json.loads(region_cycles)
+        if duration_ns is not None:
+            success['execution_duration'] = {
+                'secs': duration_ns // 1_000_000_000,
+                'nanos': duration_ns % 1_000_000_000,
+            }
+        data['execution'] = {'success': success}
+    elif exec_status == 'crashed':
+        data['execution'] = {'crashed': {'reason': exec_reason}}
+
+    if prove_status == 'success':
+        success = {}
+        if proof_size is not None:
+            success['proof_size'] = proof_size
+        if proving_time_ms is not None:
+            success['proving_time_ms'] = proving_time_ms
+        data['proving'] = {'success': success}
+    elif prove_status == 'crashed':
+        data['proving'] = {'crashed': {'reason': prove_reason}}
+
+    return data
+
+
+class MetricsCache:
+    """
+    SQLite cache of summarized results stored at the root of a metrics tree.
+
+    Entries are keyed by the file path relative to the root and are only
+    reused while the file's mtime and size are unchanged.
+    """
+
+    SCHEMA_VERSION = 1
+
+    COLUMNS = ('path', 'mtime_ns', 'size') + RESULT_COLUMNS
+
+    def __init__(self, root: Path):
+        self.root = root
+        self.conn = sqlite3.connect(str(root / CACHE_FILE))
+        version = self.conn.execute('PRAGMA user_version').fetchone()[0]
+        if version != self.SCHEMA_VERSION:
+            self.conn.execute('DROP TABLE IF EXISTS results')
+            self.conn.execute(f'PRAGMA user_version = {self.SCHEMA_VERSION}')
+        self.conn.execute(f'''
+            CREATE TABLE IF NOT EXISTS results (
+                path TEXT PRIMARY KEY,
+                mtime_ns INTEGER NOT NULL,
+                size INTEGER NOT NULL,
+                {RESULT_COLUMN_DEFINITIONS}
+            )
+        ''')
+
+    @classmethod
+    def open(cls, root: Path) -> Optional['MetricsCache']:
+        """Open the cache for `root`, returning None if it cannot be used."""
+        try:
+            return cls(root)
+        except sqlite3.Error as e:
+            print(f"Warning: Metrics cache disabled for {root}: {e}")
+            return None
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def _key(self, path: Path) -> str:
+        try:
+            return str(path.relative_to(self.root))
+        except ValueError:
+            return str(path.resolve())
+
+    def lookup(
+        self,
+        paths: Sequence[Path]
+    ) -> Tuple[List[Optional[Dict[str, Any]]], List[int], List[Optional[os.stat_result]]]:
+        """
+        Return cached results aligned with `paths`, the indices that must be
+        re-parsed, and the stat of every path.
+        """
+        rows = {row[0]: row for row in self.conn.execute(f"SELECT {', '.join(self.COLUMNS)} FROM results")}
+        results: List[Optional[Dict[str, Any]]] = [None] * len(paths)
+        stale: List[int] = []
+        stats: List[Optional[os.stat_result]] = []
+        for i, path in enumerate(paths):
+            try:
+                st = path.stat()
+            except OSError:
+                st = None
+            stats.append(st)
+            row = rows.get(self._key(path))
+            if st is not None and row is not None and row[1] == st.st_mtime_ns and row[2] == st.st_size:
+                results[i] = row_to_result(row[3:])
+            else:
+                stale.append(i)
+        return results, stale, stats
+
+    def store(self, entries: Iterable[Tuple[Path, Optional[os.stat_result], Dict[str, Any]]]) -> None:
+        """Insert or refresh cache entries for freshly parsed results."""
+        rows = [
+            (self._key(path), st.st_mtime_ns, st.st_size) + result_to_row(data)
+            for path, st, data in entries if st is not None
+        ]
+        if not rows:
+            return
+        placeholders = ', '.join('?' for _ in self.COLUMNS)
+        with self.conn:
+            self.conn.executemany(
+                f"INSERT OR REPLACE INTO results ({', '.join(self.COLUMNS)}) VALUES ({placeholders})",
+                rows
+            )
+
+
+def _default_workers() -> int:
+    return os.cpu_count() or 1
+
+
+def map_files(
+    func: Callable[[Path], Any],
+    paths: Sequence[Path],
+    workers: Optional[int] = None
+) -> Iterator[Any]:
+    """
+    Apply `func` to every path, over a process pool when worthwhile, yielding
+    the results in input order. `func` must be a module-level function.
+    """
+    workers = workers or _default_workers()
+    if workers <= 1 or len(paths) < PARALLEL_THRESHOLD:
+        yield from map(func, paths)
+        return
+
+    chunksize = max(1, len(paths) // (workers * 8))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        yield from executor.map(func, paths, chunksize=chunksize)
+
+
+def _parse_result_files(
+    paths: Sequence[Path],
+    workers: Optional[int] = None
+) -> List[Optional[Dict[str, Any]]]:
+    return list(map_files(load_result_file, paths, workers))
+
+
+def load_result_files(
+    paths: Sequence[Path],
+    workers: Optional[int] = None,
+    cache_root: Optional[Path] = None
+) -> List[Optional[Dict[str, Any]]]:
+    """
+    Load and summarize many result files, in parallel when worthwhile.
+
+    When `cache_root` is given, unchanged files are served from the SQLite
+    cache stored there and only new or modified files are parsed.
+
+    Returns a list aligned with `paths`; entries for unreadable files are None.
+    """
+    cache = MetricsCache.open(cache_root) if cache_root is not None else None
+    if cache is None:
+        return _parse_result_files(paths, workers)
+
+    try:
+        try:
+            results, stale, stats = cache.lookup(paths)
+        except sqlite3.Error as e:
+            print(f"Warning: Metrics cache disabled for {cache_root}: {e}")
+            return _parse_result_files(paths, workers)
+        parsed = _parse_result_files([paths[i] for i in stale], workers)
+        updates = []
+        for i, data in zip(stale, parsed):
+            results[i] = data
+            if data is not None:
+                updates.append((paths[i], stats[i], data))
+        try:
+            cache.store(updates)
+        except sqlite3.Error as e:
+            # e.g. a read-only folder or a cache locked by a concurrent run
+            print(f"Warning: Could not update the metrics cache for {cache_root}: {e}")
+    finally:
+        cache.close()
+    return results
+
+
+def find_result_files(folder: Path) -> List[Path]:
+    """Return all result files directly inside `folder`, sorted by name."""
+    return [path for path in find_json_files(folder) if is_result_file(path)]
+
+
+def load_metrics(
+    folder_path: str,
+    workers: Optional[int] = None,
+    use_cache: bool = True
+) -> Dict[str, Dict]:
+    """
+    Load all metric files from the subfolders of `folder_path`.
+
+    Keys are `<subfolder>/<file stem>`, e.g. `sp1-v5.0.0/test_worst_add`.
+    `folder_path` may also name a results store (see `parse_store_source`).
+    """
+    store_source = parse_store_source(folder_path)
+    if store_source is not None:
+        return load_store_metrics(*store_source)
+
+    metrics: Dict[str, Dict] = {}
+    folder = Path(folder_path)
+
+    if not folder.exists():
+        print(f"Warning: {folder} does not exist")
+        return metrics
+
+    # Find all subfolders that contain result files
+    subfolder_files: List[Tuple[Path, List[Path]]] = []
+    for subfolder in sorted(folder.iterdir()):
+        if subfolder.is_dir():
+            json_files = find_result_files(subfolder)
+            if json_files:
+                subfolder_files.append((subfolder, json_files))
+
+    if not subfolder_files:
+        print(f"Warning: No subfolders with JSON files found in {folder}")
+        return metrics
+
+    print(f"Found subfolders with metrics: {[sf.name for sf, _ in subfolder_files]}")
+
+    keys = [f"{subfolder.name}/{json_stem(path)}" for subfolder, files in subfolder_files for path in files]
+    paths = [path for _, files in subfolder_files for path in files]
+    cache_root = folder if use_cache else None
+    for key, data in zip(keys, load_result_files(paths, workers, cache_root)):
+        if data is not None:
+            metrics[key] = data
+
+    return metrics
+
+
+def load_named_files(
+    entries: Iterable[Tuple[Any, Path]],
+    workers: Optional[int] = None,
+    cache_root: Optional[Path] = None
+) -> List[Tuple[Any, Dict[str, Any]]]:
+    """
+    Load `(tag, path)` pairs in parallel and return `(tag, data)` for every
+    file that could be decoded, preserving input order.
+    """
+    entries = list(entries)
+    parsed = load_result_files([path for _, path in entries], workers, cache_root)
+    return [(tag, data) for (tag, _), data in zip(entries, parsed) if data is not None]
+
+
+# A results store is referenced as `<file>.sqlite` or `<file>.sqlite#<run label>`
+# wherever a metrics folder is accepted.
+RESULTS_STORE_SUFFIXES = ('.sqlite', '.sqlite3', '.db')
+
+# Rows are written in batches of this size while ingesting.
+INGEST_BATCH_SIZE = 4096
+
+METRICS_DIR_PREFIX = 'zkevm-metrics'
+
+# (el, zkvm, version, subfolder, file stem) of a stored result
+StoredLocation = Tuple[str, str, str, str, str]
+
+# History timestamps are normalized to UTC with this fixed-width format, so
+# they sort and compare correctly as strings.
+HISTORY_TIME_FORMAT = '%Y-%m-%dT%H:%M:%SZ'
+
+# (el, zkvm, version, test name, timestamp, samples, total_num_cycles, proving_time_ms)
+HistoryPoint = Tuple[str, str, str, str, str, int, Optional[float], Optional[float]]
+
+
+def parse_store_source(source: Any) -> Optional[Tuple[Path, Optional[str]]]:
+    """
+    Recognize a results store reference, returning `(database path, run label)`
+    or None if `source` is an ordinary metrics folder.
+    """
+    path, _, run = str(source).partition('#')
+    store_path = Path(path)
+    if store_path.suffix not in RESULTS_STORE_SUFFIXES or store_path.is_dir():
+        return None
+    return store_path, run or None
+
+
+def locate_result_file(path: Path) -> StoredLocation:
+    """
+    Derive the EL, zkVM and version of a result file from its directories,
+    i.e. `<el>/<zkvm>-<version>/<name>.json`. Results in legacy
+    `zkevm-metrics-<zkvm>-<variant>` folders have no EL and get `unknown`.
+    """
+    subfolder = path.parent.name
+    el = path.parent.parent.name
+    if subfolder.startswith(f'{METRICS_DIR_PREFIX}-'):
+        zkvm_dir = subfolder[len(METRICS_DIR_PREFIX) + 1:]
+        el = 'unknown'
+    else:
+        zkvm_dir = subfolder
+        if not el or el.startswith(METRICS_DIR_PREFIX):
+            el = 'unknown'
+
+    match = re.match(r'([^-]+)-(.+)', zkvm_dir)
+    zkvm, version = (match.group(1), match.group(2)) if match else (zkvm_dir, '')
+    return el, zkvm, version, subfolder, json_stem(path)
+
+
+def _ingest_record(path: Path) -> Optional[Tuple]:
+    """Parse one result file into the store's timestamp, metadata and result columns."""
+    data = parse_metrics_file(path)
+    if not isinstance(data, dict):
+        return None
+    metadata = data.get('metadata')
+    return (
+        data.get('timestamp_completed'),
+        json.dumps(metadata) if metadata is not None else None,
+    ) + result_to_row(data)
+
+
+class ResultsStore:
+    """
+    A single SQLite database holding any number of ingested metrics trees.
+
+    Every ingested tree is a *run* identified by a label. Its results are
+    stored one row each, with EL, zkVM, version, completion timestamp and the
+    full `BenchmarkRun` metadata, and its `hardware.json` files in a separate
+    table. Results are indexed by test name, zkVM, version and EL, so the
+    reporting scripts can read a tree with one query instead of walking and
+    parsing every JSON file.
+
+    Ingesting also appends every successful result to the `history` table, a
+    time series of `total_num_cycles` and `proving_time_ms` keyed by EL, zkVM,
+    test name, `timestamp_completed` and version. History outlives the runs
+    (re-ingesting or replacing a run does not remove its points) and old
+    points can be merged into coarser buckets with `downsample_history`.
+    Points are never overwritten: a result whose key is already in the history
+    keeps the first point, and `ingest` reports it as a conflict if its values
+    differ. The keys of points merged by `downsample_history` are kept in
+    `history_merged`, so re-ingesting their results does not add them again.
+    """
+
+    SCHEMA_VERSION = 3
+
+    LOCATION_COLUMNS = ('el', 'zkvm', 'version', 'subfolder', 'file_stem')
+
+    SCHEMA = f'''
+        CREATE TABLE IF NOT EXISTS runs (
+            id INTEGER PRIMARY KEY,
+            label TEXT NOT NULL UNIQUE,
+            root TEXT NOT NULL,
+            ingested_at TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS hardware (
+            run_id INTEGER NOT NULL REFERENCES runs(id),
+            path TEXT NOT NULL,
+            cpu_model TEXT,
+            total_ram_gib INTEGER,
+            gpus TEXT,
+            PRIMARY KEY (run_id, path)
+        );
+        CREATE TABLE IF NOT EXISTS results (
+            id INTEGER PRIMARY KEY,
+            run_id INTEGER NOT NULL REFERENCES runs(id),
+            el TEXT NOT NULL,
+            zkvm TEXT NOT NULL,
+            version TEXT NOT NULL,
+            subfolder TEXT NOT NULL,
+            file_stem TEXT NOT NULL,
+            path TEXT NOT NULL,
+            timestamp_completed TEXT,
+            metadata TEXT,
+            {RESULT_COLUMN_DEFINITIONS}
+        );
+        CREATE INDEX IF NOT EXISTS results_run ON results(run_id);
+        CREATE INDEX IF NOT EXISTS results_name ON results(name);
+        CREATE INDEX IF NOT EXISTS results_zkvm ON results(zkvm, version);
+        CREATE INDEX IF NOT EXISTS results_version ON results(version);
+        CREATE INDEX IF NOT EXISTS results_el ON results(el);
+    '''
+
+    HISTORY_SCHEMA = '''
+        CREATE TABLE IF NOT EXISTS history (
+            el TEXT NOT NULL,
+            zkvm TEXT NOT NULL,
+            version TEXT NOT NULL,
+            name TEXT NOT NULL,
+            timestamp TEXT NOT NULL,
+            samples INTEGER NOT NULL DEFAULT 1,
+            total_num_cycles REAL,
+            proving_time_ms REAL,
+            PRIMARY KEY (el, zkvm, name, timestamp, version)
+        ) WITHOUT ROWID;
+        CREATE INDEX IF NOT EXISTS history_timestamp ON history(timestamp);
+        CREATE TABLE IF NOT EXISTS history_merged (
+            el TEXT NOT NULL,
+            zkvm TEXT NOT NULL,
+            version TEXT NOT NULL,
+            name TEXT NOT NULL,
+            timestamp TEXT NOT NULL,
+            PRIMARY KEY (el, zkvm, name, timestamp, version)
+        ) WITHOUT ROWID;
+    '''
+
+    HISTORY_COLUMNS = ('el', 'zkvm', 'version', 'name', 'timestamp', 'samples',
+                       'total_num_cycles', 'proving_time_ms')
+
+    # History points of the results matching a WHERE clause. Results without
+    # a parseable timestamp or without any measurement are left out.
+    HISTORY_SELECT = f'''
+        SELECT el, zkvm, version, COALESCE(name, file_stem) AS name,
+               strftime('{HISTORY_TIME_FORMAT}', timestamp_completed) AS timestamp,
+               NULLIF(total_num_cycles, 0) AS total_num_cycles, NULLIF(proving_time_ms, 0) AS proving_time_ms
+        FROM results
+        WHERE {{where}} AND strftime('{HISTORY_TIME_FORMAT}', timestamp_completed) IS NOT NULL
+            AND (total_num_cycles > 0 OR proving_time_ms > 0)
+    '''
+
+    # Appends those points to the history, keeping existing points with the
+    # same key and leaving out points already merged by a downsample
+    HISTORY_APPEND = f'''
+        INSERT OR IGNORE INTO history (el, zkvm, version, name, timestamp, total_num_cycles, proving_time_ms)
+        SELECT * FROM ({HISTORY_SELECT}) AS new
+        WHERE NOT EXISTS (
+            SELECT 1 FROM history_merged AS merged
+            WHERE merged.el = new.el AND merged.zkvm = new.zkvm AND merged.name = new.name
+                AND merged.timestamp = new.timestamp AND merged.version = new.version
+        )
+    '''
+
+    # Counts those points whose key is in the history with different values
+    # or was merged by a downsample
+    HISTORY_CONFLICTS = f'''
+        SELECT COUNT(*) FROM ({HISTORY_SELECT}) AS new
+        LEFT JOIN history USING (el, zkvm, version, name, timestamp)
+        LEFT JOIN history_merged AS merged USING (el, zkvm, version, name, timestamp)
+        WHERE merged.el IS NOT NULL
+            OR (history.el IS NOT NULL AND (history.total_num_cycles IS NOT new.total_num_cycles
+                                            OR history.proving_time_ms IS NOT new.proving_time_ms))
+    '''
+
+    def __init__(self, path: Path, create: bool = False):
+        if not create and not path.is_file():
+            raise FileNotFoundError(f"{path} does not exist")
+        self.path = path
+        self.conn = sqlite3.connect(str(path))
+        version = self.conn.execute('PRAGMA user_version').fetchone()[0]
+        if version == 0 and create:
+            self.conn.executescript(self.SCHEMA + self.HISTORY_SCHEMA)
+            self.conn.execute(f'PRAGMA user_version = {self.SCHEMA_VERSION}')
+        elif version == 1:
+            # Stores written before the history existed seed it from their runs
+            with self.conn:
+                self.conn.executescript(self.HISTORY_SCHEMA)
+                self.conn.execute(self.HISTORY_APPEND.format(where='1'))
+                self.conn.execute(f'PRAGMA user_version = {self.SCHEMA_VERSION}')
+        elif version == 2:
+            # Points merged before the merged keys were recorded cannot be recovered
+            with self.conn:
+                self.conn.executescript(self.HISTORY_SCHEMA)
+                self.conn.execute(f'PRAGMA user_version = {self.SCHEMA_VERSION}')
+        elif version != self.SCHEMA_VERSION:
+            self.conn.close()
+            raise ValueError(f"{path} is not a results store with schema version {self.SCHEMA_VERSION}")
+
+    @classmethod
+    def open(cls, path: Path, create: bool = False) -> Optional['ResultsStore']:
+        """Open the store at `path`, returning None if it cannot be used."""
+        try:
+            return cls(path, create)
+        except (OSError, ValueError, sqlite3.Error) as e:
+            print(f"Warning: Could not open results store {path}: {e}")
+            return None
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def runs(self) -> List[Tuple[str, str, str, int]]:
+        """Return `(label, root, ingested_at, result count)` of every run."""
+        return self.conn.execute('''
+            SELECT label, root, ingested_at, (SELECT COUNT(*) FROM results WHERE run_id = runs.id)
+            FROM runs ORDER BY id
+        ''').fetchall()
+
+    def _run_filter(self, run: Optional[str]) -> Tuple[str, Tuple]:
+        if run is None:
+            return '', ()
+        row = self.conn.execute('SELECT id FROM runs WHERE label = ?', (run,)).fetchone()
+        if row is None:
+            raise KeyError(f"{self.path} has no run labelled '{run}'")
+        return 'WHERE run_id = ?', (row[0],)
+
+    def results(self, run: Optional[str] = None) -> Iterator[Tuple[StoredLocation, Dict[str, Any]]]:
+        """
+        Yield `(location, summarized result)` for every result of `run`, or of
+        all runs when `run` is None, in ingestion order.
+        """
+        where, params = self._run_filter(run)
+        columns = self.LOCATION_COLUMNS + RESULT_COLUMNS
+        cursor = self.conn.execute(f"SELECT {', '.join(columns)} FROM results {where} ORDER BY id", params)
+        split = len(self.LOCATION_COLUMNS)
+        for row in cursor:
+            yield row[:split], row_to_result(row[split:])
+
+    def hardware(self, run: Optional[str] = None) -> List[Tuple[str, Dict[str, Any]]]:
+        """Return `(path, hardware info)` for every `hardware.json` of `run`."""
+        where, params = self._run_filter(run)
+        return [
+            (path, {'cpu_model': cpu_model, 'total_ram_gib': total_ram_gib, 'gpus': json.loads(gpus or '[]')})
+            for path, cpu_model, total_ram_gib, gpus in self.conn.execute(
+                f"SELECT path, cpu_model, total_ram_gib, gpus FROM hardware {where} ORDER BY path", params
+            )
+        ]
+
+    def ingest(self, root: Path, label: str, workers: Optional[int] = None) -> Tuple[int, int, int]:
+        """
+        Fold the metrics tree at `root` into the run `label`, replacing any
+        previous contents of that run. Returns the number of results and
+        hardware files stored, and the number of results left out of the
+        history because they conflict with an existing point or were already
+        merged by a downsample.
+
+        `root` may be a `zkevm-metrics` folder, one EL folder inside it, or a
+        directory containing `zkevm-metrics*` folders.
+        """
+        result_files, hardware_files = find_metrics_tree_files(root)
+        root = root.resolve()
+
+        with self.conn:
+            row = self.conn.execute('SELECT id FROM runs WHERE label = ?', (label,)).fetchone()
+            ingested_at = datetime.now(timezone.utc).isoformat()
+            if row is not None:
+                run_id = row[0]
+                self.conn.execute('DELETE FROM results WHERE run_id = ?', (run_id,))
+                self.conn.execute('DELETE FROM hardware WHERE run_id = ?', (run_id,))
+                self.conn.execute('UPDATE runs SET root = ?, ingested_at = ? WHERE id = ?',
+                                  (str(root), ingested_at, run_id))
+            else:
+                run_id = self.conn.execute('INSERT INTO runs (label, root, ingested_at) VALUES (?, ?, ?)',
+                                           (label, str(root), ingested_at)).lastrowid
+
+            # An EL folder's hardware.json lives in the run_benchmark output folder above it
+            if not hardware_files:
+                hardware_files = hardware_files_in(root.parent)[:1]
+
+            hardware_rows = []
+            for path in hardware_files:
+                info = parse_metrics_file(path)
+                if isinstance(info, dict):
+                    hardware_rows.append((
+                        run_id, os.path.relpath(path, root), info.get('cpu_model'),
+                        info.get('total_ram_gib'), json.dumps(info.get('gpus', [])),
+                    ))
+            self.conn.executemany('INSERT INTO hardware VALUES (?, ?, ?, ?, ?)', hardware_rows)
+
+            columns = ('run_id',) + self.LOCATION_COLUMNS + ('path', 'timestamp_completed', 'metadata') \
+                + RESULT_COLUMNS
+            insert = f"INSERT INTO results ({', '.join(columns)}) VALUES ({', '.join('?' for _ in columns)})"
+            stored = 0
+            batch: List[Tuple] = []
+            for path, record in zip(result_files, map_files(_ingest_record, result_files, workers)):
+                if record is None:
+                    continue
+                batch.append((run_id,) + locate_result_file(path) + (str(path.relative_to(root)),) + record)
+                if len(batch) >= INGEST_BATCH_SIZE:
+                    self.conn.executemany(insert, batch)
+                    stored += len(batch)
+                    batch.clear()
+            self.conn.executemany(insert, batch)
+            stored += len(batch)
+
+            self.conn.execute(self.HISTORY_APPEND.format(where='run_id = ?'), (run_id,))
+            conflicts = self.conn.execute(self.HISTORY_CONFLICTS.format(where='run_id = ?'), (run_id,)).fetchone()[0]
+
+        return stored, len(hardware_rows), conflicts
+
+    def history(self, el: Optional[str] = None) -> Iterator[HistoryPoint]:
+        """
+        Yield the history points of all tests (of one EL if given), ordered by
+        EL, zkVM, test name and timestamp.
+        """
+        where, params = ('WHERE el = ?', (el,)) if el is not None else ('', ())
+        yield from self.conn.execute(
+            f"SELECT {', '.join(self.HISTORY_COLUMNS)} FROM history {where} "
+            "ORDER BY el, zkvm, name, timestamp, version", params
+        )
+
+    def history_summary(self) -> Tuple[int, int, Optional[str], Optional[str]]:
+        """Return `(points, raw samples, first timestamp, last timestamp)` of the history."""
+        points, samples, first, last = self.conn.execute(
+            'SELECT COUNT(*), TOTAL(samples), MIN(timestamp), MAX(timestamp) FROM history'
+        ).fetchone()
+        return points, int(samples), first, last
+
+    def history_digest(self) -> str:
+        """A cheap fingerprint of the history that changes whenever points are added or merged."""
+        row = self.conn.execute('''
+            SELECT COUNT(*), TOTAL(samples), MIN(timestamp), MAX(timestamp),
+                   TOTAL(total_num_cycles), TOTAL(proving_time_ms)
+            FROM history
+        ''').fetchone()
+        return repr(row)
+
+    def downsample_history(
+        self,
+        keep_days: int,
+        bucket_days: int,
+        now: Optional[datetime] = None
+    ) -> Tuple[int, int]:
+        """
+        Merge history points older than `keep_days` into one point per series
+        (EL, zkVM, version, test) and `bucket_days`-day bucket, timestamped at
+        the start of the bucket. Values are averaged weighted by the number of
+        raw samples each point already stands for, so repeated downsampling
+        gives the same result. Returns the point counts before and after.
+        """
+        if bucket_days < 1:
+            raise ValueError("bucket_days must be at least 1")
+        now = now or datetime.now(timezone.utc)
+        cutoff = (now - timedelta(days=keep_days)).strftime(HISTORY_TIME_FORMAT)
+        epoch = datetime(1970, 1, 1, tzinfo=timezone.utc)
+        bucket = timedelta(days=bucket_days)
+
+        with self.conn:
+            rows = self.conn.execute(
+                f"SELECT {', '.join(self.HISTORY_COLUMNS)} FROM history WHERE timestamp < ?", (cutoff,)
+            ).fetchall()
+            buckets: Dict[Tuple, List[HistoryPoint]] = {}
+            for row in rows:
+                timestamp = datetime.strptime(row[4], HISTORY_TIME_FORMAT).replace(tzinfo=timezone.utc)
+                index = (timestamp - epoch) // bucket
+                buckets.setdefault(row[:4] + (index,), []).append(row)
+
+            merged: List[HistoryPoint] = []
+            merged_keys: List[Tuple[str, ...]] = []
+            for (el, zkvm, version, name, index), points in buckets.items():
+                if len(points) == 1:
+                    merged.append(points[0])
+                    continue
+                merged_keys.extend(point[:5] for point in points)
+                start = (epoch + index * bucket).strftime(HISTORY_TIME_FORMAT)
+                values = []
+                for column in (6, 7):
+                    weighted = [(point[column], point[5]) for point in points if point[column] is not None]
+                    weight = sum(samples for _, samples in weighted)
+                    values.append(sum(value * samples for value, samples in weighted) / weight if weight else None)
+                merged.append((el, zkvm, version, name, start, sum(point[5] for point in points), *values))
+
+            self.conn.execute('DELETE FROM history WHERE timestamp < ?', (cutoff,))
+            self.conn.executemany(
+                'INSERT OR IGNORE INTO history_merged (el, zkvm, version, name, timestamp) VALUES (?, ?, ?, ?, ?)',
+                merged_keys
+            )
+            self.conn.executemany(
+                f"INSERT OR REPLACE INTO history ({', '.join(self.HISTORY_COLUMNS)}) "
+                f"VALUES ({', '.join('?' for _ in self.HISTORY_COLUMNS)})", merged
+            )
+        return len(rows), len(merged)
+
+
+def find_metrics_tree_files(root: Path) -> Tuple[List[Path], List[Path]]:
+    """
+    Return all result files and `hardware.json` files below `root`, sorted.
+
+    If `root` contains `zkevm-metrics*` folders only those are searched.
+    Hidden directories (caches) are skipped.
+    """
+    root = root.resolve()
+    tops = sorted(p for p in root.iterdir() if p.is_dir() and p.name.startswith(METRICS_DIR_PREFIX))
+    if not tops:
+        tops = [root]
+
+    result_files: List[Path] = []
+    hardware_files: List[Path] = []
+    for top in tops:
+        for path in find_json_files(top, recursive=True):
+            if any(part.startswith('.') for part in path.relative_to(root).parts[:-1]):
+                continue
+            if is_hardware_file(path):
+                hardware_files.append(path)
+            elif is_result_file(path):
+                result_files.append(path)
+    return result_files, hardware_files
+
+
+def load_store_metrics(store_path: Path, run: Optional[str] = None) -> Dict[str, Dict]:
+    """
+    Load the results of one run of a results store, keyed like `load_metrics`
+    (`<subfolder>/<file stem>`). When the run spans several ELs the key is
+    prefixed with the EL so results of different clients do not collide.
+    """
+    metrics: Dict[str, Dict] = {}
+    store = ResultsStore.open(store_path)
+    if store is None:
+        return metrics
+
+    try:
+        labels = [label for label, _, _, _ in store.runs()]
+        if run is None and len(labels) > 1:
+            print(f"Warning: {store_path} holds several runs {labels}; select one with {store_path}#<run>")
+            return metrics
+        rows = list(store.results(run))
+    except KeyError as e:
+        print(f"Warning: {e.args[0]}")
+        return metrics
+    finally:
+        store.close()
+
+    multiple_els = len({location[0] for location, _ in rows}) > 1
+    subfolders = []
+    for (el, _, _, subfolder, stem), data in rows:
+        prefix = f"{el}/{subfolder}" if multiple_els else subfolder
+        if not subfolders or subfolders[-1] != prefix:
+            subfolders.append(prefix)
+        metrics[f"{prefix}/{stem}"] = data
+
+    if not metrics:
+        print(f"Warning: No results found in {store_path}")
+        return metrics
+
+    print(f"Found subfolders with metrics: {subfolders}")
+    return metrics
+
+
+def load_hardware_info(source: Any) -> Optional[Dict[str, Any]]:
+    """
+    Return the `hardware.json` describing the host that produced a metrics
+    folder or results store run, or None if there is none.
+
+    `run_benchmark` writes it to its output folder, which is either the folder
+    itself or its parent when results are split into EL subfolders.
+    """
+    store_source = parse_store_source(source)
+    if store_source is not None:
+        store_path, run = store_source
+        store = ResultsStore.open(store_path)
+        if store is None:
+            return None
+        try:
+            entries = store.hardware(run)
+        except KeyError:
+            return None
+        finally:
+            store.close()
+        infos = [info for _, info in entries]
+        if any(info != infos[0] for info in infos[1:]):
+            print(f"Warning: {source} contains results from several hosts; using {entries[0][0]}")
+        return infos[0] if infos else None
+
+    folder = Path(source)
+    for candidate in hardware_files_in(folder) + hardware_files_in(folder.parent):
+        info = parse_metrics_file(candidate)
+        if isinstance(info, dict):
+            return info
+    return None
+
+
+def hardware_differences(baseline: Dict[str, Any], optimized: Dict[str, Any]) -> List[str]:
+    """Describe how two `hardware.json` documents differ (CPU, RAM, GPUs)."""
+    differences = []
+    if baseline.get('cpu_model') != optimized.get('cpu_model'):
+        differences.append(f"CPU: {baseline.get('cpu_model')} vs {optimized.get('cpu_model')}")
+    if baseline.get('total_ram_gib') != optimized.get('total_ram_gib'):
+        differences.append(f"RAM: {baseline.get('total_ram_gib')} GiB vs {optimized.get('total_ram_gib')} GiB")
+
+    def gpu_models(info: Dict[str, Any]) -> List[str]:
+        return sorted(gpu.get('model', '?') for gpu in info.get('gpus') or [])
+
+    if gpu_models(baseline) != gpu_models(optimized):
+        differences.append(f"GPUs: {gpu_models(baseline) or 'none'} vs {gpu_models(optimized) or 'none'}")
+    return differences
@@ -4,13 +4,37 @@ Script to process zkevm fixture JSON files by removing existing chain_config
 and adding a new fixed chain_config inside the block_and_witness field.
 
 This is used to migrate previously generated fixture files to the new format.
+
+Files are migrated in parallel over a process pool, each worker holding a single
+fixture at a time. Files that already carry the fixed chain_config are skipped,
+output is written compactly unless --indent is given, and every file is written
+to a temporary file first and then atomically renamed into place, so --in-place
+never leaves a truncated fixture behind and needs no second copy of the tree.
+
+Fixtures may be compressed (`.json.gz`, `.json.zst`, `.json.lz4`, see
+compressed_io.py). They are decompressed and recompressed as streams and are
+written in the format they were read in, unless --compress selects another
+one for the output folder.
+
+The standard library json module is used on purpose: witnesses may contain
+integers wider than 64 bits, which faster decoders silently turn into floats.
 """
 
 import argparse
 import json
 import os
 import shutil
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
+from typing import Optional, Tuple
+
+from compressed_io import (
+    COMPRESSION_CHOICES, compression_suffix, find_json_files, json_file_name, json_stem, open_file
+)
+
+MIGRATED = 'migrated'
+SKIPPED = 'skipped'
+FAILED = 'failed'
 
 
 def get_fixed_chain_config():
@@ -53,37 +77,81 @@ def get_fixed_chain_config():
     }
 
 
-def process_json_file(input_file_path, output_file_path):
+def is_migrated(data):
+    """Return True if `data` already has exactly the fixed chain_config in block_and_witness."""
+    block_and_witness = data.get('block_and_witness')
+    return (
+        'chain_config' not in data
+        and isinstance(block_and_witness, dict)
+        and block_and_witness.get('chain_config') == get_fixed_chain_config()
+    )
+
+
+def read_json_file(path):
+    with open_file(path, 'r') as f:
+        return json.load(f)
+
+
+def write_json_file(data, path, indent=None):
+    """Write `data` to `path` atomically via a temporary file in the same folder."""
+    tmp_path = path.with_name(path.name + '.tmp')
+    try:
+        with open_file(tmp_path, 'w', compression=compression_suffix(path)) as f:
+            if indent is None:
+                json.dump(data, f, separators=(',', ':'))
+            else:
+                json.dump(data, f, indent=indent)
+        os.replace(tmp_path, path)
+    finally:
+        if tmp_path.exists():
+            tmp_path.unlink()
+
+
+def process_json_file(input_file_path, output_file_path, indent=None):
     """
     Process a single JSON file by removing existing chain_config
     and adding the fixed chain_config inside block_and_witness.
+
+    `output_file_path` may equal `input_file_path` to migrate in place.
+    Returns `(status, message)` where status is MIGRATED, SKIPPED or FAILED.
     """
     try:
+        in_place = output_file_path == input_file_path
+        if not in_place and output_file_path.exists() and is_migrated(read_json_file(output_file_path)):
+            return SKIPPED, f"Skipped: {output_file_path.name} is already migrated"
+
         # Read the input JSON file
-        with open(input_file_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-        
+        data = read_json_file(input_file_path)
+
+        if is_migrated(data):
+            if compression_suffix(input_file_path) != compression_suffix(output_file_path):
+                write_json_file(data, output_file_path, indent)
+            elif not in_place:
+                shutil.copyfile(input_file_path, output_file_path)
+            return SKIPPED, f"Skipped: {input_file_path.name} already has the fixed chain_config"
+
         # Remove existing chain_config if it exists at the top level
         if 'chain_config' in data:
             del data['chain_config']
-        
+
         # Ensure block_and_witness exists
         if 'block_and_witness' not in data:
             raise ValueError("Missing 'block_and_witness' field in JSON")
-        
+
         # Add the new fixed chain_config inside block_and_witness
         data['block_and_witness']['chain_config'] = get_fixed_chain_config()
-        
+
         # Write the modified data to the output file
-        with open(output_file_path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2)
-        
-        print(f"Processed: {input_file_path.name} -> {output_file_path.name}")
-        return True
-        
+        write_json_file(data, output_file_path, indent)
+
+        return MIGRATED, f"Processed: {input_file_path.name} -> {output_file_path.name}"
+
     except Exception as e:
-        print(f"Error processing {input_file_path}: {str(e)}")
-        return False
+        return FAILED, f"Error processing {input_file_path}: {str(e)}"
+
+
+def _process_task(task: Tuple[Path, Path, Optional[int]]) -> Tuple[str, str]:
+    return process_json_file(*task)
 
 
 def main():
@@ -94,13 +162,39 @@ def main():
         "input_folder",
         help="Path to the folder containing JSON files to process"
     )
-    parser.add_argument(
+    destination = parser.add_mutually_exclusive_group()
+    destination.add_argument(
         "-o", "--output",
         help="Output folder path (default: <input_folder>_processed)",
         default=None
     )
+    destination.add_argument(
+        "--in-place",
+        action="store_true",
+        help="Atomically rewrite the files in the input folder instead of writing to an output folder"
+    )
+    parser.add_argument(
+        "-j", "--jobs",
+        type=int,
+        default=None,
+        help="Number of worker processes (default: CPU count)"
+    )
+    parser.add_argument(
+        "--indent",
+        type=int,
+        default=None,
+        help="Pretty-print output with this indent (default: compact output)"
+    )
+    parser.add_argument(
+        "--compress",
+        choices=COMPRESSION_CHOICES,
+        default=None,
+        help="Write the output files with this compression (default: the format of each input file)"
+    )
     
     args = parser.parse_args()
+    if args.in_place and args.compress is not None:
+        parser.error("--compress cannot be combined with --in-place")
     
     # Convert to Path objects and resolve
     input_folder = Path(args.input_folder).resolve()
@@ -114,7 +208,9 @@ def main():
         return 1
     
     # Determine output folder
-    if args.output:
+    if args.in_place:
+        output_folder = input_folder
+    elif args.output:
         output_folder = Path(args.output).resolve()
     else:
         output_folder = input_folder.parent / f"{input_folder.name}_processed"
@@ -125,7 +221,7 @@ def main():
     print(f"Output folder: {output_folder}")
     
     # Find all JSON files in the input folder
-    json_files = list(input_folder.glob("*.json"))
+    json_files = find_json_files(input_folder)
     
     if not json_files:
         print("No JSON files found in the input folder")
@@ -133,23 +229,36 @@ def main():
     
     print(f"Found {len(json_files)} JSON files to process")
     
-    # Process each JSON file
-    successful = 0
-    failed = 0
-    
-    for json_file in json_files:
-        output_file = output_folder / json_file.name
-        if process_json_file(json_file, output_file):
-            successful += 1
-        else:
-            failed += 1
+    # Process the JSON files in parallel. Fixtures are large, so they are
+    # handed out one at a time to keep the workers evenly loaded.
+    counts = {MIGRATED: 0, SKIPPED: 0, FAILED: 0}
+    tasks = [
+        (json_file, output_folder / (json_file.name if args.compress is None else
+                                     json_file_name(json_stem(json_file), args.compress)), args.indent)
+        for json_file in json_files
+    ]
+    workers = min(args.jobs or os.cpu_count() or 1, len(tasks))
+    if workers <= 1:
+        results = map(_process_task, tasks)
+    else:
+        executor = ProcessPoolExecutor(max_workers=workers)
+        results = executor.map(_process_task, tasks)
+
+    try:
+        for status, message in results:
+            counts[status] += 1
+            print(message)
+    finally:
+        if workers > 1:
+            executor.shutdown()
     
     print(f"\nProcessing complete:")
-    print(f"  Successfully processed: {successful} files")
-    print(f"  Failed: {failed} files")
+    print(f"  Successfully processed: {counts[MIGRATED]} files")
+    print(f"  Skipped (already migrated): {counts[SKIPPED]} files")
+    print(f"  Failed: {counts[FAILED]} files")
     print(f"  Output folder: {output_folder}")
     
-    return 0 if failed == 0 else 1
+    return 0 if counts[FAILED] == 0 else 1
 
 
 if __name__ == "__main__":
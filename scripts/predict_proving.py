@@ -0,0 +1,295 @@
+#!/usr/bin/env python3
+"""
+Predict proving time from execution-only benchmark runs.
+
+Proving sweeps take days while execution sweeps take minutes. This script fits,
+per zkVM and version, a model of `proving_time_ms` from `total_num_cycles` and
+the `region_cycles` mix, using paired runs: an execution run and a proving run
+of the same fixtures. The model then predicts proving time, with prediction
+intervals, for new execution-only results.
+
+Usage:
+    python3 predict_proving.py fit --pair <execution_run> <proving_run> [--pair ...] -o model.json
+    python3 predict_proving.py predict model.json <execution_run> [--csv predictions.csv]
+
+Example:
+    python3 predict_proving.py fit --pair exec-v5 prove-v5 --pair results.sqlite#exec results.sqlite#prove -o model.json
+    python3 predict_proving.py predict model.json zkevm-metrics/reth --top 20
+
+Runs are metrics folders or results store runs; fixtures are paired by
+`<zkvm-version>/<file stem>`. The model is a least-squares fit of
+
+    log(proving time) = b0 + b1 * log(total cycles) [+ region shares of the cycles]
+
+so it predicts the typical (median) proving time, and the bounds are prediction
+intervals on the log scale. Fit quality is reported with R² and the
+leave-one-out median absolute percentage error.
+"""
+
+import argparse
+import csv
+import json
+import math
+from dataclasses import asdict, dataclass
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from compressed_io import open_file
+from gas_metrics import group_name, proving_seconds, total_cycles
+from metrics_loader import load_metrics
+from speedup_stats import CONFIDENCE, student_t_quantile
+
+MODEL_FORMAT_VERSION = 1
+
+# A model needs this many more samples than coefficients
+MIN_EXTRA_SAMPLES = 3
+
+
+@dataclass
+class Sample:
+    """Execution features of one fixture, with its proving time if known."""
+    zkvm: str
+    fixture: str
+    cycles: int
+    regions: Dict[str, int]
+    proving_secs: Optional[float] = None
+
+
+def zkvm_of(filename: str) -> str:
+    """`<zkvm>-<version>` folder of a `load_metrics` key, without any EL prefix."""
+    return group_name(filename).rsplit("/", 1)[-1]
+
+
+def execution_samples(metrics: Dict[str, Dict]) -> Dict[str, Sample]:
+    """Samples of every successful execution with cycle data, keyed like `metrics`."""
+    samples = {}
+    for filename, data in metrics.items():
+        cycles = total_cycles(data)
+        if cycles is None:
+            continue
+        regions = data["execution"]["success"].get("region_cycles") or {}
+        samples[filename] = Sample(zkvm_of(filename), filename.rsplit("/", 1)[-1], cycles,
+                                   {region: value for region, value in regions.items() if value > 0})
+    return samples
+
+
+def pair_samples(execution: Dict[str, Dict], proving: Dict[str, Dict]) -> List[Sample]:
+    """Attach the proving time of `proving` to the executions of the same fixtures."""
+    paired = []
+    for filename, sample in execution_samples(execution).items():
+        seconds = proving_seconds(proving.get(filename, {}))
+        if seconds is not None:
+            sample.proving_secs = seconds
+            paired.append(sample)
+    return paired
+
+
+def feature_vector(sample: Sample, regions: List[str]) -> List[float]:
+    """`[1, log(cycles), share of each region]` of a sample."""
+    return [1.0, math.log(sample.cycles)] + [sample.regions.get(region, 0) / sample.cycles for region in regions]
+
+
+@dataclass
+class ProvingModel:
+    """Fitted log-linear proving time model of one zkVM version."""
+    regions: List[str]
+    coefficients: List[float]
+    covariance: List[List[float]]
+    sigma: float
+    df: int
+    samples: int
+    r2: float
+    loo_median_ape: float
+
+    @classmethod
+    def fit(cls, samples: List[Sample], use_regions: bool) -> Optional['ProvingModel']:
+        """Fit a model, or return None if there are too few samples."""
+        regions: List[str] = []
+        if use_regions:
+            totals: Dict[str, float] = {}
+            for sample in samples:
+                for region, value in sample.regions.items():
+                    totals[region] = totals.get(region, 0.0) + value / sample.cycles
+            # Region shares add up to about one, so the largest region is the reference
+            regions = sorted(totals, key=totals.get)[:-1]
+            if len(samples) < len(regions) + 2 + MIN_EXTRA_SAMPLES:
+                regions = []
+        if len(samples) < 2 + MIN_EXTRA_SAMPLES:
+            return None
+
+        x = np.array([feature_vector(sample, regions) for sample in samples])
+        y = np.log([sample.proving_secs for sample in samples])
+        coefficients, *_ = np.linalg.lstsq(x, y, rcond=None)
+        residuals = y - x @ coefficients
+        df = len(samples) - x.shape[1]
+        sigma = math.sqrt(float(residuals @ residuals) / df)
+        covariance = np.linalg.pinv(x.T @ x)
+
+        total = float(((y - y.mean()) ** 2).sum())
+        r2 = 1.0 - float(residuals @ residuals) / total if total > 0 else 1.0
+        # Leave-one-out residuals from the hat matrix, without refitting
+        leverage = np.einsum('ij,jk,ik->i', x, covariance, x)
+        loo = residuals / np.maximum(1.0 - leverage, 1e-9)
+        loo_median_ape = float(np.median(np.abs(np.expm1(loo)))) * 100
+
+        return cls(regions, coefficients.tolist(), covariance.tolist(), sigma, df,
+                   len(samples), r2, loo_median_ape)
+
+    def predict(self, sample: Sample, confidence: float) -> Tuple[float, float, float]:
+        """Predicted proving seconds of a sample with the bounds of its prediction interval."""
+        x = np.array(feature_vector(sample, self.regions))
+        mean = float(x @ np.array(self.coefficients))
+        spread = self.sigma * math.sqrt(1.0 + float(x @ np.array(self.covariance) @ x))
+        t = student_t_quantile(1.0 - (1.0 - confidence) / 2, self.df)
+        return math.exp(mean), math.exp(mean - t * spread), math.exp(mean + t * spread)
+
+
+def format_duration(seconds: float) -> str:
+    """Human readable duration, e.g. `12.3s`, `4.5m` or `2.1h`."""
+    if seconds < 60:
+        return f"{seconds:.1f}s"
+    if seconds < 3600:
+        return f"{seconds / 60:.1f}m"
+    return f"{seconds / 3600:.1f}h"
+
+
+def fit_command(args) -> int:
+    by_zkvm: Dict[str, List[Sample]] = {}
+    for execution_source, proving_source in args.pair:
+        print(f"Pairing {execution_source} with {proving_source}")
+        execution = load_metrics(execution_source, args.jobs, not args.no_cache)
+        proving = load_metrics(proving_source, args.jobs, not args.no_cache)
+        paired = pair_samples(execution, proving)
+        print(f"Paired {len(paired)} fixtures")
+        for sample in paired:
+            by_zkvm.setdefault(sample.zkvm, []).append(sample)
+
+    models = {}
+    print("\n" + "="*80)
+    print("PROVING TIME MODELS")
+    print("="*80)
+    header = "zkVM".ljust(25) + "Samples".ljust(10) + "Regions".ljust(10) + "R²".ljust(8) + \
+        "Sigma (log)".ljust(14) + "LOO median error"
+    print(header)
+    print("-" * len(header))
+    for zkvm in sorted(by_zkvm):
+        model = ProvingModel.fit(by_zkvm[zkvm], not args.cycles_only)
+        if model is None:
+            print(zkvm.ljust(25) + f"{len(by_zkvm[zkvm])} samples, too few to fit")
+            continue
+        models[zkvm] = asdict(model)
+        print(zkvm.ljust(25) + str(model.samples).ljust(10) + str(len(model.regions)).ljust(10) +
+              f"{model.r2:.3f}".ljust(8) + f"{model.sigma:.3f}".ljust(14) + f"{model.loo_median_ape:.1f}%")
+
+    if not models:
+        print("No model could be fitted")
+        return 1
+
+    with open_file(args.output, 'w') as f:
+        json.dump({"format": MODEL_FORMAT_VERSION, "models": models}, f, indent=2)
+    print(f"\nModel written to {args.output}")
+    return 0
+
+
+def predict_command(args) -> int:
+    with open_file(args.model, 'r') as f:
+        document = json.load(f)
+    if document.get("format") != MODEL_FORMAT_VERSION:
+        print(f"Error: {args.model} is not a proving model of format {MODEL_FORMAT_VERSION}")
+        return 1
+    models = {zkvm: ProvingModel(**fields) for zkvm, fields in document["models"].items()}
+
+    print(f"Loading execution results from: {args.execution}")
+    samples = execution_samples(load_metrics(args.execution, args.jobs, not args.no_cache))
+
+    predictions: List[Tuple[Sample, float, float, float]] = []
+    unmodelled: Dict[str, int] = {}
+    for sample in samples.values():
+        model = models.get(sample.zkvm)
+        if model is None:
+            unmodelled[sample.zkvm] = unmodelled.get(sample.zkvm, 0) + 1
+            continue
+        predictions.append((sample, *model.predict(sample, args.confidence)))
+    for zkvm, count in sorted(unmodelled.items()):
+        print(f"Warning: No model for {zkvm}, skipping {count} fixtures")
+    if not predictions:
+        print("No predictions could be made")
+        return 1
+
+    print("\n" + "="*80)
+    print(f"PREDICTED PROVING TIME ({args.confidence:.0%} prediction intervals)")
+    print("="*80)
+    totals: Dict[str, List[float]] = {}
+    for sample, predicted, low, high in predictions:
+        total = totals.setdefault(sample.zkvm, [0, 0.0, 0.0, 0.0])
+        total[0] += 1
+        total[1] += predicted
+        total[2] += low
+        total[3] += high
+    header = "zkVM".ljust(25) + "Fixtures".ljust(10) + "Predicted".ljust(12) + "Range (sum of per-fixture bounds)"
+    print(header)
+    print("-" * len(header))
+    for zkvm in sorted(totals):
+        count, predicted, low, high = totals[zkvm]
+        print(zkvm.ljust(25) + str(int(count)).ljust(10) + format_duration(predicted).ljust(12) +
+              f"{format_duration(low)} - {format_duration(high)}")
+
+    predictions.sort(key=lambda item: item[1], reverse=True)
+    print("\nLongest predicted fixtures:")
+    for i, (sample, predicted, low, high) in enumerate(predictions[:args.top]):
+        print(f"  {i+1}. {sample.zkvm}/{sample.fixture}: {format_duration(predicted)} "
+              f"({format_duration(low)} - {format_duration(high)}), {sample.cycles:,} cycles")
+
+    if args.csv:
+        with open(args.csv, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(["zkvm", "fixture", "total_num_cycles", "predicted_ms", "lower_ms", "upper_ms"])
+            for sample, predicted, low, high in predictions:
+                writer.writerow([sample.zkvm, sample.fixture, sample.cycles,
+                                 round(predicted * 1000), round(low * 1000), round(high * 1000)])
+        print(f"\nPredictions written to {args.csv}")
+    return 0
+
+
+def main():
+    """Main function."""
+    parser = argparse.ArgumentParser(
+        description="Fit and apply proving time models from execution results",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""Example:
+  python3 predict_proving.py fit --pair exec-v5 prove-v5 -o model.json
+  python3 predict_proving.py predict model.json zkevm-metrics/reth --csv predictions.csv"""
+    )
+    parser.add_argument("-j", "--jobs", type=int, default=None,
+                        help="Number of worker processes used to parse metrics (default: CPU count)")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Do not read or update the metrics cache stored in each folder")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    fit = commands.add_parser("fit", help="Fit models from paired execution and proving runs")
+    fit.add_argument("--pair", nargs=2, action="append", required=True, metavar=("EXECUTION", "PROVING"),
+                     help="An execution run and a proving run of the same fixtures; may be given several times")
+    fit.add_argument("-o", "--output", default="proving-model.json",
+                     help="Model file to write (default: proving-model.json)")
+    fit.add_argument("--cycles-only", action="store_true",
+                     help="Use only total_num_cycles, not the region mix, as features")
+    fit.set_defaults(func=fit_command)
+
+    predict = commands.add_parser("predict", help="Predict proving time of execution-only results")
+    predict.add_argument("model", help="Model file written by the fit command")
+    predict.add_argument("execution", help="Metrics folder or results store run with execution results")
+    predict.add_argument("--confidence", type=float, default=CONFIDENCE,
+                         help=f"Coverage of the prediction intervals (default: {CONFIDENCE})")
+    predict.add_argument("--top", type=int, default=20,
+                         help="Number of longest predicted fixtures to list (default: 20)")
+    predict.add_argument("--csv", metavar="FILE", help="Write every prediction as CSV")
+    predict.set_defaults(func=predict_command)
+
+    args = parser.parse_args()
+    if args.command == "predict" and not 0 < args.confidence < 1:
+        parser.error("--confidence must be between 0 and 1")
+    return args.func(args)
+
+if __name__ == "__main__":
+    exit(main())
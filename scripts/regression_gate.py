@@ -0,0 +1,272 @@
+"""
+Regression gate for compare_executions.py and compare_provings.py.
+
+In gate mode every metric with a threshold (a region of `region_cycles`,
+`total_num_cycles`, `proving_time`, or `proof_size`) is checked against the
+maximum allowed slowdown in percent. The aggregate check uses the geometric-mean speedup over
+all common files; with --gate-per-file every file is checked individually as
+well. Results can be written as JSON and as JUnit XML for CI systems, and the
+scripts exit non-zero when any check fails.
+
+A candidate that produces no measurement never passes: files that succeeded
+in the baseline but crashed or are missing in the candidate fail the
+`crashes` check, files whose speedup is zero or infinite fail their per-file
+checks, and a threshold for a metric without any finite speedup fails.
+
+Thresholds come from a JSON file (`{"verify_witness": 1.0, ...}`) and/or
+repeated `--threshold METRIC=PERCENT` options, which take precedence.
+"""
+
+import argparse
+import json
+import math
+import xml.etree.ElementTree as ET
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, List, Optional
+
+from compressed_io import open_file
+from speedup_stats import summarize_speedups
+
+AGGREGATE = "aggregate"
+CRASHES = "crashes"
+
+
+@dataclass
+class GateCheck:
+    """Outcome of one threshold check."""
+    metric: str
+    scope: str
+    speedup: Optional[float]
+    regression_pct: Optional[float]
+    threshold_pct: float
+    failure: Optional[str] = None
+
+    @property
+    def passed(self) -> bool:
+        return self.failure is None and (self.regression_pct is None or self.regression_pct <= self.threshold_pct)
+
+    def describe(self) -> str:
+        if self.failure is not None:
+            return f"{self.metric} [{self.scope}]: {self.failure}"
+        if self.regression_pct is None:
+            return f"{self.metric} [{self.scope}]: none"
+        return (f"{self.metric} [{self.scope}]: {self.speedup:.4f}x, "
+                f"{self.regression_pct:+.2f}% slower (limit {self.threshold_pct:.2f}%)")
+
+
+def add_gate_arguments(parser: argparse.ArgumentParser, metrics: str) -> None:
+    """Add the gate mode options to a compare script's parser."""
+    group = parser.add_argument_group("regression gate")
+    group.add_argument("--gate", action="store_true",
+                       help="Check thresholds and exit with status 1 if any is breached")
+    group.add_argument("--threshold", action="append", default=[], metavar="METRIC=PERCENT",
+                       help=f"Maximum allowed slowdown in percent for a metric ({metrics}); "
+                            "may be given several times")
+    group.add_argument("--thresholds-file", metavar="FILE",
+                       help="JSON object mapping metrics to maximum allowed slowdown in percent")
+    group.add_argument("--default-threshold", type=float, default=None, metavar="PERCENT",
+                       help="Maximum allowed slowdown for metrics without their own threshold")
+    group.add_argument("--gate-per-file", action="store_true",
+                       help="Also apply the thresholds to every file, not only to the geometric mean")
+    group.add_argument("--json-report", metavar="FILE", help="Write the gate results as JSON")
+    group.add_argument("--junit-report", metavar="FILE", help="Write the gate results as JUnit XML")
+
+
+def parse_thresholds(values: List[str], thresholds_file: Optional[str]) -> Dict[str, float]:
+    """Merge thresholds from `--thresholds-file` and `--threshold METRIC=PERCENT` values."""
+    thresholds: Dict[str, float] = {}
+    if thresholds_file:
+        with open_file(thresholds_file, 'r') as f:
+            data = json.load(f)
+        if not isinstance(data, dict):
+            raise ValueError(f"{thresholds_file} must contain a JSON object")
+        thresholds.update({str(metric): float(limit) for metric, limit in data.items()})
+
+    for value in values:
+        metric, sep, limit = value.partition("=")
+        if not sep or not metric:
+            raise ValueError(f"Invalid threshold '{value}', expected METRIC=PERCENT")
+        thresholds[metric.strip()] = float(limit)
+    return thresholds
+
+
+def regression_pct(speedup: float) -> float:
+    """Slowdown in percent implied by a speedup (negative for improvements)."""
+    if speedup == 0.0:
+        return float('inf')
+    return (1.0 / speedup - 1.0) * 100
+
+
+def candidate_failures(baseline_metrics: Dict[str, Dict], candidate_metrics: Dict[str, Dict],
+                       phase: str) -> Dict[str, str]:
+    """
+    Files whose `phase` (`execution` or `proving`) succeeded in the baseline
+    but crashed or is missing in the candidate, mapped to the reason.
+    """
+    failures = {}
+    for filename, data in baseline_metrics.items():
+        if 'success' not in (data.get(phase) or {}):
+            continue
+        candidate = candidate_metrics.get(filename)
+        outcome = (candidate or {}).get(phase) or {}
+        if candidate is None:
+            failures[filename] = "missing in the candidate"
+        elif 'crashed' in outcome:
+            failures[filename] = f"crashed: {outcome['crashed'].get('reason', '')}"
+        elif 'success' not in outcome:
+            failures[filename] = f"no {phase} result"
+    return failures
+
+
+def evaluate_gate(
+    metric_speedups: Dict[str, Dict[str, float]],
+    thresholds: Dict[str, float],
+    default_threshold: Optional[float] = None,
+    per_file: bool = False,
+    failures: Optional[Dict[str, str]] = None
+) -> List[GateCheck]:
+    """
+    Check `metric -> file -> speedup` against the thresholds.
+
+    Metrics with neither their own threshold nor a default are not checked.
+    A threshold for a metric without any finite speedup fails, as do zero or
+    infinite per-file speedups. `failures` maps crashed or missing candidate
+    files to the reason (see `candidate_failures`); any of them fails the
+    `crashes` check, and with `per_file` each gets a failing check of its own
+    instead of checks per metric.
+    """
+    checks: List[GateCheck] = []
+    failures = failures or {}
+    if failures:
+        checks.append(GateCheck(CRASHES, AGGREGATE, None, None, 0.0,
+                                f"{len(failures)} file(s) crashed or missing in the candidate"))
+    else:
+        checks.append(GateCheck(CRASHES, AGGREGATE, None, None, 0.0))
+    if per_file:
+        checks.extend(GateCheck(CRASHES, filename, None, None, 0.0, reason)
+                      for filename, reason in sorted(failures.items()))
+
+    metrics = list(metric_speedups)
+    metrics += [metric for metric in thresholds if metric not in metric_speedups]
+
+    for metric in metrics:
+        threshold = thresholds.get(metric, default_threshold)
+        if threshold is None:
+            continue
+        file_speedups = metric_speedups.get(metric, {})
+
+        summary = summarize_speedups(list(file_speedups.values()))
+        if summary is None:
+            checks.append(GateCheck(metric, AGGREGATE, None, None, threshold, "no finite speedup to check"))
+        else:
+            checks.append(GateCheck(metric, AGGREGATE, summary.geometric_mean,
+                                    regression_pct(summary.geometric_mean), threshold))
+
+        if per_file:
+            for filename in sorted(file_speedups):
+                if filename in failures:
+                    continue
+                speedup = file_speedups[filename]
+                if not 0.0 < speedup < float('inf'):
+                    checks.append(GateCheck(metric, filename, speedup, None, threshold,
+                                            f"no finite speedup ({speedup}x)"))
+                else:
+                    checks.append(GateCheck(metric, filename, speedup, regression_pct(speedup), threshold))
+
+    return checks
+
+
+def _json_number(value: Any) -> Any:
+    """Infinite speedups and regressions are not valid JSON numbers."""
+    if isinstance(value, float) and math.isinf(value):
+        return "inf" if value > 0 else "-inf"
+    return value
+
+
+def write_json_report(path: str, tool: str, checks: List[GateCheck], context: Dict[str, Any]) -> None:
+    report = {
+        "tool": tool,
+        **context,
+        "passed": all(check.passed for check in checks),
+        "failures": sum(not check.passed for check in checks),
+        "checks": [
+            {
+                **{key: _json_number(value) for key, value in asdict(check).items()},
+                "passed": check.passed,
+            }
+            for check in checks
+        ],
+    }
+    with open_file(path, 'w') as f:
+        json.dump(report, f, indent=2)
+
+
+def write_junit_report(path: str, tool: str, checks: List[GateCheck]) -> None:
+    """Write one test suite per metric with one test case per check."""
+    root = ET.Element("testsuites", name=tool)
+    by_metric: Dict[str, List[GateCheck]] = {}
+    for check in checks:
+        by_metric.setdefault(check.metric, []).append(check)
+
+    for metric, metric_checks in by_metric.items():
+        suite = ET.SubElement(
+            root, "testsuite", name=f"{tool}.{metric}", tests=str(len(metric_checks)),
+            failures=str(sum(not check.passed for check in metric_checks)),
+        )
+        for check in metric_checks:
+            case = ET.SubElement(suite, "testcase", classname=f"{tool}.{metric}", name=check.scope)
+            if check.failure is not None:
+                failure = ET.SubElement(case, "failure", message=check.failure)
+                failure.text = check.describe()
+            elif not check.passed:
+                failure = ET.SubElement(case, "failure", message=f"{check.regression_pct:+.2f}% slower "
+                                                                 f"exceeds {check.threshold_pct:.2f}%")
+                failure.text = check.describe()
+
+    ET.ElementTree(root).write(path, encoding="utf-8", xml_declaration=True)
+
+
+def run_gate(
+    args: argparse.Namespace,
+    tool: str,
+    metric_speedups: Dict[str, Dict[str, float]],
+    context: Dict[str, Any],
+    failures: Optional[Dict[str, str]] = None
+) -> int:
+    """Evaluate, print and report the gate. Returns the process exit code."""
+    checks = evaluate_gate(metric_speedups, args.thresholds, args.default_threshold, args.gate_per_file, failures)
+    failures = [check for check in checks if not check.passed]
+
+    print("\n" + "="*80)
+    print("REGRESSION GATE")
+    print("="*80)
+    for check in checks:
+        if check.scope == AGGREGATE or not check.passed:
+            status = "PASS" if check.passed else "FAIL"
+            print(f"  {status}  {check.describe()}")
+    print(f"\n{len(checks) - len(failures)} of {len(checks)} checks passed")
+
+    if args.json_report:
+        write_json_report(args.json_report, tool, checks, context)
+        print(f"JSON report written to {args.json_report}")
+    if args.junit_report:
+        write_junit_report(args.junit_report, tool, checks)
+        print(f"JUnit report written to {args.junit_report}")
+
+    if failures:
+        print(f"❌ Gate failed: {len(failures)} check(s) failed")
+        return 1
+    print("✅ Gate passed")
+    return 0
+
+
+def validate_gate_arguments(parser: argparse.ArgumentParser, args: argparse.Namespace) -> None:
+    """Parse thresholds into `args.thresholds`, failing the parser on invalid input."""
+    try:
+        args.thresholds = parse_thresholds(args.threshold, args.thresholds_file)
+    except (OSError, ValueError) as e:
+        parser.error(str(e))
+    if args.gate and not args.thresholds and args.default_threshold is None:
+        parser.error("--gate needs --threshold, --thresholds-file or --default-threshold")
+    if not args.gate and (args.json_report or args.junit_report):
+        parser.error("--json-report and --junit-report require --gate")
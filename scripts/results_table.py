@@ -0,0 +1,291 @@
+"""
+Columnar, NumPy-backed table of benchmark results.
+
+Each result is one row: interned integer codes for the test, the zkVM (with
+version) and the EL, plus typed columns for the numbers the reports use. A row
+costs about 60 bytes regardless of how large the original JSON document was,
+and aggregates are computed with vectorized group-by reductions.
+
+`region_cycles` are kept as a rows × regions matrix, with region names interned
+like the other labels.
+
+Missing numeric values are stored as -1.
+"""
+
+import hashlib
+from array import array
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+MISSING = -1
+
+
+class Interner:
+    """Assigns dense integer codes to strings in first-seen order."""
+
+    def __init__(self) -> None:
+        self.codes: Dict[str, int] = {}
+        self.names: List[str] = []
+
+    def intern(self, name: str) -> int:
+        code = self.codes.get(name)
+        if code is None:
+            code = len(self.names)
+            self.codes[name] = code
+            self.names.append(name)
+        return code
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+
+def _duration_ns(duration: Any) -> int:
+    if isinstance(duration, dict) and 'secs' in duration and 'nanos' in duration:
+        return duration['secs'] * 1_000_000_000 + duration['nanos']
+    return MISSING
+
+
+class ResultTableBuilder:
+    """Accumulates rows in compact arrays and freezes them into a ResultTable."""
+
+    def __init__(self) -> None:
+        self.tests = Interner()
+        self.zkvms = Interner()
+        self.els = Interner()
+        self.regions = Interner()
+        self._test = array('i')
+        self._zkvm = array('i')
+        self._el = array('i')
+        self._cycles = array('q')
+        self._duration_ns = array('q')
+        self._gas = array('q')
+        self._proving_ms = array('q')
+        self._proof_size = array('q')
+        self._success = array('b')
+        # Region cycles as (row, region code, cycles) triplets, densified in build()
+        self._region_row = array('q')
+        self._region_code = array('q')
+        self._region_cycles = array('q')
+
+    def add(self, test: str, zkvm: str, el: str, data: Dict[str, Any]) -> None:
+        """Add one (summarized) `BenchmarkRun` document."""
+        execution = data.get('execution', {})
+        success = execution.get('success')
+        proving = data.get('proving', {}).get('success', {})
+        metadata = data.get('metadata', {})
+
+        row = len(self._test)
+        self._test.append(self.tests.intern(test))
+        self._zkvm.append(self.zkvms.intern(zkvm))
+        self._el.append(self.els.intern(el))
+        if success is not None:
+            self._success.append(1)
+            self._cycles.append(success.get('total_num_cycles') or MISSING)
+            self._duration_ns.append(_duration_ns(success.get('execution_duration')))
+            for region, cycles in (success.get('region_cycles') or {}).items():
+                if isinstance(cycles, int):
+                    self._region_row.append(row)
+                    self._region_code.append(self.regions.intern(region))
+                    self._region_cycles.append(cycles)
+        else:
+            self._success.append(0)
+            self._cycles.append(MISSING)
+            self._duration_ns.append(MISSING)
+        self._gas.append(metadata.get('block_used_gas', MISSING))
+        self._proving_ms.append(proving.get('proving_time_ms', MISSING))
+        self._proof_size.append(proving.get('proof_size', MISSING))
+
+    def build(self) -> 'ResultTable':
+        region_cycles = np.full((len(self._test), len(self.regions)), MISSING, dtype=np.int64)
+        region_cycles[np.frombuffer(self._region_row, dtype=np.int64),
+                      np.frombuffer(self._region_code, dtype=np.int64)] = \
+            np.frombuffer(self._region_cycles, dtype=np.int64)
+        return ResultTable(
+            test=np.frombuffer(self._test, dtype=np.int32).copy(),
+            zkvm=np.frombuffer(self._zkvm, dtype=np.int32).copy(),
+            el=np.frombuffer(self._el, dtype=np.int32).copy(),
+            cycles=np.frombuffer(self._cycles, dtype=np.int64).copy(),
+            duration_ns=np.frombuffer(self._duration_ns, dtype=np.int64).copy(),
+            gas=np.frombuffer(self._gas, dtype=np.int64).copy(),
+            proving_ms=np.frombuffer(self._proving_ms, dtype=np.int64).copy(),
+            proof_size=np.frombuffer(self._proof_size, dtype=np.int64).copy(),
+            success=np.frombuffer(self._success, dtype=np.int8).astype(bool),
+            region_cycles=region_cycles,
+            test_names=self.tests.names,
+            zkvm_names=self.zkvms.names,
+            el_names=self.els.names,
+            region_names=self.regions.names,
+        )
+
+
+@dataclass
+class ResultTable:
+    """Column arrays for all results plus the code -> name lookup lists."""
+    test: np.ndarray
+    zkvm: np.ndarray
+    el: np.ndarray
+    cycles: np.ndarray
+    duration_ns: np.ndarray
+    gas: np.ndarray
+    proving_ms: np.ndarray
+    proof_size: np.ndarray
+    success: np.ndarray
+    region_cycles: np.ndarray
+    test_names: List[str]
+    zkvm_names: List[str]
+    el_names: List[str]
+    region_names: List[str]
+
+    def __len__(self) -> int:
+        return len(self.test)
+
+    @property
+    def nbytes(self) -> int:
+        """Memory used by the column arrays."""
+        return sum(
+            column.nbytes for column in (
+                self.test, self.zkvm, self.el, self.cycles, self.duration_ns,
+                self.gas, self.proving_ms, self.proof_size, self.success, self.region_cycles
+            )
+        )
+
+    def group_codes(self) -> np.ndarray:
+        """Return one dense code per (zkvm, el) pair for every row."""
+        return self.zkvm.astype(np.int64) * max(len(self.el_names), 1) + self.el
+
+    def split_group_code(self, code: int) -> Tuple[int, int]:
+        """Invert `group_codes` back to `(zkvm_code, el_code)`."""
+        return divmod(int(code), max(len(self.el_names), 1))
+
+    def group_digests(self) -> Dict[Tuple[int, int], str]:
+        """
+        Content hash of every (zkvm, el) group's rows, keyed by
+        `(zkvm_code, el_code)`.
+
+        Rows are hashed in test-name order, so the digest only changes when a
+        result of that group is added, removed or modified.
+        """
+        digests: Dict[Tuple[int, int], str] = {}
+        if len(self) == 0:
+            return digests
+
+        test_rank = np.empty(len(self.test_names), dtype=np.int64)
+        test_rank[sorted(range(len(self.test_names)), key=self.test_names.__getitem__)] = \
+            np.arange(len(self.test_names))
+        groups = self.group_codes()
+        order = np.lexsort((test_rank[self.test], groups))
+        sorted_groups = groups[order]
+        starts = np.flatnonzero(np.r_[True, sorted_groups[1:] != sorted_groups[:-1]])
+        ends = np.r_[starts[1:], len(order)]
+
+        for start, end in zip(starts.tolist(), ends.tolist()):
+            rows = order[start:end]
+            digest = hashlib.sha256()
+            digest.update('\0'.join(self.test_names[code] for code in self.test[rows].tolist()).encode())
+            for column in (self.cycles, self.duration_ns, self.gas, self.proving_ms,
+                           self.proof_size, self.success, self.region_cycles):
+                digest.update(np.ascontiguousarray(column[rows]).tobytes())
+            digest.update('\0'.join(self.region_names).encode())
+            digests[self.split_group_code(sorted_groups[start])] = digest.hexdigest()
+
+        return digests
+
+
+@dataclass
+class GroupReduction:
+    """Per-group aggregates of one column, aligned with `groups`."""
+    groups: np.ndarray
+    count: np.ndarray
+    minimum: np.ndarray
+    maximum: np.ndarray
+    total: np.ndarray
+
+    def items(self) -> Iterator[Tuple[int, int, int, int, int]]:
+        """Yield `(group, count, min, max, sum)` as Python ints."""
+        for values in zip(self.groups.tolist(), self.count.tolist(), self.minimum.tolist(),
+                          self.maximum.tolist(), self.total.tolist()):
+            yield values
+
+
+def group_reduce(keys: np.ndarray, values: np.ndarray, mask: Optional[np.ndarray] = None) -> GroupReduction:
+    """
+    Compute count, min, max and sum of `values` grouped by `keys`.
+
+    Only rows where `mask` is true are considered; groups without any such
+    row are omitted. Sums are exact int64 reductions.
+    """
+    if mask is not None:
+        keys = keys[mask]
+        values = values[mask]
+
+    if len(keys) == 0:
+        empty = np.empty(0, dtype=np.int64)
+        return GroupReduction(empty, empty, empty, empty, empty)
+
+    order = np.argsort(keys, kind='stable')
+    sorted_keys = keys[order]
+    sorted_values = values[order]
+    starts = np.concatenate(([0], np.flatnonzero(sorted_keys[1:] != sorted_keys[:-1]) + 1))
+
+    return GroupReduction(
+        groups=sorted_keys[starts],
+        count=np.diff(np.append(starts, len(sorted_keys))),
+        minimum=np.minimum.reduceat(sorted_values, starts),
+        maximum=np.maximum.reduceat(sorted_values, starts),
+        total=np.add.reduceat(sorted_values, starts),
+    )
+
+
+@dataclass
+class PivotSection:
+    """The test × zkVM matrix of one EL."""
+    el: int
+    tests: np.ndarray
+    zkvms: np.ndarray
+    cells: np.ndarray
+
+    def row(self, test_index: int, zkvm_index: int) -> Optional[int]:
+        """Table row of the cell, or None if that zkVM has no result for the test."""
+        row = int(self.cells[test_index, zkvm_index])
+        return row if row >= 0 else None
+
+
+def build_pivot(table: ResultTable) -> Dict[int, PivotSection]:
+    """
+    Index every result by (el, test, zkvm) in a single O(n log n) pass.
+
+    Returns one PivotSection per EL code. Within a section, zkVMs are ordered
+    by name and `cells[t, z]` holds the table row for `tests[t]` on `zkvms[z]`
+    (-1 when missing). If a combination occurs more than once, the first row
+    wins.
+    """
+    sections: Dict[int, PivotSection] = {}
+    if len(table) == 0:
+        return sections
+
+    zkvm_order = np.array(sorted(range(len(table.zkvm_names)), key=table.zkvm_names.__getitem__))
+    zkvm_rank = np.empty(len(zkvm_order), dtype=np.int64)
+    zkvm_rank[zkvm_order] = np.arange(len(zkvm_order))
+
+    order = np.argsort(table.el, kind='stable')
+    el_sorted = table.el[order]
+    starts = np.flatnonzero(np.r_[True, el_sorted[1:] != el_sorted[:-1]])
+    ends = np.r_[starts[1:], len(order)]
+
+    for start, end in zip(starts.tolist(), ends.tolist()):
+        rows = order[start:end]
+        tests, test_index = np.unique(table.test[rows], return_inverse=True)
+        ranks, zkvm_index = np.unique(zkvm_rank[table.zkvm[rows]], return_inverse=True)
+        zkvms = zkvm_order[ranks]
+
+        keys = test_index.astype(np.int64) * len(zkvms) + zkvm_index
+        _, first = np.unique(keys, return_index=True)
+        cells = np.full((len(tests), len(zkvms)), MISSING, dtype=np.int64)
+        cells.flat[keys[first]] = rows[first]
+
+        el = int(el_sorted[start])
+        sections[el] = PivotSection(el=el, tests=tests, zkvms=zkvms, cells=cells)
+
+    return sections
@@ -0,0 +1,656 @@
+#!/usr/bin/env python3
+"""
+Script to run a stateless-validator benchmark sweep with several concurrent
+ere-hosts processes.
+
+Usage:
+    python3 run_sweep.py --zkvms <zkvm> [<zkvm> ...] --execution-client <el> --workers N [--history METRICS]
+
+Example:
+    python3 run_sweep.py --zkvms sp1 --execution-client reth --action prove --workers 4 \\
+        --history zkevm-metrics/reth
+    python3 run_sweep.py --zkvms risc0 zisk --execution-client ethrex --workers 2 --dry-run
+
+ere-hosts proves its inputs one after another, so a single process keeps only
+one prover busy. This script runs one ere-hosts process per worker, each on a
+batch of fixtures for one zkVM materialized as a folder of hard links. Every
+worker gets its own RAYON_NUM_THREADS slice of --threads and its own output
+folder below --work-dir. Finished results are moved into --output-folder,
+laid out as if a single ere-hosts had run.
+
+Every (EL, zkVM, fixture) is an item of a durable work queue (see
+work_queue.py, stored in --work-dir by default). Workers lease their batches
+from it and keep the leases alive while ere-hosts runs, so a sweep that is
+killed or preempted resumes where it stopped when run again with the same
+arguments. Crashed results are retried until --max-attempts, a batch that
+stops producing results for --timeout seconds is killed, and fixtures that
+already have a successful result in --output-folder are not run again unless
+--force-rerun is given.
+
+Fixtures are scheduled longest-predicted-first. The predicted cost of an item
+is the fixture's total_num_cycles on that zkVM in the --history runs, or its
+mean over the other zkVMs. Fixtures without history are estimated from their
+file size. Each lease takes the most expensive pending item plus the next
+most expensive items of the same zkVM up to 1 / (--workers *
+--batches-per-worker) of the predicted work, so the wall time of a sweep drops
+with the number of workers. More batches per worker absorb prediction errors
+at the cost of starting ere-hosts more often.
+
+For reth, ere-hosts applies the zkVM's precompile patches to the shared
+ere-guests workspace before compiling the guest (`cargo <zkvm>` rewrites its
+`[patch]` section and runs `cargo update`), so concurrent processes for
+different zkVMs would patch and build over each other. Reth sweeps therefore
+run one zkVM at a time: all workers lease batches of the same zkVM, and only
+when none of them is running is the workspace patched for the next zkVM,
+once, after which ere-hosts runs with --skip-patches. The workspace is locked
+for the whole sweep, so two sweeps cannot share a checkout.
+"""
+
+import argparse
+import fcntl
+import os
+import shutil
+import statistics
+import subprocess
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+from gas_metrics import group_name, total_cycles
+from metrics_loader import load_metrics, parse_metrics_file, parse_store_source
+from triage_crashes import crash_reasons
+from work_queue import DEFAULT_MAX_ATTEMPTS, ItemKey, WorkItem, WorkQueue, lease_owner
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_ERE_HOSTS = REPO_ROOT / "target" / "release" / "ere-hosts"
+DEFAULT_GUEST_WORKSPACE = REPO_ROOT / "ere-guests"
+# Execution clients whose guests ere-hosts patches for the zkVM before compiling them
+PATCHED_CLIENTS = ("reth",)
+QUEUE_FILE = "queue.sqlite"
+# Cost of a fixture when neither history nor other fixtures give an estimate
+DEFAULT_CYCLES_PER_BYTE = 1000.0
+# Leases are renewed every HEARTBEAT_SECONDS and expire after LEASE_SECONDS
+HEARTBEAT_SECONDS = 30.0
+LEASE_SECONDS = 600.0
+
+
+@dataclass
+class Fixture:
+    """One fixture file."""
+    name: str
+    path: Path
+    size: int
+
+
+@dataclass
+class BatchResult:
+    """Outcome of one ere-hosts invocation."""
+    index: int
+    worker: int
+    zkvm: str
+    items: int
+    returncode: int
+    seconds: float
+    log_path: Path
+    outcomes: Dict[str, int] = field(default_factory=dict)
+
+
+def zkvm_name(group: str) -> str:
+    """zkVM of a `<zkvm>-v<version>` folder name, e.g. `sp1` for `sp1-v5.0.0`."""
+    return group.rsplit("-v", 1)[0]
+
+
+def list_fixtures(input_folder: Path, includes: Sequence[str]) -> List[Fixture]:
+    """Fixture files of `input_folder` whose name contains all `includes`, sorted by name."""
+    fixtures = []
+    for path in sorted(input_folder.glob('*.json')):
+        if all(include in path.stem for include in includes):
+            fixtures.append(Fixture(path.stem, path, path.stat().st_size))
+    return fixtures
+
+
+def historical_cycles(sources: Sequence[str], zkvms: Sequence[str], workers: Optional[int],
+                      use_cache: bool) -> Dict[str, Dict[str, int]]:
+    """
+    `fixture -> zkvm -> total_num_cycles` of the requested zkVMs in the
+    history runs. Later sources override earlier ones.
+    """
+    cycles: Dict[str, Dict[str, int]] = {}
+    for source in sources:
+        if not parse_store_source(source):
+            source = os.path.abspath(source)
+        print(f"Loading history from: {source}")
+        metrics = load_metrics(source, workers, use_cache)
+        print(f"Loaded {len(metrics)} files")
+        for filename, data in metrics.items():
+            zkvm = zkvm_name(group_name(filename).rsplit("/", 1)[-1])
+            value = total_cycles(data)
+            if zkvm in zkvms and value:
+                cycles.setdefault(filename.rsplit("/", 1)[-1], {})[zkvm] = value
+    return cycles
+
+
+def build_items(fixtures: List[Fixture], history: Dict[str, Dict[str, int]], zkvms: Sequence[str],
+                el: str) -> List[WorkItem]:
+    """
+    One work item per fixture and zkVM, with its predicted cycles: the
+    fixture's cycles on that zkVM, or its mean over the other zkVMs. Fixtures
+    without any history are estimated from the median cycles per byte.
+    """
+    cycles_per_byte = []
+    for fixture in fixtures:
+        known = history.get(fixture.name)
+        if known and fixture.size:
+            cycles_per_byte.append(statistics.fmean(known.values()) / fixture.size)
+    rate = statistics.median(cycles_per_byte) if cycles_per_byte else DEFAULT_CYCLES_PER_BYTE
+
+    items = []
+    for fixture in fixtures:
+        known = history.get(fixture.name) or {}
+        fallback = statistics.fmean(known.values()) if known else rate * max(fixture.size, 1)
+        for zkvm in zkvms:
+            items.append(WorkItem(el, zkvm, fixture.name, str(fixture.path.resolve()), known.get(zkvm, fallback)))
+    return items
+
+
+def predicted_makespan(batches: List[List[WorkItem]], workers: int, phased: bool = False) -> float:
+    """
+    Predicted cycles of the busiest worker when batches go to the first free
+    worker. When `phased`, a batch of another zkVM than the previous one waits
+    for all running batches to finish.
+    """
+    loads = [0.0] * workers
+    for previous, batch in zip([None] + batches, batches):
+        if phased and previous is not None and previous[0].zkvm != batch[0].zkvm:
+            loads = [max(loads)] * workers
+        loads[loads.index(min(loads))] += sum(item.predicted_cycles for item in batch)
+    return max(loads) if loads else 0.0
+
+
+def thread_slices(threads: int, workers: int, cpus: Sequence[int]) -> List[List[int]]:
+    """
+    Split `threads` into `workers` contiguous slices of `cpus`, the first ones
+    one larger. CPUs are shared round-robin when there are more threads than CPUs.
+    """
+    slices = []
+    start = 0
+    for worker in range(workers):
+        size = max(threads // workers + (1 if worker < threads % workers else 0), 1)
+        slices.append([cpus[i % len(cpus)] for i in range(start, start + size)])
+        start += size
+    return slices
+
+
+def result_outcome(data: Dict) -> Optional[str]:
+    """None for a successful result, otherwise the crash reason."""
+    crashes = crash_reasons(data)
+    return (crashes[0][1] or "Crashed") if crashes else None
+
+
+def existing_outcomes(output_folder: Path, el: str, zkvms: Sequence[str], keys: Sequence[ItemKey],
+                      workers: Optional[int], use_cache: bool) -> Dict[ItemKey, Optional[str]]:
+    """Outcomes of the results that already exist in the output folder for `keys`."""
+    el_folder = output_folder / el
+    if not keys or not el_folder.is_dir():
+        return {}
+    wanted = set(keys)
+    outcomes = {}
+    for filename, data in load_metrics(str(el_folder), workers, use_cache).items():
+        group, _, fixture = filename.rpartition("/")
+        key = (el, zkvm_name(group), fixture)
+        if key in wanted and zkvm_name(group) in zkvms:
+            outcomes[key] = result_outcome(data)
+    return outcomes
+
+
+def materialize_batch(batch: List[WorkItem], folder: Path) -> None:
+    """
+    Create the input folder of a batch. ere-hosts only accepts regular files,
+    so fixtures are hard linked, or copied across file systems.
+    """
+    if folder.exists():
+        shutil.rmtree(folder)
+    folder.mkdir(parents=True)
+    for item in batch:
+        source = Path(item.path)
+        target = folder / source.name
+        try:
+            os.link(source, target)
+        except OSError:
+            shutil.copyfile(source, target)
+
+
+def ere_hosts_command(args: argparse.Namespace, zkvm: str, input_folder: Path, output_folder: Path) -> List[str]:
+    patches = ["--skip-patches"] if args.execution_client in PATCHED_CLIENTS else []
+    return [args.ere_hosts, "--action", args.action, "--resource", args.resource,
+            "--output-folder", str(output_folder), "--zkvms", zkvm, *patches,
+            "stateless-validator", "--execution-client", args.execution_client,
+            "--input-folder", str(input_folder)]
+
+
+def lock_workspace(workspace: Path) -> Optional[int]:
+    """
+    Take an exclusive lock on the guest workspace folder for the lifetime of
+    this process. Returns None if another sweep holds it.
+    """
+    fd = os.open(workspace, os.O_RDONLY)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        os.close(fd)
+        return None
+    return fd
+
+
+def patch_workspace(zkvm: str, workspace: Path, log_path: Path) -> bool:
+    """
+    Apply the precompile patches of `zkvm` to the guest workspace, as ere-hosts
+    does before compiling a reth guest. Returns False if the command failed.
+    """
+    log_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(log_path, 'w') as log:
+        try:
+            # The `cargo <zkvm>` aliases are defined in the checkout's .cargo/config.toml
+            process = subprocess.run(["cargo", zkvm, "--manifest-folder", str(workspace)], cwd=workspace.parent,
+                                     stdout=log, stderr=subprocess.STDOUT)
+        except (OSError, subprocess.SubprocessError) as e:
+            log.write(f"Failed to run cargo {zkvm}: {e}\n")
+            return False
+    return process.returncode == 0
+
+
+def count_results(worker_output: Path) -> int:
+    return sum(1 for path in worker_output.rglob('*.json') if path.name != "hardware.json")
+
+
+def run_ere_hosts(command: List[str], env: Dict[str, str], preexec_fn, log_path: Path, worker_output: Path,
+                  work_queue: WorkQueue, owner: str, timeout: Optional[float]) -> int:
+    """
+    Run ere-hosts, renewing the leases of `owner` while it runs. The process is
+    killed when no new result appears for `timeout` seconds.
+    """
+    with open(log_path, 'w') as log:
+        try:
+            process = subprocess.Popen(command, env=env, stdout=log, stderr=subprocess.STDOUT, preexec_fn=preexec_fn)
+        except (OSError, subprocess.SubprocessError) as e:
+            log.write(f"Failed to start ere-hosts: {e}\n")
+            return -1
+
+        results, last_progress = 0, time.monotonic()
+        wait = HEARTBEAT_SECONDS if timeout is None else min(HEARTBEAT_SECONDS, timeout)
+        while True:
+            try:
+                return process.wait(timeout=wait)
+            except subprocess.TimeoutExpired:
+                pass
+            work_queue.renew(owner, LEASE_SECONDS)
+            if timeout is None:
+                continue
+            current = count_results(worker_output)
+            if current > results:
+                results, last_progress = current, time.monotonic()
+            elif time.monotonic() - last_progress > timeout:
+                log.write(f"\nKilled after {timeout:.0f} s without a new result\n")
+                process.kill()
+                return process.wait()
+
+
+def collect_results(batch: List[WorkItem], worker_output: Path, output_folder: Path, work_queue: WorkQueue,
+                    returncode: int, log_path: Path) -> Dict[str, int]:
+    """
+    Record the outcome of every item of a finished batch in the queue and move
+    its results into the output folder. Returns the number of items per new state.
+    """
+    outcomes: Dict[str, int] = {}
+    error = f"ere-hosts exited with status {returncode} without a result, see {log_path}"
+    for item in batch:
+        el_output = worker_output / item.el
+        folders = sorted(el_output.iterdir()) if el_output.is_dir() else []
+        # Fixture names contain brackets, so the result files are not looked up with glob patterns
+        paths = [folder / f"{item.fixture}.json" for folder in folders
+                 if zkvm_name(folder.name) == item.zkvm and (folder / f"{item.fixture}.json").is_file()]
+        data = parse_metrics_file(paths[-1]) if paths else None
+        if not isinstance(data, dict):
+            state = work_queue.record_missing(item, error, len(batch))
+        else:
+            reason = result_outcome(data)
+            if reason is None:
+                work_queue.record_success(item)
+                state = "done"
+            else:
+                state = work_queue.record_crash(item, reason)
+                state = "retry" if state == "pending" else state
+            for path in paths:
+                target = output_folder / path.relative_to(worker_output)
+                target.parent.mkdir(parents=True, exist_ok=True)
+                os.replace(path, target)
+        if state == "pending":
+            state = "isolated" if len(batch) > 1 and not item.isolate else "retry"
+        outcomes[state] = outcomes.get(state, 0) + 1
+
+    hardware = worker_output / "hardware.json"
+    if hardware.is_file() and not (output_folder / "hardware.json").exists():
+        output_folder.mkdir(parents=True, exist_ok=True)
+        os.replace(hardware, output_folder / "hardware.json")
+    return outcomes
+
+
+class Dispatcher:
+    """
+    Shared state of the worker threads. With a guest `workspace` to patch,
+    batches are leased one zkVM at a time and the workspace is patched for
+    the next zkVM once no batch is running.
+    """
+
+    def __init__(self, queue_path: Path, target_cycles: float, max_items: Optional[int], max_attempts: int,
+                 workspace: Optional[Path] = None, log_folder: Optional[Path] = None):
+        self.queue_path = queue_path
+        self.target_cycles = target_cycles
+        self.max_items = max_items
+        self.max_attempts = max_attempts
+        self.workspace = workspace
+        self.log_folder = log_folder
+        self.lock = threading.Lock()
+        self.results: List[BatchResult] = []
+        self.next_index = 0
+        self.phase = threading.Condition()
+        self.zkvm: Optional[str] = None
+        self.running = 0
+        self.error: Optional[str] = None
+
+    def batch_index(self) -> int:
+        with self.lock:
+            self.next_index += 1
+            return self.next_index - 1
+
+    def lease(self, work_queue: WorkQueue, owner: str) -> List[WorkItem]:
+        """The next batch for a worker, or an empty list when the sweep is over."""
+        if self.workspace is None:
+            return work_queue.lease(owner, self.target_cycles, self.max_items, LEASE_SECONDS)
+        with self.phase:
+            while self.error is None:
+                if self.zkvm is not None:
+                    batch = work_queue.lease(owner, self.target_cycles, self.max_items, LEASE_SECONDS, self.zkvm)
+                    if batch:
+                        self.running += 1
+                        return batch
+                    if self.running:
+                        # A running batch may still return items of this zkVM for a retry
+                        self.phase.wait()
+                        continue
+                zkvm = work_queue.pending_zkvm()
+                if zkvm is None:
+                    return []
+                log_path = self.log_folder / f"patch-{zkvm}.log"
+                with self.lock:
+                    print(f"Patching {self.workspace} for {zkvm}")
+                if not patch_workspace(zkvm, self.workspace, log_path):
+                    self.error = f"cargo {zkvm} failed to patch {self.workspace}, see {log_path}"
+                    self.phase.notify_all()
+                    return []
+                self.zkvm = zkvm
+                self.phase.notify_all()
+            return []
+
+    def batch_finished(self) -> None:
+        if self.workspace is None:
+            return
+        with self.phase:
+            self.running -= 1
+            self.phase.notify_all()
+
+
+def run_worker(worker: int, cpus: List[int], args: argparse.Namespace, dispatcher: Dispatcher) -> None:
+    """Lease and run batches until the queue has no pending items."""
+    work_dir = Path(args.work_dir)
+    worker_output = work_dir / f"worker-{worker}"
+    output_folder = Path(args.output_folder)
+    env = dict(os.environ, RAYON_NUM_THREADS=str(len(cpus)))
+    preexec_fn = None
+    if args.pin and hasattr(os, "sched_setaffinity"):
+        preexec_fn = lambda: os.sched_setaffinity(0, cpus)
+
+    # SQLite connections cannot be shared between threads
+    work_queue = WorkQueue(dispatcher.queue_path, max_attempts=dispatcher.max_attempts)
+    owner = lease_owner(worker)
+    try:
+        while True:
+            batch = dispatcher.lease(work_queue, owner)
+            if not batch:
+                return
+            index = dispatcher.batch_index()
+            zkvm = batch[0].zkvm
+            input_folder = work_dir / "inputs" / f"batch-{index}"
+            materialize_batch(batch, input_folder)
+            if worker_output.exists():
+                shutil.rmtree(worker_output)
+            worker_output.mkdir(parents=True)
+            log_path = work_dir / "logs" / f"batch-{index}.log"
+            log_path.parent.mkdir(parents=True, exist_ok=True)
+            with dispatcher.lock:
+                print(f"[worker {worker}] batch {index}: {zkvm}, {len(batch)} fixtures, "
+                      f"RAYON_NUM_THREADS={len(cpus)}")
+
+            start = time.monotonic()
+            returncode = run_ere_hosts(ere_hosts_command(args, zkvm, input_folder, worker_output), env, preexec_fn,
+                                       log_path, worker_output, work_queue, owner, args.timeout)
+            seconds = time.monotonic() - start
+            shutil.rmtree(input_folder, ignore_errors=True)
+
+            with dispatcher.lock:
+                outcomes = collect_results(batch, worker_output, output_folder, work_queue, returncode, log_path)
+                dispatcher.results.append(BatchResult(index, worker, zkvm, len(batch), returncode, seconds,
+                                                      log_path, outcomes))
+                summary = ", ".join(f"{count} {state}" for state, count in sorted(outcomes.items()))
+                status = "" if returncode == 0 else f", exit {returncode} (see {log_path})"
+                print(f"[worker {worker}] batch {index}: {summary} in {seconds:,.0f} s{status}")
+            dispatcher.batch_finished()
+    finally:
+        work_queue.close()
+
+
+def simulate_batches(work_queue: WorkQueue, target_cycles: float, max_items: Optional[int],
+                     phased: bool) -> List[List[WorkItem]]:
+    """Lease everything pending from a (copied) queue in dispatch order, one zkVM at a time when `phased`."""
+    batches = []
+    zkvm = None
+    while True:
+        batch = work_queue.lease("dry-run", target_cycles, max_items, zkvm=zkvm)
+        if batch:
+            batches.append(batch)
+        elif zkvm is None:
+            return batches
+        if phased:
+            zkvm = batch[0].zkvm if batch else None
+
+
+def print_counts(counts: Dict[str, int]) -> None:
+    print("Work items: " + ", ".join(f"{count} {state}" for state, count in counts.items()))
+
+
+def print_plan(batches: List[List[WorkItem]], workers: int, slices: List[List[int]], pinned: bool, phased: bool):
+    """Print the batches and the predicted benefit of running them in parallel."""
+    print("\n" + "="*80)
+    print("SWEEP PLAN")
+    print("="*80)
+    for worker, cpus in enumerate(slices):
+        cpu_list = f", CPUs {','.join(str(cpu) for cpu in sorted(set(cpus)))}" if pinned else ""
+        print(f"  worker {worker}: RAYON_NUM_THREADS={len(cpus)}{cpu_list}")
+
+    header = "Batch".ljust(8) + "zkVM".ljust(10) + "Fixtures".ljust(10) + "Predicted Mcycles".ljust(20) + "Longest fixture"
+    print("\n" + header)
+    print("-" * len(header))
+    for index, batch in enumerate(batches):
+        predicted = sum(item.predicted_cycles for item in batch)
+        print(str(index).ljust(8) + batch[0].zkvm.ljust(10) + str(len(batch)).ljust(10) +
+              f"{predicted / 1_000_000:,.0f}".ljust(20) + batch[0].fixture)
+
+    if phased:
+        print("\nzkVMs run one at a time, the guest workspace is patched before the first batch of each")
+    total = sum(item.predicted_cycles for batch in batches for item in batch)
+    makespan = predicted_makespan(batches, workers, phased)
+    if makespan:
+        print(f"\nPredicted speedup over one worker: {total / makespan:.2f}x "
+              f"(busiest worker has {makespan / total:.0%} of the work)")
+
+
+def main():
+    """Main function."""
+    parser = argparse.ArgumentParser(
+        description="Run a stateless-validator benchmark sweep with several concurrent ere-hosts processes",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""Example:
+  python3 run_sweep.py --zkvms sp1 --execution-client reth --action prove --workers 4 --history zkevm-metrics/reth
+  python3 run_sweep.py --zkvms risc0 zisk --execution-client ethrex --workers 2 --include 10M- --dry-run
+  python3 run_sweep.py --zkvms sp1 --execution-client reth --action prove --workers 4 --timeout 7200 --max-attempts 2"""
+    )
+    parser.add_argument("--zkvms", nargs="+", required=True, help="zkVMs to benchmark")
+    parser.add_argument("--execution-client", required=True, choices=["reth", "ethrex"],
+                        help="Execution client to benchmark")
+    parser.add_argument("--action", choices=["execute", "prove"], default="execute",
+                        help="Action to perform (default: execute)")
+    parser.add_argument("--resource", choices=["cpu", "gpu"], default="cpu",
+                        help="Resource type for proving (default: cpu)")
+    parser.add_argument("-i", "--input-folder", default="zkevm-fixtures-input",
+                        help="Folder with the fixture files (default: zkevm-fixtures-input)")
+    parser.add_argument("--include", action="append", default=[],
+                        help="Only run fixtures whose name contains this string (repeatable)")
+    parser.add_argument("-o", "--output-folder", default="zkevm-metrics",
+                        help="Folder the results are merged into (default: zkevm-metrics)")
+    parser.add_argument("--work-dir", default="sweep-work",
+                        help="Folder for the work queue, batch inputs, worker outputs and logs (default: sweep-work)")
+    parser.add_argument("--queue", default=None,
+                        help=f"Work queue database (default: <work-dir>/{QUEUE_FILE})")
+    parser.add_argument("-w", "--workers", type=int, default=1, help="Concurrent ere-hosts processes (default: 1)")
+    parser.add_argument("--threads", type=int, default=os.cpu_count() or 1,
+                        help="Threads split between the workers (default: CPU count)")
+    parser.add_argument("--pin", action="store_true", help="Pin every worker to its own CPUs (Linux only)")
+    parser.add_argument("--batches-per-worker", type=int, default=1,
+                        help="Split the predicted work into this many batches per worker (default: 1)")
+    parser.add_argument("--max-batch", type=int, default=None, help="Maximum number of fixtures per batch")
+    parser.add_argument("--max-attempts", type=int, default=DEFAULT_MAX_ATTEMPTS,
+                        help=f"Attempts per fixture before a crash or failure is final (default: {DEFAULT_MAX_ATTEMPTS})")
+    parser.add_argument("--timeout", type=float, default=None,
+                        help="Kill a batch that produces no new result for this many seconds")
+    parser.add_argument("--history", nargs="+", default=[], metavar="METRICS",
+                        help="Execution runs (metrics folders or results store runs) used to predict fixture costs")
+    parser.add_argument("--ere-hosts", default=str(DEFAULT_ERE_HOSTS),
+                        help="ere-hosts binary (default: target/release/ere-hosts)")
+    parser.add_argument("--guest-workspace", default=str(DEFAULT_GUEST_WORKSPACE),
+                        help="ere-guests workspace of the checkout ere-hosts was built in (default: ere-guests)")
+    parser.add_argument("--force-rerun", action="store_true",
+                        help="Rerun every fixture, including finished ones")
+    parser.add_argument("--dry-run", action="store_true", help="Only print the plan")
+    parser.add_argument("-j", "--jobs", type=int, default=None,
+                        help="Number of worker processes used to parse metrics (default: CPU count)")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Do not read or update the metrics cache stored in the metrics folders")
+    args = parser.parse_args()
+
+    if args.workers < 1 or args.batches_per_worker < 1 or args.threads < 1 or args.max_attempts < 1:
+        parser.error("--workers, --batches-per-worker, --threads and --max-attempts must be at least 1")
+    input_folder = Path(args.input_folder)
+    if not input_folder.is_dir():
+        parser.error(f"input folder {input_folder} does not exist")
+    if not args.dry_run and not Path(args.ere_hosts).is_file():
+        parser.error(f"ere-hosts binary {args.ere_hosts} not found, build it with "
+                     "`cargo build --release -p ere-hosts` or pass --ere-hosts")
+    workspace = Path(args.guest_workspace).resolve()
+    if not args.dry_run and not workspace.is_dir():
+        parser.error(f"guest workspace {workspace} does not exist, pass --guest-workspace")
+    phased = args.execution_client in PATCHED_CLIENTS
+
+    queue_path = Path(args.queue) if args.queue else Path(args.work_dir) / QUEUE_FILE
+    if args.dry_run:
+        work_queue = WorkQueue.in_memory_copy(queue_path, args.max_attempts)
+    else:
+        queue_path.parent.mkdir(parents=True, exist_ok=True)
+        work_queue = WorkQueue.open(queue_path, create=True, max_attempts=args.max_attempts)
+        if work_queue is None:
+            return 1
+    settings = {"action": args.action, "resource": args.resource, "output_folder": str(Path(args.output_folder).resolve())}
+    mismatches = work_queue.check_settings(settings)
+    if mismatches:
+        print(f"Error: {queue_path} belongs to a different sweep:")
+        for mismatch in mismatches:
+            print(f"  {mismatch}")
+        print("Use another --work-dir or --queue, or delete the queue to start over")
+        return 1
+
+    fixtures = list_fixtures(input_folder, args.include)
+    print(f"Found {len(fixtures)} fixtures in {input_folder}")
+    history = historical_cycles(args.history, args.zkvms, args.jobs, not args.no_cache)
+    added = work_queue.add(build_items(fixtures, history, args.zkvms, args.execution_client))
+    if args.force_rerun:
+        print(f"Reset {work_queue.reset()} work items")
+    else:
+        reclaimed = work_queue.reclaim()
+        if reclaimed:
+            print(f"Reclaimed {reclaimed} work items from interrupted workers")
+        outcomes = existing_outcomes(Path(args.output_folder), args.execution_client, args.zkvms, added,
+                                     args.jobs, not args.no_cache)
+        done, crashed = work_queue.seed(outcomes)
+        if done or crashed:
+            print(f"Found existing results for {done + crashed} new work items ({crashed} crashed)")
+    print_counts(work_queue.counts())
+
+    pending_cycles = work_queue.pending_cycles()
+    target_cycles = pending_cycles / (args.workers * args.batches_per_worker)
+    if args.dry_run:
+        batches = simulate_batches(work_queue, target_cycles, args.max_batch, phased)
+        workers = max(min(args.workers, len(batches)), 1)
+    else:
+        workers = args.workers
+    cpus = sorted(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else list(range(args.threads))
+    slices = thread_slices(args.threads, workers, cpus)
+    if args.dry_run:
+        if batches:
+            print_plan(batches, workers, slices, args.pin, phased)
+        else:
+            print("Nothing to run")
+        return 0
+    work_queue.close()
+
+    # Held until the process exits
+    workspace_lock = lock_workspace(workspace)
+    if workspace_lock is None:
+        print(f"Error: another sweep is using {workspace}")
+        return 1
+    dispatcher = Dispatcher(queue_path, target_cycles, args.max_batch, args.max_attempts,
+                            workspace if phased else None, Path(args.work_dir) / "logs")
+    start = time.monotonic()
+    threads = [threading.Thread(target=run_worker, args=(worker, slices[worker], args, dispatcher))
+               for worker in range(workers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall_seconds = time.monotonic() - start
+
+    print("\n" + "="*80)
+    print("SWEEP SUMMARY")
+    print("="*80)
+    busy_seconds = sum(result.seconds for result in dispatcher.results)
+    print(f"Batches: {len(dispatcher.results)}, wall time: {wall_seconds:,.0f} s, summed batch time: "
+          f"{busy_seconds:,.0f} s ({busy_seconds / wall_seconds if wall_seconds else 0:.2f}x parallelism)")
+    print(f"Results merged into: {args.output_folder}")
+    if dispatcher.error:
+        print(f"Error: {dispatcher.error}")
+    work_queue = WorkQueue(queue_path, max_attempts=args.max_attempts)
+    counts = work_queue.counts()
+    print_counts(counts)
+    problems = work_queue.problems()
+    work_queue.close()
+    if problems:
+        print(f"\n{len(problems)} work items crashed or failed after all attempts:")
+        for el, zkvm, fixture, state, attempts, error in problems[:20]:
+            reason = (error or "").strip().splitlines()
+            print(f"  {el}/{zkvm}/{fixture}: {state} after {attempts} attempts: {reason[0] if reason else ''}")
+        if len(problems) > 20:
+            print(f"  ... and {len(problems) - 20} more")
+    return 1 if dispatcher.error or problems or counts["pending"] or counts["leased"] else 0
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,268 @@
+"""
+Statistics for comparing a baseline against an optimized run.
+
+Per-fixture speedups are ratios, so they are summarized with the geometric mean
+(a 2x speedup and a 2x slowdown cancel out) together with a bootstrap
+confidence interval over fixtures. When a fixture was run several times,
+Welch's t-test tells whether its timing change is larger than the run-to-run
+noise.
+
+The bootstrap is vectorized with numpy; resampling is seeded so reports are
+reproducible.
+"""
+
+import math
+import statistics
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+BOOTSTRAP_RESAMPLES = 2000
+CONFIDENCE = 0.95
+BOOTSTRAP_SEED = 0
+# Resample indices drawn at once, bounding the memory of large bootstraps
+BOOTSTRAP_CHUNK_ELEMENTS = 4_000_000
+
+
+def geometric_mean(values: Sequence[float]) -> float:
+    """Geometric mean of positive values."""
+    return math.exp(statistics.fmean(math.log(value) for value in values))
+
+
+def bootstrap_ci(
+    values: Sequence[float],
+    resamples: int = BOOTSTRAP_RESAMPLES,
+    confidence: float = CONFIDENCE,
+    seed: int = BOOTSTRAP_SEED
+) -> Tuple[float, float]:
+    """
+    Percentile bootstrap confidence interval of the geometric mean of
+    positive `values`, resampling fixtures with replacement.
+    """
+    logs = np.log(np.asarray(values, dtype=float))
+    n = len(logs)
+    if n < 2:
+        mean = math.exp(logs[0])
+        return mean, mean
+
+    rng = np.random.default_rng(seed)
+    means = np.empty(resamples)
+    step = max(BOOTSTRAP_CHUNK_ELEMENTS // n, 1)
+    for start in range(0, resamples, step):
+        stop = min(start + step, resamples)
+        means[start:stop] = logs[rng.integers(0, n, (stop - start, n))].mean(axis=1)
+    means.sort()
+    tail = (1.0 - confidence) / 2
+    low = means[int(tail * (resamples - 1))]
+    high = means[int(math.ceil((1.0 - tail) * (resamples - 1)))]
+    return math.exp(low), math.exp(high)
+
+
+@dataclass
+class SpeedupSummary:
+    """Aggregate of per-fixture speedups."""
+    count: int
+    geometric_mean: float
+    ci_low: float
+    ci_high: float
+    arithmetic_mean: float
+    minimum: float
+    maximum: float
+
+    @property
+    def significant(self) -> bool:
+        """True if the confidence interval excludes 1.0x (no change)."""
+        return self.ci_low > 1.0 or self.ci_high < 1.0
+
+
+def summarize_speedups(speedups: Sequence[float]) -> Optional[SpeedupSummary]:
+    """
+    Summarize per-fixture speedups. Zero and infinite speedups (regions that
+    were added or eliminated) have no meaningful ratio and are left out.
+    """
+    values = [value for value in speedups if 0.0 < value < float('inf')]
+    if not values:
+        return None
+    ci_low, ci_high = bootstrap_ci(values)
+    return SpeedupSummary(
+        count=len(values),
+        geometric_mean=geometric_mean(values),
+        ci_low=ci_low,
+        ci_high=ci_high,
+        arithmetic_mean=statistics.mean(values),
+        minimum=min(values),
+        maximum=max(values),
+    )
+
+
+def format_ci(summary: SpeedupSummary) -> str:
+    """Format the confidence interval, e.g. `95% CI [1.02x, 1.08x]`."""
+    return f"{CONFIDENCE:.0%} CI [{summary.ci_low:.2f}x, {summary.ci_high:.2f}x]"
+
+
+def _continued_fraction(x: float, a: float, b: float) -> float:
+    """Continued fraction for the incomplete beta function (Numerical Recipes `betacf`)."""
+    tiny = 1e-300
+    qab, qap, qam = a + b, a + 1.0, a - 1.0
+    c, d = 1.0, 1.0 - qab * x / qap
+    d = 1.0 / (d if abs(d) > tiny else tiny)
+    h = d
+    for m in range(1, 301):
+        m2 = 2 * m
+        aa = m * (b - m) * x / ((qam + m2) * (a + m2))
+        d = 1.0 + aa * d
+        d = 1.0 / (d if abs(d) > tiny else tiny)
+        c = 1.0 + aa / c
+        c = c if abs(c) > tiny else tiny
+        h *= d * c
+        aa = -(a + m) * (qab + m) * x / ((a + m2) * (qap + m2))
+        d = 1.0 + aa * d
+        d = 1.0 / (d if abs(d) > tiny else tiny)
+        c = 1.0 + aa / c
+        c = c if abs(c) > tiny else tiny
+        delta = d * c
+        h *= delta
+        if abs(delta - 1.0) < 1e-12:
+            break
+    return h
+
+
+def regularized_incomplete_beta(x: float, a: float, b: float) -> float:
+    """I_x(a, b), used for the Student t distribution."""
+    if x <= 0.0:
+        return 0.0
+    if x >= 1.0:
+        return 1.0
+    front = math.exp(math.lgamma(a + b) - math.lgamma(a) - math.lgamma(b)
+                     + a * math.log(x) + b * math.log(1.0 - x))
+    if x < (a + 1.0) / (a + b + 2.0):
+        return front * _continued_fraction(x, a, b) / a
+    return 1.0 - front * _continued_fraction(1.0 - x, b, a) / b
+
+
+def student_t_cdf(t: float, df: float) -> float:
+    """Cumulative distribution function of Student's t distribution."""
+    tail = 0.5 * regularized_incomplete_beta(df / (df + t * t), df / 2.0, 0.5)
+    return 1.0 - tail if t > 0 else tail
+
+
+def student_t_quantile(p: float, df: float) -> float:
+    """Inverse of `student_t_cdf`, found by bisection."""
+    if p < 0.5:
+        return -student_t_quantile(1.0 - p, df)
+    low, high = 0.0, 1.0
+    while student_t_cdf(high, df) < p:
+        low, high = high, high * 2
+    for _ in range(100):
+        middle = (low + high) / 2
+        if student_t_cdf(middle, df) < p:
+            low = middle
+        else:
+            high = middle
+    return (low + high) / 2
+
+
+def welch_t_test(baseline: Sequence[float], optimized: Sequence[float]) -> Optional[float]:
+    """
+    Two-sided p-value of Welch's t-test for a difference in means, or None
+    if either side has fewer than two samples.
+    """
+    if len(baseline) < 2 or len(optimized) < 2:
+        return None
+    mean_a, mean_b = statistics.fmean(baseline), statistics.fmean(optimized)
+    var_a = statistics.variance(baseline) / len(baseline)
+    var_b = statistics.variance(optimized) / len(optimized)
+    if var_a + var_b == 0.0:
+        return 1.0 if mean_a == mean_b else 0.0
+
+    t = (mean_a - mean_b) / math.sqrt(var_a + var_b)
+    df = (var_a + var_b) ** 2 / (
+        var_a ** 2 / (len(baseline) - 1) + var_b ** 2 / (len(optimized) - 1)
+    )
+    return regularized_incomplete_beta(df / (df + t * t), df / 2.0, 0.5)
+
+
+@dataclass
+class SampleComparison:
+    """Repeated-run comparison of one fixture."""
+    filename: str
+    baseline_runs: int
+    optimized_runs: int
+    baseline_mean: float
+    optimized_mean: float
+    p_value: float
+
+    @property
+    def speedup(self) -> float:
+        return self.baseline_mean / self.optimized_mean if self.optimized_mean else float('inf')
+
+
+def compare_samples(
+    baseline_samples: Dict[str, List[float]],
+    optimized_samples: Dict[str, List[float]]
+) -> List[SampleComparison]:
+    """Test every fixture that has at least two runs on both sides, sorted by name."""
+    comparisons = []
+    for filename in sorted(set(baseline_samples) & set(optimized_samples)):
+        baseline, optimized = baseline_samples[filename], optimized_samples[filename]
+        p_value = welch_t_test(baseline, optimized)
+        if p_value is None:
+            continue
+        comparisons.append(SampleComparison(
+            filename=filename,
+            baseline_runs=len(baseline),
+            optimized_runs=len(optimized),
+            baseline_mean=statistics.fmean(baseline),
+            optimized_mean=statistics.fmean(optimized),
+            p_value=p_value,
+        ))
+    return comparisons
+
+
+def collect_samples(
+    runs: Iterable[Dict[str, Dict]],
+    extract: Callable[[Dict], Optional[float]]
+) -> Dict[str, List[float]]:
+    """Gather the value `extract` returns for each fixture across repeated runs."""
+    samples: Dict[str, List[float]] = {}
+    for metrics in runs:
+        for filename, data in metrics.items():
+            value = extract(data)
+            if value is not None:
+                samples.setdefault(filename, []).append(value)
+    return samples
+
+
+def print_significance_table(comparisons: List[SampleComparison], alpha: float, metric: str) -> None:
+    """Print per-fixture repeated-run results and count the significant changes."""
+    print("\n" + "="*80)
+    print(f"REPEATED-RUN SIGNIFICANCE ({metric}, Welch's t-test, alpha={alpha})")
+    print("="*80)
+    if not comparisons:
+        print("No fixtures with at least two runs on both sides")
+        return
+
+    file_column_width = max(max(len(c.filename) for c in comparisons) + 2, 35)
+    header = ("File".ljust(file_column_width) + "Runs".ljust(8) + "Baseline (s)".ljust(15) +
+              "Optimized (s)".ljust(15) + "Speedup".ljust(10) + "p-value".ljust(10) + "Result")
+    print(header)
+    print("-" * len(header))
+
+    faster = slower = 0
+    for c in comparisons:
+        if c.p_value < alpha:
+            if c.speedup > 1.0:
+                result = "FASTER"
+                faster += 1
+            else:
+                result = "SLOWER"
+                slower += 1
+        else:
+            result = "no significant change"
+        print(c.filename.ljust(file_column_width) + f"{c.baseline_runs}/{c.optimized_runs}".ljust(8) +
+              f"{c.baseline_mean:,.3f}".ljust(15) + f"{c.optimized_mean:,.3f}".ljust(15) +
+              f"{c.speedup:.2f}x".ljust(10) + f"{c.p_value:.4f}".ljust(10) + result)
+
+    print(f"\n{faster} significantly faster, {slower} significantly slower, "
+          f"{len(comparisons) - faster - slower} unchanged out of {len(comparisons)} fixtures")
@@ -0,0 +1,331 @@
+#!/usr/bin/env python3
+"""
+Script to triage crashed executions and proofs by their crash reason.
+
+Usage:
+    python3 triage_crashes.py <metrics> [<metrics> ...] [--previous METRICS] [--similarity 0.8]
+
+Example:
+    python3 triage_crashes.py zkevm-metrics/reth zkevm-metrics/ethrex
+    python3 triage_crashes.py results.sqlite#nightly-02 --previous results.sqlite#nightly-01
+
+Crash reasons are free-form panic messages and ere errors. Each reason is
+normalized into a signature by replacing the parts that differ between
+fixtures of the same failure (hex values and addresses, UUIDs, file paths and
+source locations, numbers) with placeholders. Signatures whose words mostly
+overlap (Jaccard similarity of at least --similarity) are merged into one
+cluster.
+
+Output includes:
+- Results, crashes and crash clusters per zkVM version
+- One entry per cluster with its count per zkVM version, example fixtures and
+  an example reason, most frequent first
+- With --previous, clusters that did not occur in the previous run are marked NEW
+
+Every distinct reason is normalized once, so the cost is dominated by loading
+the metrics and grows linearly with the number of results.
+"""
+
+import argparse
+import json
+import os
+import re
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+from compressed_io import open_file
+from gas_metrics import group_name
+from metrics_loader import load_metrics, parse_store_source
+
+DEFAULT_SIMILARITY = 0.8
+DEFAULT_EXAMPLES = 3
+MAX_SIGNATURE_LENGTH = 200
+
+# Applied in order; earlier patterns protect their matches from the later ones
+NORMALIZATION_PATTERNS = [
+    (re.compile(r'[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}'), '<uuid>'),
+    (re.compile(r'\b0x[0-9a-fA-F]+\b'), '<hex>'),
+    # Paths with at least one separator, including Rust source locations such as src/lib.rs:12:5
+    (re.compile(r'(?:[A-Za-z]:)?[\w.~@+-]*(?:[/\\][\w.~@+-]+)+(?::\d+)*'), '<path>'),
+    (re.compile(r'\b[0-9a-fA-F]*[a-fA-F][0-9a-fA-F]*\b'), lambda m: '<hex>' if len(m.group(0)) >= 16 else m.group(0)),
+    # Numbers, but not digits inside identifiers and versions such as keccak256 or v5.0.0
+    (re.compile(r'(?<![\w<.])[-+]?\d+(?:[.,_]\d+)*'), '<n>'),
+    (re.compile(r'\s+'), ' '),
+]
+WORD_PATTERN = re.compile(r'<\w+>|\w+')
+
+PHASES = ("execution", "proving")
+
+
+def normalize_reason(reason: str) -> str:
+    """Signature of a crash reason with the fixture-specific details replaced by placeholders."""
+    signature = reason.strip()
+    for pattern, replacement in NORMALIZATION_PATTERNS:
+        signature = pattern.sub(replacement, signature)
+    signature = signature.strip()
+    if len(signature) > MAX_SIGNATURE_LENGTH:
+        signature = signature[:MAX_SIGNATURE_LENGTH] + "..."
+    return signature or "(no reason)"
+
+
+def crash_reasons(data: Dict) -> List[Tuple[str, str]]:
+    """`(phase, reason)` of every crashed phase of a result."""
+    crashes = []
+    for phase in PHASES:
+        section = data.get(phase)
+        if isinstance(section, dict) and 'crashed' in section:
+            crashes.append((phase, (section['crashed'] or {}).get('reason') or ""))
+    return crashes
+
+
+@dataclass
+class Cluster:
+    """Crashes sharing one signature, or several similar ones."""
+    signature: str
+    words: Set[str]
+    count: int = 0
+    signatures: Dict[str, int] = field(default_factory=dict)
+    groups: Dict[str, int] = field(default_factory=dict)
+    phases: Dict[str, int] = field(default_factory=dict)
+    examples: List[str] = field(default_factory=list)
+    example_reason: str = ""
+    new: bool = False
+
+
+@dataclass
+class SignatureCount:
+    """Crashes with one exact signature."""
+    count: int = 0
+    groups: Dict[str, int] = field(default_factory=dict)
+    phases: Dict[str, int] = field(default_factory=dict)
+    examples: List[str] = field(default_factory=list)
+    example_reason: str = ""
+
+
+def source_prefix(source: str) -> str:
+    """
+    Prefix for the groups of a source. Metrics folders are EL folders (e.g.
+    zkevm-metrics/reth), so their name is the EL; store keys already contain
+    the EL when a run has several.
+    """
+    if parse_store_source(source) is not None:
+        return ""
+    return Path(source).resolve().name + "/"
+
+
+def count_signatures(metrics: Dict[str, Dict], prefix: str, examples: int,
+                     signatures: Dict[str, SignatureCount], normalized: Dict[str, str],
+                     totals: Dict[str, List[int]]) -> None:
+    """
+    Add the crashes of one source to `signatures`. `normalized` caches the
+    signature of every distinct reason and `totals` counts results and
+    crashes per group.
+    """
+    for filename, data in metrics.items():
+        group = prefix + group_name(filename)
+        group_totals = totals.setdefault(group, [0, 0])
+        group_totals[0] += 1
+        crashes = crash_reasons(data)
+        if crashes:
+            group_totals[1] += 1
+        for phase, reason in crashes:
+            signature = normalized.get(reason)
+            if signature is None:
+                signature = normalized[reason] = normalize_reason(reason)
+            entry = signatures.get(signature)
+            if entry is None:
+                entry = signatures[signature] = SignatureCount(example_reason=reason)
+            entry.count += 1
+            entry.groups[group] = entry.groups.get(group, 0) + 1
+            entry.phases[phase] = entry.phases.get(phase, 0) + 1
+            if len(entry.examples) < examples:
+                entry.examples.append(f"{group}/{filename.rsplit('/', 1)[-1]}")
+
+
+def signature_words(signature: str) -> Set[str]:
+    return set(WORD_PATTERN.findall(signature.lower()))
+
+
+def jaccard(a: Set[str], b: Set[str]) -> float:
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+def cluster_signatures(signatures: Dict[str, SignatureCount], similarity: float,
+                       examples: int) -> List[Cluster]:
+    """
+    Greedily merge similar signatures, most frequent first, so each cluster is
+    named after its most common signature. The number of distinct signatures
+    is small compared to the number of results, even for large sweeps.
+    """
+    clusters: List[Cluster] = []
+    for signature, entry in sorted(signatures.items(), key=lambda item: (-item[1].count, item[0])):
+        words = signature_words(signature)
+        cluster = None
+        if similarity < 1.0:
+            cluster = next((c for c in clusters if jaccard(words, c.words) >= similarity), None)
+        if cluster is None:
+            cluster = Cluster(signature, words, example_reason=entry.example_reason)
+            clusters.append(cluster)
+        cluster.count += entry.count
+        cluster.signatures[signature] = entry.count
+        for group, count in entry.groups.items():
+            cluster.groups[group] = cluster.groups.get(group, 0) + count
+        for phase, count in entry.phases.items():
+            cluster.phases[phase] = cluster.phases.get(phase, 0) + count
+        cluster.examples.extend(entry.examples[:max(examples - len(cluster.examples), 0)])
+    clusters.sort(key=lambda c: (-c.count, c.signature))
+    return clusters
+
+
+def mark_new_clusters(clusters: List[Cluster], previous: Dict[str, SignatureCount], similarity: float) -> None:
+    """Mark the clusters that match none of the signatures of a previous run."""
+    previous_words = [signature_words(signature) for signature in previous]
+    for cluster in clusters:
+        if any(signature in previous for signature in cluster.signatures):
+            continue
+        cluster.new = not any(jaccard(cluster.words, words) >= similarity for words in previous_words)
+
+
+def load_signatures(sources: List[str], examples: int, workers: Optional[int], use_cache: bool
+                    ) -> Tuple[Dict[str, SignatureCount], Dict[str, List[int]]]:
+    signatures: Dict[str, SignatureCount] = {}
+    normalized: Dict[str, str] = {}
+    totals: Dict[str, List[int]] = {}
+    for source in sources:
+        if not parse_store_source(source) and not os.path.isabs(source):
+            source = os.path.abspath(source)
+        print(f"Loading metrics from: {source}")
+        metrics = load_metrics(source, workers, use_cache)
+        print(f"Loaded {len(metrics)} files")
+        count_signatures(metrics, source_prefix(source), examples, signatures, normalized, totals)
+    return signatures, totals
+
+
+def print_group_summary(clusters: List[Cluster], totals: Dict[str, List[int]]):
+    """Print the number of crashed results per zkVM version and phase."""
+    print("\n" + "="*80)
+    print("CRASHES PER ZKVM VERSION")
+    print("="*80)
+    cluster_counts: Dict[str, int] = {}
+    for cluster in clusters:
+        for group in cluster.groups:
+            cluster_counts[group] = cluster_counts.get(group, 0) + 1
+    group_width = max([len(group) for group in totals] + [20]) + 2
+    header = ("Group".ljust(group_width) + "Results".ljust(10) + "Crashed".ljust(10) + "Rate".ljust(10) +
+              "Clusters")
+    print(header)
+    print("-" * len(header))
+    for group in sorted(totals):
+        results, crashed = totals[group]
+        rate = crashed / results * 100 if results else 0.0
+        print(group.ljust(group_width) + f"{results:,}".ljust(10) + f"{crashed:,}".ljust(10) +
+              f"{rate:.1f}%".ljust(10) + str(cluster_counts.get(group, 0)))
+
+
+def print_clusters(clusters: List[Cluster], top: int):
+    """Print the clusters, most frequent first."""
+    print("\n" + "="*80)
+    print("CRASH CLUSTERS")
+    print("="*80)
+    if not clusters:
+        print("No crashes found")
+        return
+
+    for i, cluster in enumerate(clusters[:top]):
+        marker = "  [NEW]" if cluster.new else ""
+        phases = ", ".join(f"{phase} {count:,}" for phase, count in sorted(cluster.phases.items()))
+        print(f"\n#{i+1} {cluster.count:,} crashes ({phases}){marker}")
+        print(f"  Signature: {cluster.signature}")
+        if len(cluster.signatures) > 1:
+            print(f"  Merged {len(cluster.signatures)} similar signatures:")
+            for signature, count in list(cluster.signatures.items())[:DEFAULT_EXAMPLES]:
+                print(f"    {count:,}x {signature}")
+        print("  Per zkVM version:")
+        for group, count in sorted(cluster.groups.items(), key=lambda item: (-item[1], item[0])):
+            print(f"    {group}: {count:,}")
+        print("  Examples:")
+        for example in cluster.examples:
+            print(f"    {example}")
+        reason = cluster.example_reason.strip().splitlines()
+        if reason:
+            suffix = " ..." if len(reason) > 1 else ""
+            print(f"  Example reason: {reason[0][:MAX_SIGNATURE_LENGTH]}{suffix}")
+    if len(clusters) > top:
+        print(f"\n... and {len(clusters) - top} more clusters (use --top to show more)")
+
+
+def write_json_report(path: str, clusters: List[Cluster], totals: Dict[str, List[int]]):
+    report = {
+        "groups": {group: {"results": results, "crashed": crashed} for group, (results, crashed) in sorted(totals.items())},
+        "clusters": [{
+            "signature": cluster.signature,
+            "count": cluster.count,
+            "new": cluster.new,
+            "phases": cluster.phases,
+            "groups": cluster.groups,
+            "signatures": cluster.signatures,
+            "examples": cluster.examples,
+            "example_reason": cluster.example_reason,
+        } for cluster in clusters],
+    }
+    with open_file(path, 'w') as f:
+        json.dump(report, f, indent=2)
+
+
+def main():
+    """Main function."""
+    parser = argparse.ArgumentParser(
+        description="Cluster crashed executions and proofs by normalized crash reason",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""Example:
+  python3 triage_crashes.py zkevm-metrics/reth zkevm-metrics/ethrex
+  python3 triage_crashes.py results.sqlite#nightly-02 --previous results.sqlite#nightly-01 --json crashes.json"""
+    )
+    parser.add_argument("metrics", nargs="+",
+                        help="Metrics folders or results store runs (<file>.sqlite[#<run>]) to triage")
+    parser.add_argument("--previous", nargs="+", default=None, metavar="METRICS",
+                        help="Earlier run(s); clusters that did not occur there are marked NEW")
+    parser.add_argument("--similarity", type=float, default=DEFAULT_SIMILARITY,
+                        help=f"Word overlap at which signatures are merged, 1.0 to disable (default: {DEFAULT_SIMILARITY})")
+    parser.add_argument("--examples", type=int, default=DEFAULT_EXAMPLES,
+                        help=f"Example fixtures per cluster (default: {DEFAULT_EXAMPLES})")
+    parser.add_argument("--top", type=int, default=30, help="Number of clusters to print (default: 30)")
+    parser.add_argument("--json", metavar="FILE", help="Write all clusters as JSON")
+    parser.add_argument("-j", "--jobs", type=int, default=None,
+                        help="Number of worker processes used to parse metrics (default: CPU count)")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Do not read or update the metrics cache stored in each folder")
+    args = parser.parse_args()
+
+    if not 0.0 < args.similarity <= 1.0:
+        parser.error("--similarity must be in (0, 1]")
+
+    signatures, totals = load_signatures(args.metrics, args.examples, args.jobs, not args.no_cache)
+    if not totals:
+        print("No results found")
+        return 1
+    clusters = cluster_signatures(signatures, args.similarity, args.examples)
+
+    if args.previous:
+        previous, _ = load_signatures(args.previous, 0, args.jobs, not args.no_cache)
+        mark_new_clusters(clusters, previous, args.similarity)
+
+    print_group_summary(clusters, totals)
+    print_clusters(clusters, args.top)
+
+    crashed = sum(cluster.count for cluster in clusters)
+    print(f"\n{crashed:,} crashes in {len(clusters)} clusters ({len(signatures)} distinct signatures)")
+    if args.previous:
+        new = [cluster for cluster in clusters if cluster.new]
+        print(f"{len(new)} new clusters with {sum(cluster.count for cluster in new):,} crashes")
+
+    if args.json:
+        write_json_report(args.json, clusters, totals)
+        print(f"\nJSON report written to {args.json}")
+    return 0
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,359 @@
+"""
+Durable work queue for benchmark sweeps, used by run_sweep.py.
+
+Every (EL, zkVM, fixture) of a sweep is one item in an SQLite database, so a
+sweep that is killed or preempted can be resumed without redoing finished
+work or losing track of what was in flight:
+
+- Items start `pending`. A worker *leases* a batch of pending items, which
+  marks them `leased` with an owner and an expiry time that the worker keeps
+  extending while ere-hosts runs.
+- Leases that expire, or whose owner process on this host no longer exists,
+  are returned to `pending` by the next lease call.
+- A successful result makes an item `done`. A `Crashed` result is retried
+  until the item has been attempted `max_attempts` times, after which it
+  stays `crashed`.
+- An item that produced no result at all (ere-hosts failed or was killed
+  after a timeout) cannot be blamed when it shared its batch with others, so
+  it is returned to `pending` and *isolated*, i.e. leased on its own from then
+  on. An isolated item without a result counts as an attempt and ends up
+  `failed` once its attempts are used up.
+
+The database uses WAL journaling and every state change is its own
+transaction, so several workers, threads or orchestrators can share it.
+"""
+
+import os
+import socket
+import sqlite3
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+PENDING = 'pending'
+LEASED = 'leased'
+DONE = 'done'
+CRASHED = 'crashed'
+FAILED = 'failed'
+STATES = (PENDING, LEASED, DONE, CRASHED, FAILED)
+
+DEFAULT_MAX_ATTEMPTS = 3
+DEFAULT_LEASE_SECONDS = 600.0
+
+ItemKey = Tuple[str, str, str]
+
+
+@dataclass
+class WorkItem:
+    """One fixture to run on one zkVM for one EL."""
+    el: str
+    zkvm: str
+    fixture: str
+    path: str
+    predicted_cycles: float
+    attempts: int = 0
+    isolate: bool = False
+
+    @property
+    def key(self) -> ItemKey:
+        return (self.el, self.zkvm, self.fixture)
+
+
+def lease_owner(worker: int) -> str:
+    """Owner id of a worker of this process: `<host>:<pid>:<worker>`."""
+    return f"{socket.gethostname()}:{os.getpid()}:{worker}"
+
+
+def owner_alive(owner: str) -> bool:
+    """False only for owners on this host whose process has exited."""
+    host, _, rest = owner.partition(':')
+    pid = rest.split(':', 1)[0]
+    if host != socket.gethostname() or not pid.isdigit():
+        return True
+    try:
+        os.kill(int(pid), 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    # A killed process whose parent has not reaped it yet still accepts signals
+    try:
+        stat = Path(f"/proc/{pid}/stat").read_text()
+        return stat[stat.rindex(')') + 2] != 'Z'
+    except (OSError, ValueError, IndexError):
+        return True
+
+
+class WorkQueue:
+    """SQLite-backed work queue of one sweep."""
+
+    SCHEMA_VERSION = 1
+
+    ITEM_COLUMNS = ('el', 'zkvm', 'fixture', 'path', 'predicted_cycles', 'attempts', 'isolate')
+
+    SCHEMA = '''
+        CREATE TABLE IF NOT EXISTS settings (
+            key TEXT PRIMARY KEY,
+            value TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS items (
+            el TEXT NOT NULL,
+            zkvm TEXT NOT NULL,
+            fixture TEXT NOT NULL,
+            path TEXT NOT NULL,
+            predicted_cycles REAL NOT NULL DEFAULT 0,
+            state TEXT NOT NULL DEFAULT 'pending',
+            attempts INTEGER NOT NULL DEFAULT 0,
+            isolate INTEGER NOT NULL DEFAULT 0,
+            lease_owner TEXT,
+            lease_expires REAL,
+            last_error TEXT,
+            updated_at REAL,
+            PRIMARY KEY (el, zkvm, fixture)
+        ) WITHOUT ROWID;
+        CREATE INDEX IF NOT EXISTS items_state ON items(state, predicted_cycles);
+    '''
+
+    def __init__(self, path: Path, create: bool = False, max_attempts: int = DEFAULT_MAX_ATTEMPTS):
+        if not create and not path.is_file():
+            raise FileNotFoundError(f"{path} does not exist")
+        self.path = path
+        self.max_attempts = max_attempts
+        # Transactions are managed explicitly so leases can take the write lock up front
+        self.conn = sqlite3.connect(str(path), timeout=60, isolation_level=None)
+        version = self.conn.execute('PRAGMA user_version').fetchone()[0]
+        if version == 0 and create:
+            self.conn.execute('PRAGMA journal_mode = WAL')
+            self.conn.executescript(self.SCHEMA)
+            self.conn.execute(f'PRAGMA user_version = {self.SCHEMA_VERSION}')
+        elif version != self.SCHEMA_VERSION:
+            self.conn.close()
+            raise ValueError(f"{path} is not a work queue with schema version {self.SCHEMA_VERSION}")
+
+    @classmethod
+    def open(cls, path: Path, create: bool = False,
+             max_attempts: int = DEFAULT_MAX_ATTEMPTS) -> Optional['WorkQueue']:
+        """Open the queue at `path`, returning None if it cannot be used."""
+        try:
+            return cls(path, create, max_attempts)
+        except (OSError, ValueError, sqlite3.Error) as e:
+            print(f"Warning: Could not open work queue {path}: {e}")
+            return None
+
+    @classmethod
+    def in_memory_copy(cls, path: Optional[Path], max_attempts: int = DEFAULT_MAX_ATTEMPTS) -> 'WorkQueue':
+        """A private in-memory copy of the queue at `path` (or an empty queue), e.g. for dry runs."""
+        queue = cls(Path(':memory:'), create=True, max_attempts=max_attempts)
+        if path is not None and path.is_file():
+            source = sqlite3.connect(str(path), timeout=60)
+            source.backup(queue.conn)
+            source.close()
+        return queue
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def check_settings(self, settings: Dict[str, str]) -> List[str]:
+        """
+        Record the settings of the sweep on first use, and afterwards return
+        a description of every setting that differs from the recorded one.
+        """
+        recorded = dict(self.conn.execute('SELECT key, value FROM settings'))
+        if not recorded:
+            with self.conn:
+                self.conn.execute('BEGIN')
+                self.conn.executemany('INSERT INTO settings (key, value) VALUES (?, ?)', settings.items())
+            return []
+        return [f"{key}: queue has '{recorded.get(key)}', requested '{value}'"
+                for key, value in settings.items() if recorded.get(key) != value]
+
+    def add(self, items: Iterable[WorkItem]) -> List[ItemKey]:
+        """
+        Add new items as pending and return their keys. Items already in the
+        queue keep their state; pending ones get the new path and prediction.
+        """
+        added = []
+        now = time.time()
+        with self.conn:
+            self.conn.execute('BEGIN IMMEDIATE')
+            for item in items:
+                cursor = self.conn.execute('''
+                    INSERT OR IGNORE INTO items (el, zkvm, fixture, path, predicted_cycles, updated_at)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                ''', (item.el, item.zkvm, item.fixture, item.path, item.predicted_cycles, now))
+                if cursor.rowcount:
+                    added.append(item.key)
+                else:
+                    self.conn.execute('''
+                        UPDATE items SET path = ?, predicted_cycles = ?
+                        WHERE el = ? AND zkvm = ? AND fixture = ? AND state = 'pending'
+                    ''', (item.path, item.predicted_cycles) + item.key)
+        return added
+
+    def reset(self) -> int:
+        """Return every item to pending with no attempts, e.g. to force a rerun."""
+        with self.conn:
+            self.conn.execute('BEGIN IMMEDIATE')
+            return self.conn.execute('''
+                UPDATE items SET state = 'pending', attempts = 0, isolate = 0, lease_owner = NULL,
+                    lease_expires = NULL, last_error = NULL, updated_at = ?
+            ''', (time.time(),)).rowcount
+
+    def _reclaim(self, now: float) -> int:
+        """Return expired leases and leases of exited processes to pending."""
+        stale = [owner for (owner,) in self.conn.execute(
+            "SELECT DISTINCT lease_owner FROM items WHERE state = 'leased'"
+        ) if owner is None or not owner_alive(owner)]
+        reclaimed = self.conn.execute('''
+            UPDATE items SET state = 'pending', lease_owner = NULL, lease_expires = NULL, updated_at = ?
+            WHERE state = 'leased' AND lease_expires < ?
+        ''', (now, now)).rowcount
+        for owner in stale:
+            reclaimed += self.conn.execute('''
+                UPDATE items SET state = 'pending', lease_owner = NULL, lease_expires = NULL, updated_at = ?
+                WHERE state = 'leased' AND lease_owner IS ?
+            ''', (now, owner)).rowcount
+        return reclaimed
+
+    def reclaim(self) -> int:
+        """Return expired and orphaned leases to pending; returns the number of items."""
+        with self.conn:
+            self.conn.execute('BEGIN IMMEDIATE')
+            return self._reclaim(time.time())
+
+    def lease(self, owner: str, target_cycles: float, max_items: Optional[int] = None,
+              lease_seconds: float = DEFAULT_LEASE_SECONDS, zkvm: Optional[str] = None) -> List[WorkItem]:
+        """
+        Lease the pending item with the highest predicted cost, plus the next
+        most expensive pending items of the same EL and zkVM until the batch
+        reaches `target_cycles` or `max_items`. Isolated items are leased
+        alone. Only items of `zkvm` are considered when it is given. Returns
+        an empty list when nothing (of `zkvm`) is pending.
+        """
+        columns = ', '.join(self.ITEM_COLUMNS)
+        now = time.time()
+        with self.conn:
+            self.conn.execute('BEGIN IMMEDIATE')
+            self._reclaim(now)
+            row = self.conn.execute(f'''
+                SELECT {columns} FROM items WHERE state = 'pending' AND (? IS NULL OR zkvm = ?)
+                ORDER BY predicted_cycles DESC, el, zkvm, fixture LIMIT 1
+            ''', (zkvm, zkvm)).fetchone()
+            if row is None:
+                return []
+            batch = [WorkItem(*row)]
+            total = batch[0].predicted_cycles
+            if not batch[0].isolate:
+                cursor = self.conn.execute(f'''
+                    SELECT {columns} FROM items
+                    WHERE state = 'pending' AND isolate = 0 AND el = ? AND zkvm = ? AND fixture != ?
+                    ORDER BY predicted_cycles DESC, fixture
+                ''', batch[0].key)
+                for row in cursor:
+                    if total >= target_cycles or (max_items is not None and len(batch) >= max_items):
+                        break
+                    batch.append(WorkItem(*row))
+                    total += batch[-1].predicted_cycles
+                cursor.close()
+            self.conn.executemany('''
+                UPDATE items SET state = 'leased', lease_owner = ?, lease_expires = ?, updated_at = ?
+                WHERE el = ? AND zkvm = ? AND fixture = ?
+            ''', [(owner, now + lease_seconds, now) + item.key for item in batch])
+        return batch
+
+    def pending_zkvm(self) -> Optional[str]:
+        """zkVM of the pending item with the highest predicted cost, None when nothing is pending."""
+        with self.conn:
+            self.conn.execute('BEGIN IMMEDIATE')
+            self._reclaim(time.time())
+            row = self.conn.execute('''
+                SELECT zkvm FROM items WHERE state = 'pending'
+                ORDER BY predicted_cycles DESC, el, zkvm, fixture LIMIT 1
+            ''').fetchone()
+        return row[0] if row else None
+
+    def renew(self, owner: str, lease_seconds: float = DEFAULT_LEASE_SECONDS) -> int:
+        """Extend all leases of `owner`; returns the number of items still leased by it."""
+        with self.conn:
+            self.conn.execute('BEGIN IMMEDIATE')
+            return self.conn.execute('''
+                UPDATE items SET lease_expires = ? WHERE state = 'leased' AND lease_owner = ?
+            ''', (time.time() + lease_seconds, owner)).rowcount
+
+    def _finish(self, item: WorkItem, state: str, attempts: int, isolate: bool, error: Optional[str]) -> None:
+        self.conn.execute('''
+            UPDATE items SET state = ?, attempts = ?, isolate = ?, last_error = ?,
+                lease_owner = NULL, lease_expires = NULL, updated_at = ?
+            WHERE el = ? AND zkvm = ? AND fixture = ?
+        ''', (state, attempts, int(isolate), error, time.time()) + item.key)
+
+    def record_success(self, item: WorkItem) -> None:
+        with self.conn:
+            self.conn.execute('BEGIN IMMEDIATE')
+            self._finish(item, DONE, item.attempts + 1, item.isolate, None)
+
+    def record_crash(self, item: WorkItem, reason: str) -> str:
+        """Record a Crashed result; returns the new state (pending for a retry, or crashed)."""
+        attempts = item.attempts + 1
+        state = PENDING if attempts < self.max_attempts else CRASHED
+        with self.conn:
+            self.conn.execute('BEGIN IMMEDIATE')
+            self._finish(item, state, attempts, item.isolate, reason)
+        return state
+
+    def record_missing(self, item: WorkItem, error: str, batch_size: int) -> str:
+        """
+        Record an item that produced no result. Returns the new state: pending
+        (isolated for a retry on its own) or, once its attempts are used up,
+        failed.
+        """
+        if batch_size > 1 and not item.isolate:
+            attempts, state = item.attempts, PENDING
+        else:
+            attempts = item.attempts + 1
+            state = PENDING if attempts < self.max_attempts else FAILED
+        with self.conn:
+            self.conn.execute('BEGIN IMMEDIATE')
+            self._finish(item, state, attempts, True, error)
+        return state
+
+    def seed(self, outcomes: Dict[ItemKey, Optional[str]]) -> Tuple[int, int]:
+        """
+        Record results that already existed before the items were queued:
+        `None` for a success, or the crash reason. Returns the number of items
+        marked done and crashed.
+        """
+        done = crashed = 0
+        for key, reason in outcomes.items():
+            row = self.conn.execute(f'''
+                SELECT {', '.join(self.ITEM_COLUMNS)} FROM items
+                WHERE el = ? AND zkvm = ? AND fixture = ? AND state = 'pending' AND attempts = 0
+            ''', key).fetchone()
+            if row is None:
+                continue
+            if reason is None:
+                self.record_success(WorkItem(*row))
+                done += 1
+            else:
+                self.record_crash(WorkItem(*row), reason)
+                crashed += 1
+        return done, crashed
+
+    def counts(self) -> Dict[str, int]:
+        """Number of items per state."""
+        counts = {state: 0 for state in STATES}
+        counts.update(self.conn.execute('SELECT state, COUNT(*) FROM items GROUP BY state'))
+        return counts
+
+    def pending_cycles(self) -> float:
+        return self.conn.execute(
+            "SELECT COALESCE(SUM(predicted_cycles), 0) FROM items WHERE state = 'pending'"
+        ).fetchone()[0]
+
+    def problems(self) -> List[Tuple[str, str, str, str, int, Optional[str]]]:
+        """`(el, zkvm, fixture, state, attempts, last error)` of every crashed or failed item."""
+        return self.conn.execute('''
+            SELECT el, zkvm, fixture, state, attempts, last_error FROM items
+            WHERE state IN ('crashed', 'failed') ORDER BY el, zkvm, fixture
+        ''').fetchall()